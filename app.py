@@ -1,22 +1,69 @@
-from aiogram import executor
-from loader import dp
-from bot_init import classifier_bot
-import middlewares, filters, handlers
-from utils.notify_admins import on_startup_notify
-from utils.set_bot_commands import set_default_commands
+import asyncio
+
+from utils.misc.startup_report import StartupReport
+
+startup_report = StartupReport()
+
+with startup_report.measure("aiogram"):
+    from aiogram import executor
+with startup_report.measure("loader"):
+    from loader import dp
+with startup_report.measure("bot_init"):
+    from bot_init import classifier_bot
+with startup_report.measure("middlewares"):
+    import middlewares
+with startup_report.measure("filters"):
+    import filters
+with startup_report.measure("handlers"):
+    import handlers
+with startup_report.measure("utils"):
+    from data.config import WARM_UP_SHEETS
+    from utils.notify_admins import on_startup_notify
+    from utils.set_bot_commands import set_default_commands
+    from utils.shutdown import shutdown
+    from utils.stats import maintain_stats
+    from utils.submit import maintain_outbox
+    from utils.submit_queue import submit_queue
+    from utils.warm_up import backfill_mirror, warm_up
 
 async def on_startup(dispatcher):
     """
     Perform actions at bot startup.
     """
-    # Set default bot commands
-    await set_default_commands(dispatcher)
+    # Set default bot commands, notify admins and warm up caches and Google Sheets concurrently
+    await asyncio.gather(
+        set_default_commands(dispatcher),
+        on_startup_notify(dispatcher),
+        warm_up(sheets=WARM_UP_SHEETS),
+    )
+
+    # First run: copy the rows already in the sheet into the local mirror, in the background
+    if WARM_UP_SHEETS:
+        asyncio.create_task(backfill_mirror())
+
+    # Snapshot and reconcile the running statistics in the background
+    asyncio.create_task(maintain_stats())
+
+    # Finish submissions interrupted by the previous shutdown or kept while Google Sheets was down
+    asyncio.create_task(maintain_outbox(dispatcher.bot))
 
-    # Notify admins about bot startup
-    await on_startup_notify(dispatcher)
+    # Workers that run the queued submits at the Sheets quota rate
+    submit_queue.start(dispatcher.bot)
+
+    # SIGTERM/SIGINT stop polling and run on_shutdown
+    shutdown.install(dispatcher)
 
     # Register handlers through BeingClassifierBot
     classifier_bot.register_handlers()
 
+    startup_report.log()
+
+
+async def on_shutdown(dispatcher):
+    """
+    Let running submits finish, flush buffered writes, then close the bot.
+    """
+    await shutdown.shutdown(dispatcher)
+
 if __name__ == "__main__":
-    executor.start_polling(dp, on_startup=on_startup)
+    executor.start_polling(dp, on_startup=on_startup, on_shutdown=on_shutdown)
@@ -0,0 +1,8 @@
+import os
+
+# Offline defaults so the bot modules can be imported without a .env file.
+# Real values from the environment always win.
+os.environ.setdefault("BOT_TOKEN", "123456:BENCHMARK-TOKEN")
+os.environ.setdefault("ADMINS", "1")
+os.environ.setdefault("ip", "127.0.0.1")
+os.environ.setdefault("GROUP_ID", "-1000000000001")
@@ -0,0 +1,165 @@
+import asyncio
+import itertools
+import threading
+import time
+
+from utils.db_api.google_sheets import WORKSHEET_HEADERS
+
+BOT_USER = {"id": 123456, "is_bot": True, "first_name": "Classifier", "username": "classifier_bot"}
+
+# Bot API methods that answer with a Message object
+MESSAGE_METHODS = {"sendMessage", "editMessageText", "editMessageReplyMarkup", "sendDocument"}
+
+
+
+def build_result(method: str, payload: dict, message_id: int):
+    """
+    Build a plausible Bot API result for the given method.
+    :param method: Bot API method name (e.g. sendMessage).
+    :param payload: Request parameters sent by the bot.
+    :param message_id: Message id to use when the method returns a message.
+    :return: JSON-compatible result object.
+    """
+    if method == "getMe":
+        return dict(BOT_USER)
+    if method == "getUpdates":
+        return []
+    if method not in MESSAGE_METHODS:
+        return True
+
+    chat_id = payload.get("chat_id", 0)
+    try:
+        chat_id = int(chat_id)
+    except (TypeError, ValueError):
+        pass
+    result = {
+        "message_id": message_id,
+        "date": int(time.time()),
+        "chat": {"id": chat_id, "type": "private" if isinstance(chat_id, int) and chat_id > 0 else "supergroup"},
+        "from": dict(BOT_USER),
+    }
+    if payload.get("text") is not None:
+        result["text"] = str(payload["text"])
+    return result
+
+
+class FakeTelegramApi:
+    """
+    In-process stand-in for the Bot API. Replaces ``Bot.request`` so every
+    outgoing call is answered locally and recorded.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = []
+        self._message_ids = itertools.count(1)
+        self._last_message = {}
+        self._last_markup = {}
+
+    def install(self, bot):
+        """
+        Route all requests of the given bot through this fake.
+        """
+        bot.request = self.request
+        return self
+
+    def next_message_id(self) -> int:
+        return next(self._message_ids)
+
+    def last_message_id(self, chat_id: int) -> int:
+        """
+        Return the id of the last message the bot sent to the chat.
+        """
+        return self._last_message.get(chat_id, 0)
+
+    def last_markup(self, chat_id: int):
+        """
+        Return the inline keyboard (as sent, JSON) of the latest message sent to or edited in the chat.
+        """
+        return self._last_markup.get(chat_id)
+
+    def sent_to(self, chat_id) -> int:
+        """
+        Count the messages sent to a chat, e.g. the group reports.
+        """
+        return sum(1 for method, payload in self.calls
+                   if method == "sendMessage" and str(payload.get("chat_id")) == str(chat_id))
+
+    async def request(self, method, data=None, files=None, **kwargs):
+        payload = dict(data or {})
+        self.calls.append((method, payload))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if method in ("sendMessage", "sendDocument"):
+            message_id = self.next_message_id()
+        else:
+            message_id = int(payload.get("message_id") or 0)
+        result = build_result(method, payload, message_id)
+        if method in MESSAGE_METHODS and "chat_id" in payload:
+            self._last_markup[result["chat"]["id"]] = payload.get("reply_markup")
+        if isinstance(result, dict) and "chat" in result and method in ("sendMessage", "sendDocument"):
+            self._last_message[result["chat"]["id"]] = message_id
+        return result
+
+    def call_counts(self) -> dict:
+        counts = {}
+        for method, _ in self.calls:
+            counts[method] = counts.get(method, 0) + 1
+        return counts
+
+
+class FakeSheetsClient:
+    """
+    In-memory replacement for GoogleSheetsClient with the same interface.
+    Worksheets are shared between instances, like the real spreadsheet.
+    """
+    latency = 0.0
+    worksheets = {title: [list(header)] for title, header in WORKSHEET_HEADERS.items()}
+    calls = {}
+    reserved = {}
+    reserve_lock = threading.Lock()
+
+    def __init__(self, credentials_file: str = None, spreadsheet_name: str = None):
+        self.credentials_file = credentials_file
+        self.spreadsheet_name = spreadsheet_name
+
+    def _wait(self, operation: str):
+        self.calls[operation] = self.calls.get(operation, 0) + 1
+        # gspread is synchronous, so latency blocks the event loop like the real client
+        if self.latency:
+            time.sleep(self.latency)
+
+    def authenticate(self):
+        self._wait("authenticate")
+
+    def append_data(self, worksheet_name: str, data: list):
+        self._wait("append_data")
+        self.worksheets.setdefault(worksheet_name, []).append([str(value) for value in data])
+
+    def append_rows(self, worksheet_name: str, rows: list):
+        self._wait("append_rows")
+        self.worksheets.setdefault(worksheet_name, []).extend([str(value) for value in row] for row in rows)
+
+    def get_row_count(self, worksheet_name: str) -> int:
+        self._wait("get_row_count")
+        return len(self.worksheets.get(worksheet_name, []))
+
+    def reserve_row_numbers(self, worksheet_name: str, count: int = 1) -> int:
+        with self.reserve_lock:
+            first = max(self.get_row_count(worksheet_name), self.reserved.get(worksheet_name, 0))
+            self.reserved[worksheet_name] = first + count
+            return first
+
+    def get_data(self, worksheet_name: str) -> list:
+        self._wait("get_data")
+        return [list(row) for row in self.worksheets.get(worksheet_name, [])]
+
+    def ping(self):
+        self._wait("ping")
+
+    def iter_rows(self, worksheet_name: str, page_size: int = 1000):
+        rows = self.worksheets.get(worksheet_name, [])
+        for start in range(0, len(rows) + 1, page_size):
+            self._wait("iter_rows")
+            yield from (list(row) for row in rows[start:start + page_size])
@@ -0,0 +1,352 @@
+"""
+Offline microbenchmarks for the per-update hot paths.
+
+Each benchmark is calibrated to run for a fixed time per round and repeated
+for several rounds; results are printed and saved as JSON (pytest-benchmark
+style) so runs of two versions on the same machine can be compared.
+
+Usage:
+    python -m benchmarks.hot_paths --json before.json
+    python -m benchmarks.hot_paths --json after.json --compare before.json
+    python -m benchmarks.hot_paths -k matches     # only benchmarks whose name contains "matches"
+"""
+import argparse
+import asyncio
+import datetime
+import inspect
+import json
+import logging
+import platform
+import statistics
+import time
+
+from aiogram import Bot, Dispatcher, types
+from aiogram.contrib.fsm_storage.memory import MemoryStorage
+from aiogram.dispatcher.handler import CancelHandler, current_handler
+from aiogram.utils.exceptions import MessageNotModified, RetryAfter, TelegramAPIError
+from difflib import get_close_matches
+
+from benchmarks.fakes import FakeTelegramApi
+
+BENCHMARKS = []
+
+
+def bench(name: str):
+    """
+    Register a benchmark. The decorated factory returns the callable to time
+    (plain function or coroutine function) after doing its setup, or None to skip it.
+    """
+
+    def decorator(factory):
+        BENCHMARKS.append((name, factory))
+        return factory
+
+    return decorator
+
+
+class _NullStream:
+    """
+    Stream that swallows writes, so log formatting is measured without terminal I/O.
+    """
+
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def _message(user_id: int = 1, text: str = "Uzbekk") -> types.Message:
+    return types.Message.to_object({
+        "message_id": 1,
+        "date": int(time.time()),
+        "chat": {"id": user_id, "type": "private", "first_name": "Bench"},
+        "from": {"id": user_id, "is_bot": False, "first_name": "Bench"},
+        "text": text,
+    })
+
+
+# --- fuzzy matching ----------------------------------------------------------
+
+def _matches_factory(vocabulary_name: str, query: str):
+    def factory():
+        from data import predefined_lists
+        vocabulary = getattr(predefined_lists, vocabulary_name)
+        return lambda: get_close_matches(query, vocabulary, n=10, cutoff=0.4)
+    return factory
+
+
+bench("matches.nationalities")(_matches_factory("nationalities", "Uzbekk"))
+bench("matches.colors")(_matches_factory("colors", "Bleu"))
+bench("matches.animals")(_matches_factory("animals", "Dgo"))
+
+
+def _index_factory(index_name: str, query: str, cold: bool = False):
+    def factory():
+        from utils.misc import fuzzy
+        index = getattr(fuzzy, index_name)
+        if not cold:
+            return lambda: index.close_matches(query)
+
+        def run():
+            # First time this typo is seen: difflib plus the cache insert
+            index._cache.clear()
+            return index.close_matches(query)
+
+        return run
+    return factory
+
+
+bench("index.nationalities")(_index_factory("nationality_index", "Uzbekk"))
+bench("index.colors")(_index_factory("color_index", "Bleu"))
+bench("index.animals")(_index_factory("animal_index", "Dgo"))
+bench("index.cold.nationalities")(_index_factory("nationality_index", "Uzbekk", cold=True))
+bench("index.cold.colors")(_index_factory("color_index", "Bleu", cold=True))
+bench("index.cold.animals")(_index_factory("animal_index", "Dgo", cold=True))
+
+
+# --- keyboards and messages --------------------------------------------------
+
+@bench("keyboard.candidates")
+def keyboard_candidates():
+    from data.predefined_lists import nationalities
+    from keyboards.inline.candidates import candidates_keyboard, candidates_text
+    candidates = nationalities[:10]
+
+    def run():
+        keyboard = candidates_keyboard("nationality", len(candidates), "reenter")
+        return keyboard.as_json(), candidates_text(candidates)
+
+    return run
+
+
+@bench("render.human_summary")
+def render_human_summary():
+    from handlers.users.classify import human_summary
+    data = {"gender": "Male", "age": 27, "nationality": "Uzbek", "education": "Higher",
+            "eye_color": "Blue", "hair_color": "Black", "height": 180}
+    return lambda: human_summary(data)
+
+
+@bench("render.group_message")
+def render_group_message():
+    from handlers.users.classify import human_group_message
+    post_data = {"unique_id": "1734000000", "date": "2024-12-12", "specie": "Human", "gender": "Male",
+                 "nationality": "Uzbek", "education": "Higher", "eye_color": "Blue",
+                 "hair_color": "Black", "height": 180}
+    return lambda: human_group_message(post_data)
+
+
+# --- FSM storage -------------------------------------------------------------
+
+@bench("fsm.get_data")
+def fsm_get_data():
+    storage = MemoryStorage()
+    asyncio.get_event_loop().run_until_complete(
+        storage.set_data(chat=1, user=1, data={"gender": "Male", "age": 27, "similar_nationalities": ["Uzbek"] * 10}))
+
+    async def run():
+        return await storage.get_data(chat=1, user=1)
+
+    return run
+
+
+@bench("fsm.update_data")
+def fsm_update_data():
+    storage = MemoryStorage()
+
+    async def run():
+        await storage.update_data(chat=1, user=1, data={"nationality": "Uzbek"})
+
+    return run
+
+
+# --- error handler -----------------------------------------------------------
+
+def _errors_factory(exception: Exception, logged: bool = False):
+    def factory():
+        from handlers.errors import error_handler
+        from handlers.errors.error_handler import errors_handler
+        from utils.misc.log_sampling import LogSampler
+        from utils.misc.logging import listener
+        # Either every record is logged, or (as in an error storm) every record is sampled out
+        error_handler.sampler = LogSampler(burst=float("inf") if logged else 0, period=3600)
+        for handler in logging.getLogger().handlers + list(listener.handlers):
+            if isinstance(handler, logging.StreamHandler):
+                handler.setStream(_NullStream())
+        update = types.Update.to_object({"update_id": 1, "message": _message().to_python()})
+
+        async def run():
+            return await errors_handler(update, exception)
+
+        return run
+    return factory
+
+
+bench("errors.message_not_modified")(_errors_factory(MessageNotModified("Message is not modified")))
+bench("errors.retry_after")(_errors_factory(RetryAfter(5)))
+bench("errors.telegram_api_error")(_errors_factory(TelegramAPIError("Bad Request")))
+bench("errors.unknown")(_errors_factory(RuntimeError("Failed to append data")))
+bench("errors.logged.message_not_modified")(_errors_factory(MessageNotModified("Message is not modified"), logged=True))
+bench("errors.logged.retry_after")(_errors_factory(RetryAfter(5), logged=True))
+bench("errors.logged.telegram_api_error")(_errors_factory(TelegramAPIError("Bad Request"), logged=True))
+bench("errors.logged.unknown")(_errors_factory(RuntimeError("Failed to append data"), logged=True))
+
+
+# --- throttling middleware ---------------------------------------------------
+
+def _throttling_factory(limit: float):
+    def factory():
+        from middlewares.throttling import ThrottlingMiddleware
+        bot = Bot(token="123456:BENCHMARK-TOKEN")
+        FakeTelegramApi().install(bot)
+        dispatcher = Dispatcher(bot, storage=MemoryStorage())
+        Bot.set_current(bot)
+        Dispatcher.set_current(dispatcher)
+        middleware = ThrottlingMiddleware(limit=limit)
+        message = _message()
+        types.User.set_current(message.from_user)
+        types.Chat.set_current(message.chat)
+
+        async def handler(message):
+            pass
+
+        current_handler.set(handler)
+
+        async def run():
+            try:
+                await middleware.on_process_message(message, {})
+            except CancelHandler:
+                pass
+
+        return run
+    return factory
+
+
+bench("throttling.pass")(_throttling_factory(0))
+bench("throttling.throttled")(_throttling_factory(3600))
+
+
+# --- bulk import validation --------------------------------------------------
+
+def _validation_factory(vectorized: bool, rows: int = 10000):
+    def factory():
+        import random
+        from data.predefined_lists import colors, nationalities
+        from utils import batch_validation
+        rng = random.Random(0)
+        columns = {
+            "gender": [rng.choice(["male", "Female"]) for _ in range(rows)],
+            "age": [str(rng.randint(5, 105)) for _ in range(rows)],
+            # Every 20th nationality carries a typo, so the fuzzy fallback is exercised
+            "nationality": [rng.choice(nationalities) + ("k" if i % 20 == 0 else "") for i in range(rows)],
+            "education": [rng.choice(["higher", "school"]) for _ in range(rows)],
+            "eye color": [rng.choice(colors) for _ in range(rows)],
+            "hair color": [rng.choice(colors) for _ in range(rows)],
+            "height": [str(rng.randint(40, 260)) for _ in range(rows)],
+        }
+        if vectorized and not batch_validation._load_numpy():
+            return None  # NumPy is not installed
+        validate = batch_validation._validate_columns if vectorized else batch_validation._validate_rows
+        return lambda: validate("Humans", columns, rows)
+    return factory
+
+
+bench("validation.rows_10k")(_validation_factory(vectorized=False))
+bench("validation.columns_10k")(_validation_factory(vectorized=True))
+
+
+# --- runner ------------------------------------------------------------------
+
+def _calibrate(run, is_async: bool, loop, target: float) -> int:
+    iterations = 1
+    while True:
+        elapsed = _time(run, is_async, loop, iterations)
+        if elapsed >= target or iterations >= 1_000_000:
+            return iterations
+        iterations = min(iterations * max(2, int(target / max(elapsed, 1e-9))), 1_000_000)
+
+
+def _time(run, is_async: bool, loop, iterations: int) -> float:
+    if is_async:
+        async def repeat():
+            for _ in range(iterations):
+                await run()
+        started = time.perf_counter()
+        loop.run_until_complete(repeat())
+        return time.perf_counter() - started
+    started = time.perf_counter()
+    for _ in range(iterations):
+        run()
+    return time.perf_counter() - started
+
+
+def run_benchmarks(selector: str = None, rounds: int = 5, round_time: float = 0.1) -> dict:
+    loop = asyncio.get_event_loop()
+    results = []
+    for name, factory in BENCHMARKS:
+        if selector and selector not in name:
+            continue
+        run = factory()
+        if run is None:
+            continue
+        is_async = inspect.iscoroutinefunction(run)
+        iterations = _calibrate(run, is_async, loop, round_time)
+        timings = [_time(run, is_async, loop, iterations) / iterations for _ in range(rounds)]
+        mean = statistics.mean(timings)
+        results.append({
+            "name": name,
+            "stats": {
+                "min": min(timings),
+                "max": max(timings),
+                "mean": mean,
+                "median": statistics.median(timings),
+                "stddev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+                "rounds": rounds,
+                "iterations": iterations,
+                "ops": 1 / mean if mean else 0.0,
+            },
+        })
+    return {
+        "machine_info": {"python": platform.python_version(), "platform": platform.platform(),
+                         "processor": platform.processor()},
+        "datetime": datetime.datetime.now().isoformat(),
+        "benchmarks": results,
+    }
+
+
+def print_results(report: dict, baseline: dict = None):
+    previous = {item["name"]: item["stats"] for item in (baseline or {}).get("benchmarks", [])}
+    header = f"{'benchmark':<40}{'median us':>12}{'min us':>12}{'stddev us':>12}{'ops/s':>14}"
+    print(header + (f"{'vs base':>10}" if previous else ""))
+    for item in report["benchmarks"]:
+        stats = item["stats"]
+        line = (f"{item['name']:<40}{stats['median'] * 1e6:>12.2f}{stats['min'] * 1e6:>12.2f}"
+                f"{stats['stddev'] * 1e6:>12.2f}{stats['ops']:>14.0f}")
+        if item["name"] in previous:
+            line += f"{previous[item['name']]['median'] / stats['median']:>9.2f}x"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the hot path microbenchmarks.")
+    parser.add_argument("-k", dest="selector", help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--round-time", type=float, default=0.1, help="Target duration of one round, in seconds")
+    parser.add_argument("--json", dest="json_path", help="Save the results to this JSON file")
+    parser.add_argument("--compare", help="Previous JSON results to compare against")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.selector, args.rounds, args.round_time)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+    print_results(report, baseline)
+    if args.json_path:
+        with open(args.json_path, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+"""
+Synthetic concurrent-user load generator for the classification wizards.
+
+Every simulated user walks a whole wizard (Human, Animal or Alien) by feeding
+synthetic updates straight into ``dp.process_update``. Bot API calls and Google
+Sheets are served by in-process fakes, so no network is needed.
+
+Usage:
+    python -m benchmarks.load_test --users 60 --think-time 0.3
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+
+from aiogram import Bot, Dispatcher, types
+from aiogram.dispatcher.middlewares import BaseMiddleware
+
+from benchmarks.fakes import BOT_USER, FakeSheetsClient, FakeTelegramApi
+
+# Wizard scripts: (step label, update kind, payload). Typos, edits and retries are
+# part of the scripts on purpose, they are what real users do.
+SCENARIOS = {
+    "human": [
+        ("classify", "text", "/classify"),
+        ("type", "callback", "human"),
+        ("gender", "callback", "gender_male"),
+        ("age_typo", "text", "2O"),
+        ("age", "text", "27"),
+        ("nationality", "text", "Uzbekk"),
+        ("nationality_pick", "callback", "nationality_0"),
+        ("education", "callback", "education_higher"),
+        ("eye_color", "text", "Bleu"),
+        ("eye_color_pick", "callback", "color_0"),
+        ("hair_color", "text", "Blak"),
+        ("hair_color_pick", "callback", "color_0"),
+        ("height", "text", "180"),
+        ("edit", "callback", "edit_data"),
+        ("edit_height", "callback", "edit_height"),
+        ("height_again", "text", "181"),
+        ("submit", "callback", "submit_data"),
+    ],
+    "animal": [
+        ("classify", "text", "/classify"),
+        ("type", "callback", "animal"),
+        ("species", "text", "Dgo"),
+        ("species_pick", "callback", "animal_0"),
+        ("mammal", "callback", "mammal_yes"),
+        ("predator", "callback", "predator_no"),
+        ("color", "text", "Brwn"),
+        ("color_pick", "callback", "color_0"),
+        ("weight_typo", "text", "3o"),
+        ("weight", "text", "30"),
+        ("age", "text", "24"),
+        ("edit", "callback", "edit_animal_data"),
+        ("edit_weight", "callback", "edit_animal_5"),
+        ("weight_again", "text", "31"),
+        ("age_again", "text", "24"),
+        ("submit", "callback", "submit_animal_data"),
+    ],
+    "alien": [
+        ("classify", "text", "/classify"),
+        ("type", "callback", "alien"),
+        ("humanoid", "callback", "humanoid_yes"),
+        ("race_typo", "text", "q"),
+        ("race", "text", "x"),
+        ("skin_color", "text", "green"),
+        ("dangerous", "callback", "dangerous_no"),
+        ("reason", "callback", "reason_yes"),
+        ("weight", "text", "70"),
+        ("edit", "callback", "edit_alien_data"),
+        ("edit_weight", "callback", "edit_weight"),
+        ("weight_again", "text", "75"),
+        ("submit", "callback", "submit_alien_data"),
+    ],
+    "alien_no": [
+        ("classify", "text", "/classify"),
+        ("type", "callback", "alien"),
+        ("humanoid", "callback", "humanoid_no"),
+        ("edit", "callback", "edit_alien_data_no"),
+        ("humanoid_again", "callback", "humanoid_no"),
+        ("submit", "callback", "submit_alien_data_no"),
+    ],
+}
+
+BASE_USER_ID = 10_000_000
+
+# Worksheet each wizard appends to
+WORKSHEETS = {"human": "Humans", "animal": "Animals", "alien": "Aliens", "alien_no": "Aliens"}
+
+
+def percentile(values: list, pct: float) -> float:
+    """
+    Nearest-rank percentile of a list of numbers.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(values: list) -> dict:
+    """
+    Count and p50/p95/p99 of latencies given in seconds, reported in milliseconds.
+    """
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+    }
+
+
+class UpdateFactory:
+    """
+    Build raw Telegram updates for simulated users.
+    """
+
+    def __init__(self, api: FakeTelegramApi):
+        self.api = api
+        self._update_ids = itertools.count(1)
+
+    @staticmethod
+    def user(user_id: int) -> dict:
+        return {"id": user_id, "is_bot": False, "first_name": f"User{user_id - BASE_USER_ID}"}
+
+    @staticmethod
+    def chat(user_id: int) -> dict:
+        return {"id": user_id, "type": "private", "first_name": f"User{user_id - BASE_USER_ID}"}
+
+    def text(self, user_id: int, text: str) -> types.Update:
+        return types.Update.to_object({
+            "update_id": next(self._update_ids),
+            "message": {
+                "message_id": self.api.next_message_id(),
+                "date": int(time.time()),
+                "chat": self.chat(user_id),
+                "from": self.user(user_id),
+                "text": text,
+            },
+        })
+
+    def callback(self, user_id: int, data: str) -> types.Update:
+        update_id = next(self._update_ids)
+        return types.Update.to_object({
+            "update_id": update_id,
+            "callback_query": {
+                "id": str(update_id),
+                "from": self.user(user_id),
+                "chat_instance": str(user_id),
+                "data": data,
+                "message": {
+                    "message_id": self.api.last_message_id(user_id),
+                    "date": int(time.time()),
+                    "chat": self.chat(user_id),
+                    "from": dict(BOT_USER),
+                    "text": "",
+                },
+            },
+        })
+
+    def build(self, user_id: int, kind: str, payload: str) -> types.Update:
+        return self.callback(user_id, payload) if kind == "callback" else self.text(user_id, payload)
+
+
+class ErrorProbe(BaseMiddleware):
+    """
+    Remember the updates whose handler raised, including the exceptions that
+    errors_handler swallows.
+    """
+
+    def __init__(self):
+        self.failed = set()
+        super(ErrorProbe, self).__init__()
+
+    async def on_pre_process_error(self, update: types.Update, exception: BaseException, data: dict):
+        self.failed.add(update.update_id)
+
+
+class LoadStats:
+    """
+    Collect per-step and end-to-end latencies, and the wizards that did not finish.
+    """
+
+    def __init__(self):
+        self.steps = {}
+        self.wizards = {}
+        self.updates = 0
+        self.errors = 0
+        self.incomplete = {}
+
+    def add_incomplete(self, flow: str, reason: str):
+        key = f"{flow}.{reason}"
+        self.incomplete[key] = self.incomplete.get(key, 0) + 1
+
+    def add_step(self, flow: str, label: str, elapsed: float):
+        self.steps.setdefault((flow, label), []).append(elapsed)
+        self.updates += 1
+
+    def add_wizard(self, flow: str, elapsed: float):
+        self.wizards.setdefault(flow, []).append(elapsed)
+
+    def report(self, duration: float, api: FakeTelegramApi, group_id) -> dict:
+        return {
+            "duration_s": round(duration, 3),
+            "updates": self.updates,
+            "errors": self.errors,
+            "incomplete": dict(self.incomplete),
+            "group_posts": api.sent_to(group_id),
+            "sheet_rows": {title: len(rows) - 1 for title, rows in FakeSheetsClient.worksheets.items()},
+            "throughput_updates_per_s": round(self.updates / duration, 2) if duration else 0.0,
+            "wizards_per_s": round(sum(map(len, self.wizards.values())) / duration, 3) if duration else 0.0,
+            "steps": {f"{flow}.{label}": summarize(values) for (flow, label), values in self.steps.items()},
+            "wizards": {flow: summarize(values) for flow, values in self.wizards.items()},
+            "api_calls": api.call_counts(),
+        }
+
+
+async def simulate_user(dp: Dispatcher, factory: UpdateFactory, stats: LoadStats, probe: ErrorProbe,
+                        user_id: int, flow: str, think_time: float, rng: random.Random):
+    """
+    Walk one wizard end to end for a single user, then check that it reached its
+    summary (a Submit button) and that the submit appended a row to the sheet.
+    """
+    started = time.perf_counter()
+    for label, kind, payload in SCENARIOS[flow]:
+        if label == "submit" and f'"{payload}"' not in (factory.api.last_markup(user_id) or ""):
+            stats.add_incomplete(flow, "no_summary")
+        update = factory.build(user_id, kind, payload)
+        step_started = time.perf_counter()
+        try:
+            # Own task per update, like the dispatcher does: aiogram caches the FSM state per context
+            await asyncio.create_task(dp.process_update(update))
+        except Exception:
+            probe.failed.add(update.update_id)
+        if update.update_id in probe.failed:
+            stats.errors += 1
+        stats.add_step(flow, label, time.perf_counter() - step_started)
+        if think_time:
+            # Jitter the think time so users do not move in lockstep
+            await asyncio.sleep(think_time * rng.uniform(0.5, 1.5))
+    stats.add_wizard(flow, time.perf_counter() - started)
+
+    initiator = UpdateFactory.user(user_id)["first_name"]
+    if not any(row[2] == initiator for row in FakeSheetsClient.worksheets.get(WORKSHEETS[flow], [])):
+        stats.add_incomplete(flow, "not_saved")
+
+
+def setup_dispatcher(api: FakeTelegramApi):
+    """
+    Import the bot exactly like app.py does and wire it to the fakes.
+    """
+    from loader import bot, dp
+    import middlewares, filters, handlers  # noqa: F401  (registers handlers)
+    from utils.db_api.google_sheets import use_sheets_client
+    from utils.submit_queue import submit_queue
+
+    use_sheets_client(FakeSheetsClient())
+    api.install(bot)
+    Bot.set_current(bot)
+    Dispatcher.set_current(dp)
+    submit_queue.start(bot)
+    return dp
+
+
+async def run(users: int, flows: list, think_time: float, api_latency: float,
+              sheets_latency: float, seed: int) -> dict:
+    api = FakeTelegramApi(latency=api_latency)
+    FakeSheetsClient.latency = sheets_latency
+    dp = setup_dispatcher(api)
+    factory = UpdateFactory(api)
+    stats = LoadStats()
+    rng = random.Random(seed)
+
+    probe = ErrorProbe()
+    dp.middleware.setup(probe)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        simulate_user(dp, factory, stats, probe, BASE_USER_ID + i, flows[i % len(flows)], think_time, rng)
+        for i in range(users)
+    ))
+    from data.config import GROUP_ID
+    from utils.submit_queue import submit_queue
+    await submit_queue.join()
+    duration = time.perf_counter() - started
+
+    # Every wizard ends with a submit: one group post and one row in its worksheet each
+    expected_rows = {}
+    for i in range(users):
+        worksheet_name = WORKSHEETS[flows[i % len(flows)]]
+        expected_rows[worksheet_name] = expected_rows.get(worksheet_name, 0) + 1
+    missing_posts = users - api.sent_to(GROUP_ID)
+    if missing_posts > 0:
+        stats.incomplete["group.not_posted"] = missing_posts
+    for worksheet_name, expected in expected_rows.items():
+        missing_rows = expected - (len(FakeSheetsClient.worksheets.get(worksheet_name, [])) - 1)
+        if missing_rows > 0:
+            stats.incomplete[f"{worksheet_name}.missing_rows"] = missing_rows
+    return stats.report(duration, api, GROUP_ID)
+
+
+def print_report(report: dict):
+    print(f"Duration: {report['duration_s']} s, updates: {report['updates']}, errors: {report['errors']}")
+    print(f"Group posts: {report['group_posts']}, sheet rows: "
+          + ", ".join(f"{title}={count}" for title, count in report["sheet_rows"].items()))
+    if report["incomplete"]:
+        print("Incomplete wizards:", ", ".join(f"{key}={count}" for key, count in report["incomplete"].items()))
+    print(f"Throughput: {report['throughput_updates_per_s']} updates/s, {report['wizards_per_s']} wizards/s")
+    print()
+    print(f"{'step':<32}{'count':>8}{'p50 ms':>12}{'p95 ms':>12}{'p99 ms':>12}")
+    for name, row in list(report["steps"].items()) + [(f"{k} (wizard)", v) for k, v in report["wizards"].items()]:
+        print(f"{name:<32}{row['count']:>8}{row['p50_ms']:>12}{row['p95_ms']:>12}{row['p99_ms']:>12}")
+    print()
+    print("Bot API calls:", ", ".join(f"{method}={count}" for method, count in sorted(report["api_calls"].items())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent users walking the classification wizards.")
+    parser.add_argument("--users", type=int, default=30, help="Number of concurrent simulated users")
+    parser.add_argument("--flows", default="human,animal,alien,alien_no", help="Comma separated wizards to run")
+    parser.add_argument("--think-time", type=float, default=0.3, help="Mean pause between steps, in seconds")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="Simulated Bot API latency, in seconds")
+    parser.add_argument("--sheets-latency", type=float, default=0.0, help="Simulated Sheets latency, in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    flows = [flow.strip() for flow in args.flows.split(",") if flow.strip()]
+    unknown = set(flows) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown flows: {', '.join(sorted(unknown))}")
+
+    report = asyncio.run(run(args.users, flows, args.think_time, args.api_latency,
+                             args.sheets_latency, args.seed))
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, "w") as file:
+            json.dump(report, file, indent=2)
+    if report["errors"] or report["incomplete"]:
+        raise SystemExit("Load test failed: some updates raised or some wizards were not saved")
+
+
+if __name__ == "__main__":
+    main()
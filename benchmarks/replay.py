@@ -0,0 +1,168 @@
+"""
+Deterministic replay of captured production traffic.
+
+Feeds a log written by TrafficCaptureMiddleware (TRAFFIC_CAPTURE_FILE) back
+through the dispatcher with the Bot API and Sheets faked out, and reports
+per-handler latency and outgoing call counts. Run it on two builds and compare
+the reports.
+
+Usage:
+    python -m benchmarks.replay traffic.log --speed 1 --json base.json   # original timing
+    python -m benchmarks.replay traffic.log --speed 10 --json new.json   # 10x faster
+    python -m benchmarks.replay traffic.log --speed 0                    # as fast as possible
+    python -m benchmarks.replay --compare base.json new.json
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from aiogram import types
+from aiogram.dispatcher.handler import current_handler
+from aiogram.dispatcher.middlewares import BaseMiddleware
+
+from benchmarks.fakes import FakeSheetsClient, FakeTelegramApi
+from benchmarks.load_test import ErrorProbe, setup_dispatcher, summarize
+from utils.misc.traffic_log import read_traffic_log
+from utils.submit_queue import submit_queue
+
+
+class HandlerProbe(BaseMiddleware):
+    """
+    Remember which handler processed each update.
+    """
+
+    def __init__(self):
+        self.handlers = {}
+        super(HandlerProbe, self).__init__()
+
+    def _remember(self):
+        handler = current_handler.get()
+        update = types.Update.get_current()
+        if handler and update:
+            self.handlers[update.update_id] = handler.__name__
+
+    async def on_process_message(self, message: types.Message, data: dict):
+        self._remember()
+
+    async def on_process_callback_query(self, call: types.CallbackQuery, data: dict):
+        self._remember()
+
+    async def on_process_inline_query(self, query: types.InlineQuery, data: dict):
+        self._remember()
+
+
+def update_owner(raw: dict):
+    """
+    Key used to keep the updates of one user in their original order.
+    """
+    for value in raw.values():
+        if isinstance(value, dict) and isinstance(value.get("from"), dict):
+            return value["from"].get("id")
+    return None
+
+
+async def replay(path: str, speed: float) -> dict:
+    api = FakeTelegramApi()
+    dp = setup_dispatcher(api)
+    probe = HandlerProbe()
+    dp.middleware.setup(probe)
+    error_probe = ErrorProbe()
+    dp.middleware.setup(error_probe)
+
+    latencies = {}
+    errors = 0
+    last_task = {}
+    tasks = []
+
+    async def process(raw: dict, previous):
+        nonlocal errors
+        if previous is not None:
+            await previous
+        update = types.Update.to_object(raw)
+        started = time.perf_counter()
+        try:
+            await dp.process_update(update)
+        except Exception:
+            error_probe.failed.add(update.update_id)
+        if update.update_id in error_probe.failed:
+            errors += 1
+        elapsed = time.perf_counter() - started
+        latencies.setdefault(probe.handlers.pop(update.update_id, "unhandled"), []).append(elapsed)
+
+    records = list(read_traffic_log(path))
+    started = time.perf_counter()
+    first_timestamp = records[0][0] if records else 0.0
+    for timestamp, raw in records:
+        if speed:
+            delay = (timestamp - first_timestamp) / speed - (time.perf_counter() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        owner = update_owner(raw)
+        task = asyncio.ensure_future(process(raw, last_task.get(owner)))
+        last_task[owner] = task
+        tasks.append(task)
+    await asyncio.gather(*tasks)
+    await submit_queue.join()
+    duration = time.perf_counter() - started
+
+    return {
+        "log": path,
+        "speed": speed,
+        "updates": len(records),
+        "errors": errors,
+        "duration_s": round(duration, 3),
+        "handlers": {name: summarize(values) for name, values in sorted(latencies.items())},
+        "api_calls": api.call_counts(),
+        "sheets_calls": dict(FakeSheetsClient.calls),
+    }
+
+
+def _delta(before: float, after: float) -> str:
+    if not before:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def compare(base: dict, new: dict):
+    print(f"{'handler':<36}{'count':>8}{'base p50':>11}{'new p50':>11}{'delta':>9}"
+          f"{'base p95':>11}{'new p95':>11}{'delta':>9}")
+    for name in sorted(set(base["handlers"]) | set(new["handlers"])):
+        before = base["handlers"].get(name, {"count": 0, "p50_ms": 0.0, "p95_ms": 0.0})
+        after = new["handlers"].get(name, {"count": 0, "p50_ms": 0.0, "p95_ms": 0.0})
+        print(f"{name:<36}{after['count']:>8}{before['p50_ms']:>11}{after['p50_ms']:>11}"
+              f"{_delta(before['p50_ms'], after['p50_ms']):>9}{before['p95_ms']:>11}{after['p95_ms']:>11}"
+              f"{_delta(before['p95_ms'], after['p95_ms']):>9}")
+    print()
+    for label, key in (("Bot API calls", "api_calls"), ("Sheets calls", "sheets_calls")):
+        print(label)
+        for method in sorted(set(base[key]) | set(new[key])):
+            before, after = base[key].get(method, 0), new[key].get(method, 0)
+            print(f"  {method:<34}{before:>8}{after:>8}{_delta(before, after):>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay captured updates through the dispatcher.")
+    parser.add_argument("log", nargs="?", help="Traffic log written by TrafficCaptureMiddleware")
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="Replay speed: 1 = original timing, N = N times faster, 0 = as fast as possible")
+    parser.add_argument("--json", dest="json_path", help="Write the report to this JSON file")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="Compare two saved reports")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as base, open(args.compare[1]) as new:
+            compare(json.load(base), json.load(new))
+        return
+    if not args.log:
+        parser.error("a traffic log is required unless --compare is used")
+
+    report = asyncio.run(replay(args.log, args.speed))
+    print(json.dumps(report, indent=2))
+    if args.json_path:
+        with open(args.json_path, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
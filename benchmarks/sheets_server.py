@@ -0,0 +1,347 @@
+"""
+Local stand-in for the Google Sheets and Drive REST endpoints used by gspread.
+
+Serves open-by-name (Drive files list), spreadsheet/worksheet metadata, values
+get/batchGet, values append and batchUpdate on top of a SQLite table. Latency
+grows with the response size and a per-minute read/write quota answers with
+429 RESOURCE_EXHAUSTED once exceeded, like the real API.
+
+Point the bot at it with ``SHEETS_API_SERVER=http://127.0.0.1:8082`` in .env.
+
+Usage:
+    python -m benchmarks.sheets_server --port 8082 --latency 0.15 --per-kb 0.002 --read-quota 60
+"""
+import argparse
+import asyncio
+import json
+import re
+import sqlite3
+import time
+from collections import deque
+
+from aiohttp import web
+
+from benchmarks.fakes import WORKSHEET_HEADERS
+
+SPREADSHEET_ID = "local-being-classification"
+SPREADSHEET_NAME = "Being Classification Data"
+NAME_QUERY_RE = re.compile(r"name\s*=\s*([\"'])(.*?)\1")
+CELL_RE = re.compile(r"^([A-Za-z]*)(\d*)$")
+
+
+def column_index(letters: str) -> int:
+    """
+    Convert column letters to a 1-based index (A -> 1, AA -> 27).
+    """
+    index = 0
+    for char in letters.upper():
+        index = index * 26 + ord(char) - ord("A") + 1
+    return index
+
+
+def column_letters(index: int) -> str:
+    letters = ""
+    while index > 0:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+def parse_range(label: str):
+    """
+    Split an A1 range like ``'Humans'!A2:K`` into the sheet title and 1-based bounds.
+    :return: (title, first_row, last_row, first_col, last_col); missing bounds are None.
+    """
+    title, _, cells = label.rpartition("!") if "!" in label else (label, "", "")
+    title = title.strip()
+    if title.startswith("'") and title.endswith("'"):
+        title = title[1:-1].replace("''", "'")
+    if not cells:
+        return title, None, None, None, None
+
+    start, _, end = cells.partition(":")
+    start_col, start_row = CELL_RE.match(start).groups()
+    end_col, end_row = CELL_RE.match(end).groups() if end else (start_col, start_row)
+    return (
+        title,
+        int(start_row) if start_row else None,
+        int(end_row) if end_row else None,
+        column_index(start_col) if start_col else None,
+        column_index(end_col) if end_col else None,
+    )
+
+
+class SheetsStore:
+    """
+    Worksheets of one spreadsheet kept in a SQLite table (one JSON row per sheet row).
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.db = sqlite3.connect(path)
+        self.db.execute("CREATE TABLE IF NOT EXISTS sheets (sheet_id INTEGER PRIMARY KEY, title TEXT UNIQUE)")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS sheet_rows ("
+            "sheet_id INTEGER, row_no INTEGER, cells TEXT, PRIMARY KEY (sheet_id, row_no))"
+        )
+        self.db.commit()
+
+    def add_sheet(self, title: str, header: list = None) -> int:
+        existing = self.sheet_id(title)
+        if existing is not None:
+            return existing
+        cursor = self.db.execute("INSERT INTO sheets (title) VALUES (?)", (title,))
+        if header:
+            self.append(cursor.lastrowid, [header])
+        self.db.commit()
+        return cursor.lastrowid
+
+    def sheet_id(self, title: str):
+        row = self.db.execute("SELECT sheet_id FROM sheets WHERE title = ?", (title,)).fetchone()
+        return row[0] if row else None
+
+    def sheets(self) -> list:
+        return self.db.execute("SELECT sheet_id, title FROM sheets ORDER BY sheet_id").fetchall()
+
+    def row_count(self, sheet_id: int) -> int:
+        return self.db.execute("SELECT COALESCE(MAX(row_no), 0) FROM sheet_rows WHERE sheet_id = ?",
+                               (sheet_id,)).fetchone()[0]
+
+    def append(self, sheet_id: int, rows: list) -> tuple:
+        """
+        Append rows after the last one.
+        :return: (first_row, last_row) written.
+        """
+        first_row = self.row_count(sheet_id) + 1
+        self.db.executemany(
+            "INSERT INTO sheet_rows (sheet_id, row_no, cells) VALUES (?, ?, ?)",
+            [(sheet_id, first_row + i, json.dumps([str(value) for value in row])) for i, row in enumerate(rows)],
+        )
+        self.db.commit()
+        return first_row, first_row + len(rows) - 1
+
+    def values(self, sheet_id: int, first_row=None, last_row=None, first_col=None, last_col=None) -> list:
+        cursor = self.db.execute(
+            "SELECT cells FROM sheet_rows WHERE sheet_id = ? AND row_no BETWEEN ? AND ? ORDER BY row_no",
+            (sheet_id, first_row or 1, last_row or 2 ** 31),
+        )
+        start = (first_col or 1) - 1
+        end = last_col if last_col else None
+        return [json.loads(cells)[start:end] for (cells,) in cursor]
+
+
+class FakeSheetsServer:
+    """
+    aiohttp application imitating sheets.googleapis.com and the Drive files list.
+    """
+
+    def __init__(self, store: SheetsStore = None, latency: float = 0.0, per_kb: float = 0.0,
+                 read_quota: int = 0, write_quota: int = 0):
+        """
+        :param store: Backing store; an in-memory one with the three worksheets by default.
+        :param latency: Base delay of every response, in seconds.
+        :param per_kb: Extra delay per KiB of response body, in seconds.
+        :param read_quota: Read requests allowed per minute; 0 disables the quota.
+        :param write_quota: Write requests allowed per minute; 0 disables the quota.
+        """
+        if store is None:
+            store = SheetsStore()
+            for title, header in WORKSHEET_HEADERS.items():
+                store.add_sheet(title, header)
+        self.store = store
+        self.latency = latency
+        self.per_kb = per_kb
+        self.quotas = {"read": read_quota, "write": write_quota}
+        self.windows = {"read": deque(), "write": deque()}
+        self.calls = []
+        self._runner = None
+
+    def _over_quota(self, kind: str) -> bool:
+        limit = self.quotas[kind]
+        if not limit:
+            return False
+        now = time.monotonic()
+        window = self.windows[kind]
+        while window and now - window[0] > 60:
+            window.popleft()
+        if len(window) >= limit:
+            return True
+        window.append(now)
+        return False
+
+    async def _respond(self, body: dict, status: int = 200) -> web.Response:
+        text = json.dumps(body)
+        delay = self.latency + len(text) / 1024 * self.per_kb
+        if delay:
+            await asyncio.sleep(delay)
+        return web.Response(text=text, status=status, content_type="application/json")
+
+    def _error(self, code: int, status: str, message: str) -> web.Response:
+        body = {"error": {"code": code, "message": message, "status": status}}
+        return web.json_response(body, status=code)
+
+    def _metadata(self) -> dict:
+        sheets = []
+        for index, (sheet_id, title) in enumerate(self.store.sheets()):
+            sheets.append({"properties": {
+                "sheetId": sheet_id,
+                "title": title,
+                "index": index,
+                "sheetType": "GRID",
+                "gridProperties": {"rowCount": max(self.store.row_count(sheet_id), 1000), "columnCount": 26},
+            }})
+        return {
+            "spreadsheetId": SPREADSHEET_ID,
+            "properties": {"title": SPREADSHEET_NAME, "locale": "en_US", "timeZone": "Etc/GMT"},
+            "sheets": sheets,
+        }
+
+    def _value_range(self, label: str):
+        title, first_row, last_row, first_col, last_col = parse_range(label)
+        sheet_id = self.store.sheet_id(title)
+        if sheet_id is None:
+            return None
+        values = self.store.values(sheet_id, first_row, last_row, first_col, last_col)
+        width = max((len(row) for row in values), default=1)
+        start_col = first_col or 1
+        start_row = first_row or 1
+        end_row = start_row + max(len(values), 1) - 1
+        a1 = f"{column_letters(start_col)}{start_row}:{column_letters(start_col + width - 1)}{end_row}"
+        body = {"range": f"'{title}'!{a1}", "majorDimension": "ROWS"}
+        if values:
+            body["values"] = values
+        return body
+
+    # --- Drive -----------------------------------------------------------------
+
+    async def list_files(self, request: web.Request) -> web.Response:
+        self.calls.append({"endpoint": "files.list", "time": time.time()})
+        if self._over_quota("read"):
+            return self._error(429, "RESOURCE_EXHAUSTED", "Quota exceeded for quota metric 'Queries'")
+        match = NAME_QUERY_RE.search(request.query.get("q", ""))
+        files = []
+        if match is None or match.group(2) == SPREADSHEET_NAME:
+            files.append({"kind": "drive#file", "id": SPREADSHEET_ID, "name": SPREADSHEET_NAME,
+                          "mimeType": "application/vnd.google-apps.spreadsheet"})
+        return await self._respond({"kind": "drive#fileList", "files": files})
+
+    # --- Sheets ----------------------------------------------------------------
+
+    async def spreadsheets(self, request: web.Request) -> web.Response:
+        tail = request.match_info["tail"]
+        spreadsheet_id, _, rest = tail.partition("/")
+        spreadsheet_id, _, action = spreadsheet_id.partition(":")
+        if spreadsheet_id != SPREADSHEET_ID:
+            return self._error(404, "NOT_FOUND", "Requested entity was not found.")
+
+        if request.method == "GET":
+            kind = "read"
+        else:
+            kind = "write"
+        self.calls.append({"endpoint": action or rest.split(":")[-1] or "get", "method": request.method,
+                           "path": request.path, "time": time.time()})
+        if self._over_quota(kind):
+            return self._error(429, "RESOURCE_EXHAUSTED",
+                               f"Quota exceeded for quota metric '{kind.capitalize()} requests' "
+                               f"and limit '{kind.capitalize()} requests per minute per user'")
+
+        if action == "batchUpdate":
+            return await self._batch_update(await request.json())
+        if not rest:
+            return await self._respond(self._metadata())
+        if rest == "values:batchGet":
+            ranges = request.query.getall("ranges", [])
+            value_ranges = [self._value_range(label) for label in ranges]
+            if None in value_ranges:
+                return self._error(400, "INVALID_ARGUMENT", "Unable to parse range")
+            return await self._respond({"spreadsheetId": SPREADSHEET_ID, "valueRanges": value_ranges})
+        if rest.startswith("values/"):
+            label = rest[len("values/"):]
+            if label.endswith(":append"):
+                return await self._append(label[:-len(":append")], await request.json())
+            body = self._value_range(label)
+            if body is None:
+                return self._error(400, "INVALID_ARGUMENT", f"Unable to parse range: {label}")
+            return await self._respond(body)
+        return self._error(404, "NOT_FOUND", "Unknown endpoint")
+
+    async def _append(self, label: str, payload: dict) -> web.Response:
+        title = parse_range(label)[0]
+        sheet_id = self.store.sheet_id(title)
+        if sheet_id is None:
+            return self._error(400, "INVALID_ARGUMENT", f"Unable to parse range: {label}")
+        rows = payload.get("values", [])
+        first_row, last_row = self.store.append(sheet_id, rows)
+        width = max((len(row) for row in rows), default=1)
+        updated = f"'{title}'!A{first_row}:{column_letters(width)}{last_row}"
+        return await self._respond({
+            "spreadsheetId": SPREADSHEET_ID,
+            "tableRange": f"'{title}'!A1:{column_letters(width)}{first_row - 1}",
+            "updates": {
+                "spreadsheetId": SPREADSHEET_ID,
+                "updatedRange": updated,
+                "updatedRows": len(rows),
+                "updatedColumns": width,
+                "updatedCells": sum(len(row) for row in rows),
+            },
+        })
+
+    async def _batch_update(self, payload: dict) -> web.Response:
+        replies = []
+        for item in payload.get("requests", []):
+            if "addSheet" in item:
+                title = item["addSheet"].get("properties", {}).get("title", f"Sheet{len(self.store.sheets()) + 1}")
+                sheet_id = self.store.add_sheet(title)
+                replies.append({"addSheet": {"properties": {"sheetId": sheet_id, "title": title}}})
+            else:
+                # Formatting, resizing and similar requests do not change stored values
+                replies.append({})
+        return await self._respond({"spreadsheetId": SPREADSHEET_ID, "replies": replies})
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/drive/v3/files", self.list_files)
+        app.router.add_route("*", "/v4/spreadsheets/{tail:.+}", self.spreadsheets)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8082) -> str:
+        """
+        Start serving in the running event loop.
+        :return: Base URL to use as SHEETS_API_SERVER.
+        """
+        self._runner = web.AppRunner(self.make_app())
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        return f"http://{host}:{port}"
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local Google Sheets API stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8082)
+    parser.add_argument("--db", default=":memory:", help="SQLite file backing the worksheets")
+    parser.add_argument("--latency", type=float, default=0.0, help="Base response delay, in seconds")
+    parser.add_argument("--per-kb", type=float, default=0.0, help="Extra delay per KiB of response, in seconds")
+    parser.add_argument("--read-quota", type=int, default=0, help="Read requests per minute (0 = unlimited)")
+    parser.add_argument("--write-quota", type=int, default=0, help="Write requests per minute (0 = unlimited)")
+    parser.add_argument("--seed-rows", type=int, default=0, help="Synthetic rows to prefill each worksheet with")
+    args = parser.parse_args()
+
+    store = SheetsStore(args.db)
+    for title, header in WORKSHEET_HEADERS.items():
+        sheet_id = store.add_sheet(title, header)
+        if args.seed_rows and store.row_count(sheet_id) <= 1:
+            store.append(sheet_id, [[i, 1_700_000_000 + i, "Seed"] + ["x"] * (len(header) - 3)
+                                    for i in range(1, args.seed_rows + 1)])
+
+    server = FakeSheetsServer(store, latency=args.latency, per_kb=args.per_kb,
+                              read_quota=args.read_quota, write_quota=args.write_quota)
+    web.run_app(server.make_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Local stand-in for the Telegram Bot API, for benchmarks and tests.
+
+Implements the methods the bot uses (sendMessage, editMessageText,
+editMessageReplyMarkup, deleteMessage, answerCallbackQuery, setMyCommands,
+getUpdates) with configurable latency, injected 429 ``retry_after`` errors and
+a per-chat flood limit. Every call is recorded.
+
+Point the bot at it with ``BOT_API_SERVER=http://127.0.0.1:8081`` in .env.
+
+Usage:
+    python -m benchmarks.telegram_server --port 8081 --latency 0.05 --flood-limit 20
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from collections import deque
+
+from aiohttp import web
+
+from benchmarks.fakes import build_result
+
+SUPPORTED_METHODS = {
+    "getMe", "getUpdates", "sendMessage", "sendDocument", "editMessageText", "editMessageReplyMarkup",
+    "deleteMessage", "answerCallbackQuery", "answerInlineQuery", "setMyCommands", "deleteWebhook",
+}
+
+# Methods that count against the per-chat flood limit
+FLOOD_METHODS = {"sendMessage", "sendDocument", "editMessageText", "editMessageReplyMarkup"}
+
+
+class FakeBotApiServer:
+    """
+    aiohttp application serving ``/bot<token>/<method>`` like api.telegram.org.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, retry_after_rate: float = 0.0,
+                 retry_after: int = 1, flood_limit: int = 0, flood_window: float = 1.0, seed: int = None):
+        """
+        :param latency: Base delay of every response, in seconds.
+        :param jitter: Extra random delay up to this many seconds.
+        :param retry_after_rate: Probability (0..1) of answering any call with a 429.
+        :param retry_after: ``retry_after`` value sent with injected 429 errors.
+        :param flood_limit: Max sending calls per chat within ``flood_window``; 0 disables it.
+        :param flood_window: Flood limit window, in seconds.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.retry_after_rate = retry_after_rate
+        self.retry_after = retry_after
+        self.flood_limit = flood_limit
+        self.flood_window = flood_window
+        self.calls = []
+        self._random = random.Random(seed)
+        self._message_ids = itertools.count(1)
+        self._chat_calls = {}
+        self._updates = deque()
+        self._update_ids = itertools.count(1)
+        self._new_update = None
+        self._runner = None
+
+    # --- recording -----------------------------------------------------------
+
+    def calls_for(self, method: str) -> list:
+        """
+        Return the recorded calls of one Bot API method.
+        """
+        return [call for call in self.calls if call["method"] == method]
+
+    def reset(self):
+        self.calls.clear()
+        self._chat_calls.clear()
+
+    def push_update(self, update: dict):
+        """
+        Queue an update to be delivered through getUpdates.
+        """
+        update = dict(update)
+        update.setdefault("update_id", next(self._update_ids))
+        self._updates.append(update)
+        self._update_event().set()
+
+    def _update_event(self) -> asyncio.Event:
+        # Created lazily so it belongs to the loop that serves the requests
+        if self._new_update is None:
+            self._new_update = asyncio.Event()
+        return self._new_update
+
+    # --- request handling ----------------------------------------------------
+
+    @staticmethod
+    async def _read_params(request: web.Request) -> dict:
+        if request.content_type == "application/json":
+            return await request.json()
+        form = await request.post()
+        params = {}
+        for key, value in form.items():
+            # aiogram sends nested objects (reply_markup, commands) as JSON strings
+            if isinstance(value, str) and value[:1] in ("{", "["):
+                try:
+                    value = json.loads(value)
+                except ValueError:
+                    pass
+            params[key] = value if isinstance(value, (str, dict, list)) else getattr(value, "filename", None)
+        params.update(request.query)
+        return params
+
+    def _flooded(self, method: str, params: dict) -> bool:
+        if not self.flood_limit or method not in FLOOD_METHODS:
+            return False
+        now = time.monotonic()
+        window = self._chat_calls.setdefault(str(params.get("chat_id")), deque())
+        while window and now - window[0] > self.flood_window:
+            window.popleft()
+        if len(window) >= self.flood_limit:
+            return True
+        window.append(now)
+        return False
+
+    def _error(self, code: int, description: str, **parameters) -> web.Response:
+        body = {"ok": False, "error_code": code, "description": description}
+        if parameters:
+            body["parameters"] = parameters
+        return web.json_response(body, status=code)
+
+    async def _get_updates(self, params: dict) -> list:
+        offset = int(params.get("offset") or 0)
+        while self._updates and self._updates[0]["update_id"] < offset:
+            self._updates.popleft()
+        if not self._updates:
+            event = self._update_event()
+            event.clear()
+            try:
+                await asyncio.wait_for(event.wait(), timeout=float(params.get("timeout") or 0))
+            except asyncio.TimeoutError:
+                pass
+        limit = int(params.get("limit") or 100)
+        return list(itertools.islice(self._updates, limit))
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        params = await self._read_params(request)
+        record = {"method": method, "params": params, "time": time.time(), "status": 200}
+        self.calls.append(record)
+
+        if method not in SUPPORTED_METHODS:
+            record["status"] = 404
+            return self._error(404, "Not Found: method not found")
+
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+
+        if self.retry_after_rate and self._random.random() < self.retry_after_rate:
+            record["status"] = 429
+            return self._error(429, f"Too Many Requests: retry after {self.retry_after}",
+                               retry_after=self.retry_after)
+        if self._flooded(method, params):
+            record["status"] = 429
+            return self._error(429, f"Too Many Requests: retry after {self.retry_after}",
+                               retry_after=self.retry_after)
+
+        if method == "getUpdates":
+            result = await self._get_updates(params)
+        else:
+            message_id = next(self._message_ids) if method in ("sendMessage", "sendDocument") \
+                else int(params.get("message_id") or 0)
+            result = build_result(method, params, message_id)
+        return web.json_response({"ok": True, "result": result})
+
+    async def handle_calls(self, request: web.Request) -> web.Response:
+        return web.json_response(self.calls)
+
+    async def handle_reset(self, request: web.Request) -> web.Response:
+        self.reset()
+        return web.json_response({"ok": True})
+
+    async def handle_push_update(self, request: web.Request) -> web.Response:
+        self.push_update(await request.json())
+        return web.json_response({"ok": True})
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self.handle)
+        app.router.add_get("/bot{token}/{method}", self.handle)
+        app.router.add_get("/_calls", self.handle_calls)
+        app.router.add_post("/_reset", self.handle_reset)
+        app.router.add_post("/_updates", self.handle_push_update)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8081) -> str:
+        """
+        Start serving in the running event loop.
+        :return: Base URL to use as BOT_API_SERVER.
+        """
+        self._runner = web.AppRunner(self.make_app())
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        return f"http://{host}:{port}"
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local Telegram Bot API stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.0, help="Base response delay, in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random delay, in seconds")
+    parser.add_argument("--retry-after-rate", type=float, default=0.0, help="Probability of an injected 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="retry_after of injected 429 errors")
+    parser.add_argument("--flood-limit", type=int, default=0, help="Sending calls per chat per window")
+    parser.add_argument("--flood-window", type=float, default=1.0, help="Flood limit window, in seconds")
+    args = parser.parse_args()
+
+    server = FakeBotApiServer(latency=args.latency, jitter=args.jitter, retry_after_rate=args.retry_after_rate,
+                              retry_after=args.retry_after, flood_limit=args.flood_limit,
+                              flood_window=args.flood_window)
+    web.run_app(server.make_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
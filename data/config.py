@@ -9,3 +9,51 @@ BOT_TOKEN = env.str("BOT_TOKEN")  # Bot toekn
 ADMINS = env.list("ADMINS")  # adminlar ro'yxati
 IP = env.str("ip")  # Xosting ip manzili
 GROUP_ID = env.str("GROUP_ID")
+BOT_API_SERVER = env.str("BOT_API_SERVER", None)  # Local Bot API server, e.g. http://127.0.0.1:8081
+SHEETS_API_SERVER = env.str("SHEETS_API_SERVER", None)  # Local Sheets API server, e.g. http://127.0.0.1:8082
+TRAFFIC_CAPTURE_FILE = env.str("TRAFFIC_CAPTURE_FILE", None)  # Opt-in update capture log for replay
+TRAFFIC_CAPTURE_SALT = env.str("TRAFFIC_CAPTURE_SALT", "")  # Secret used to anonymize user ids
+ERROR_LOG_BURST = env.int("ERROR_LOG_BURST", 5)  # Logged errors per exception class per period
+ERROR_LOG_PERIOD = env.float("ERROR_LOG_PERIOD", 60.0)  # Error log sampling period, in seconds
+LOG_FORMAT = env.str("LOG_FORMAT", "json")  # "json" for structured records, "text" for the classic format
+LOG_QUEUE_SIZE = env.int("LOG_QUEUE_SIZE", 10000)  # Log records buffered for the writer thread
+SHEETS_CREDENTIALS_FILE = env.str("SHEETS_CREDENTIALS_FILE", "credentials.json")
+SPREADSHEET_NAME = env.str("SPREADSHEET_NAME", "Being Classification Data")
+WARM_UP_SHEETS = env.bool("WARM_UP_SHEETS", True)  # Authenticate and prefetch worksheets at startup
+LOCAL_DB = env.str("LOCAL_DB", "bot.sqlite3")  # Local SQLite database
+BROADCAST_CONCURRENCY = env.int("BROADCAST_CONCURRENCY", 10)  # Messages in flight during a broadcast
+BROADCAST_PER_CHAT_INTERVAL = env.float("BROADCAST_PER_CHAT_INTERVAL", 1.0)  # Seconds between messages to one chat
+BROADCAST_RATE = env.float("BROADCAST_RATE", 25.0)  # Messages per second over all chats (Telegram allows about 30)
+WORKER_ID = env.int("WORKER_ID", None)  # Unique per bot process (0-1023), used in submission ids
+STATS_SNAPSHOT_FILE = env.str("STATS_SNAPSHOT_FILE", "stats.json")  # Running statistics snapshot
+STATS_SNAPSHOT_INTERVAL = env.float("STATS_SNAPSHOT_INTERVAL", 60.0)  # Seconds between snapshots
+STATS_RECONCILE_INTERVAL = env.float("STATS_RECONCILE_INTERVAL", 6 * 3600.0)  # Seconds between recounts from the sheet
+SUBMIT_DEDUP_WINDOW = env.float("SUBMIT_DEDUP_WINDOW", 600.0)  # Seconds a repeated submit is answered from memory
+SUBMIT_DEDUP_SIZE = env.int("SUBMIT_DEDUP_SIZE", 4096)  # Recent submissions remembered for deduplication
+EDIT_COALESCE_INTERVAL = env.float("EDIT_COALESCE_INTERVAL", 1.0)  # Minimum seconds between edits of one message
+IMPORT_BATCH_SIZE = env.int("IMPORT_BATCH_SIZE", 500)  # Rows per Sheets append request in bulk imports
+INLINE_CACHE_TIME = env.int("INLINE_CACHE_TIME", 300)  # Seconds Telegram may cache inline autocomplete answers
+WIZARD_SINGLE_MESSAGE = env.bool("WIZARD_SINGLE_MESSAGE", False)  # Edit one wizard message per chat, delete user input
+SHUTDOWN_TIMEOUT = env.float("SHUTDOWN_TIMEOUT", 25.0)  # Seconds to finish running submits before the bot stops
+BOT_API_CONNECTIONS = env.int("BOT_API_CONNECTIONS", 20)  # Bot API connection pool size
+BOT_API_KEEPALIVE = env.float("BOT_API_KEEPALIVE", 60.0)  # Seconds an idle Bot API connection is kept open
+BOT_API_DNS_TTL = env.int("BOT_API_DNS_TTL", 300)  # Seconds the Bot API address is cached
+BOT_API_TIMEOUT = env.float("BOT_API_TIMEOUT", 30.0)  # Total seconds per Bot API request (long polling adds its own)
+BOT_API_CONNECT_TIMEOUT = env.float("BOT_API_CONNECT_TIMEOUT", 10.0)  # Seconds to connect to the Bot API
+SHEETS_POOL_SIZE = env.int("SHEETS_POOL_SIZE", 10)  # Kept-alive connections per Google API host
+SHEETS_CONNECT_TIMEOUT = env.float("SHEETS_CONNECT_TIMEOUT", 10.0)  # Seconds to connect to the Sheets API
+SHEETS_READ_TIMEOUT = env.float("SHEETS_READ_TIMEOUT", 60.0)  # Seconds to wait for a Sheets API response
+SHEETS_BREAKER_FAILURES = env.int("SHEETS_BREAKER_FAILURES", 3)  # Failed or slow Sheets calls in a row that open the circuit
+SHEETS_BREAKER_SLOW_CALL = env.float("SHEETS_BREAKER_SLOW_CALL", 10.0)  # Seconds after which a Sheets call counts as failed
+SHEETS_BREAKER_RESET = env.float("SHEETS_BREAKER_RESET", 30.0)  # Seconds the circuit stays open before a trial call
+SHEETS_ROW_COUNT_TTL = env.float("SHEETS_ROW_COUNT_TTL", 60.0)  # Seconds a worksheet row count is trusted before it is read again
+SHEETS_SYNC_INTERVAL = env.float("SHEETS_SYNC_INTERVAL", 30.0)  # Seconds between outbox syncs while rows are waiting
+SUBMIT_DEADLINE = env.float("SUBMIT_DEADLINE", 40.0)  # Seconds a submit may take before it is handed to the outbox sync
+SUBMIT_AUTH_BUDGET = env.float("SUBMIT_AUTH_BUDGET", 10.0)  # Seconds to authorize and open the spreadsheet
+SUBMIT_ROW_COUNT_BUDGET = env.float("SUBMIT_ROW_COUNT_BUDGET", 8.0)  # Seconds to read the row count
+SUBMIT_POST_BUDGET = env.float("SUBMIT_POST_BUDGET", 10.0)  # Seconds to post the report to the group
+SUBMIT_APPEND_BUDGET = env.float("SUBMIT_APPEND_BUDGET", 12.0)  # Seconds to append the row to the sheet
+SUBMIT_WORKERS = env.int("SUBMIT_WORKERS", 2)  # Submits run at the same time; the rest wait in the queue
+SUBMIT_QUEUE_SIZE = env.int("SUBMIT_QUEUE_SIZE", 50)  # Waiting submits before new ones are turned away
+SUBMIT_RATE = env.float("SUBMIT_RATE", 50.0)  # Submits started per minute, kept under the Sheets write quota (60/min)
+SUBMIT_QUEUE_REFRESH = env.float("SUBMIT_QUEUE_REFRESH", 5.0)  # Minimum seconds between queue position updates
@@ -4,8 +4,11 @@ from loader import dp
 
 from . group_chat import IsGroup
 from . private_chat import IsPrivate
+from . admin import IsAdmin
+from . inline_pick import InlinePick
 
 
 if __name__ == "filters":
     dp.filters_factory.bind(IsGroup)
-    dp.filters_factory.bind(IsPrivate)
\ No newline at end of file
+    dp.filters_factory.bind(IsPrivate)
+    dp.filters_factory.bind(IsAdmin)
\ No newline at end of file
@@ -0,0 +1,20 @@
+from aiogram import types
+from aiogram.dispatcher.filters import BoundFilter
+
+from utils.misc.fuzzy import VocabularyIndex
+
+
+class InlinePick(BoundFilter):
+    """
+    A vocabulary word chosen from this bot's inline suggestions. The handler gets
+    the word as the ``pick`` argument.
+    """
+
+    def __init__(self, index: VocabularyIndex):
+        self.index = index
+
+    async def check(self, message: types.Message):
+        if not message.via_bot or message.via_bot.id != message.bot.id or not message.text:
+            return False
+        word = self.index.lookup(message.text)
+        return {"pick": word} if word else False
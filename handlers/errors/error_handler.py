@@ -6,53 +6,77 @@ from aiogram.utils.exceptions import (Unauthorized, InvalidQueryID, TelegramAPIE
 
 
 from loader import dp
+from data.config import ERROR_LOG_BURST, ERROR_LOG_PERIOD
+from utils.misc import metrics
+from utils.misc.log_sampling import LogSampler
 
+# Handled exceptions: log message and whether the (large) update dump is worth logging.
+# Lookup follows the exception's MRO, so the most specific entry wins.
+ERROR_TABLE = {
+    CantDemoteChatCreator: ("Can't demote chat creator", False),
+    MessageNotModified: ("Message is not modified", False),
+    MessageCantBeDeleted: ("Message cant be deleted", False),
+    MessageToDeleteNotFound: ("Message to delete not found", False),
+    MessageTextIsEmpty: ("MessageTextIsEmpty", False),
+    Unauthorized: ("Unauthorized: {exception}", False),
+    InvalidQueryID: ("InvalidQueryID: {exception}", True),
+    RetryAfter: ("RetryAfter: {exception}", True),
+    CantParseEntities: ("CantParseEntities: {exception}", True),
+    TelegramAPIError: ("TelegramAPIError: {exception}", True),
+}
 
-@dp.errors_handler()
-async def errors_handler(update, exception):
+# Resolved table entries per concrete exception type
+_resolved = {}
+
+
+def report_suppressed(exception_type: type, suppressed: int, period: float):
     """
-    Exceptions handler. Catches all exceptions within task factory tasks.
-    :param dispatcher:
-    :param update:
-    :param exception:
-    :return: stdout logging
+    Log how many errors of a type the sampler dropped; called when its window ends.
     """
+    logging.warning("Suppressed %d similar %s errors in the last %g s", suppressed, exception_type.__name__, period)
 
-    if isinstance(exception, CantDemoteChatCreator):
-        logging.exception("Can't demote chat creator")
-        return True
 
-    if isinstance(exception, MessageNotModified):
-        logging.exception('Message is not modified')
-        return True
-    if isinstance(exception, MessageCantBeDeleted):
-        logging.exception('Message cant be deleted')
-        return True
+sampler = LogSampler(burst=ERROR_LOG_BURST, period=ERROR_LOG_PERIOD, report=report_suppressed)
 
-    if isinstance(exception, MessageToDeleteNotFound):
-        logging.exception('Message to delete not found')
-        return True
 
-    if isinstance(exception, MessageTextIsEmpty):
-        logging.exception('MessageTextIsEmpty')
-        return True
+def resolve(exception_type: type):
+    """
+    Find the table entry for an exception type, or None if it is not handled.
+    """
+    try:
+        return _resolved[exception_type]
+    except KeyError:
+        entry = next((ERROR_TABLE[cls] for cls in exception_type.__mro__ if cls in ERROR_TABLE), None)
+        _resolved[exception_type] = entry
+        return entry
 
-    if isinstance(exception, Unauthorized):
-        logging.exception(f'Unauthorized: {exception}')
-        return True
 
-    if isinstance(exception, InvalidQueryID):
-        logging.exception(f'InvalidQueryID: {exception} \nUpdate: {update}')
-        return True
+@dp.errors_handler()
+async def errors_handler(update, exception):
+    """
+    Exceptions handler. Catches all exceptions within task factory tasks.
+    Logging is rate limited per exception class, so an error storm does not
+    spend its time formatting update dumps.
+    :param update:
+    :param exception:
+    :return: True if the exception is handled
+    """
+    exception_type = type(exception)
+    name = exception_type.__name__
+    entry = resolve(exception_type)
+    metrics.inc("errors_total", type=name)
 
-    if isinstance(exception, TelegramAPIError):
-        logging.exception(f'TelegramAPIError: {exception} \nUpdate: {update}')
-        return True
-    if isinstance(exception, RetryAfter):
-        logging.exception(f'RetryAfter: {exception} \nUpdate: {update}')
-        return True
-    if isinstance(exception, CantParseEntities):
-        logging.exception(f'CantParseEntities: {exception} \nUpdate: {update}')
+    if not sampler.allow(exception_type):
+        metrics.inc("errors_suppressed_total", type=name)
+    elif entry is None:
+        logging.exception("Update: %s \n%s", update, exception)
+    else:
+        message, with_update = entry
+        message = message.format(exception=exception)
+        if with_update:
+            logging.exception("%s \nUpdate: %s", message, update)
+        else:
+            logging.exception(message)
+
+    if entry is not None:
         return True
-    
-    logging.exception(f'Update: {update} \n{exception}')
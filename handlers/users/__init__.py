@@ -1,4 +1,6 @@
 from . import help
+from . import admin
+from . import inline
 from . import start
 from . import classify
 from . import classify_animal
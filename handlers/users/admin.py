@@ -0,0 +1,163 @@
+import asyncio
+import io
+import os
+
+from aiogram import types
+from aiogram.dispatcher.filters import Command
+from aiogram.utils.markdown import hpre
+from aiogram.utils.parts import MAX_MESSAGE_LENGTH
+
+from filters import IsAdmin, IsPrivate
+from loader import dp
+from utils.broadcast import broadcaster
+from utils.bulk_import import IMPORT_EXTENSIONS, import_file
+from utils.db_api.google_sheets import WORKSHEETS
+from utils.db_api.known_users import known_users
+from utils.db_api.submissions import submissions
+from utils.export import EXPORT_FORMATS, export_worksheet
+from utils.misc import metrics
+from utils.stats import stats
+
+
+async def answer_pre(message: types.Message, text: str):
+    """
+    Answer with a monospaced text, split at line breaks into as many messages as
+    Telegram's length limit (counted after HTML parsing) requires.
+    """
+    lines, size = [], 0
+    for line in text.splitlines():
+        line = line[:MAX_MESSAGE_LENGTH]
+        if lines and size + len(line) > MAX_MESSAGE_LENGTH:
+            await message.answer(hpre(*lines))
+            lines, size = [], 0
+        lines.append(line)
+        size += len(line) + 1  # With the line break
+    if lines:
+        await message.answer(hpre(*lines))
+
+
+@dp.message_handler(IsPrivate(), IsAdmin(), Command("metrics"), state="*")
+async def show_metrics(message: types.Message):
+    """
+    Show the in-process metrics (error counters, suppressed log records, ...) to admins.
+    """
+    text = metrics.render() or "No metrics recorded yet."
+    await answer_pre(message, text)
+
+
+@dp.message_handler(IsPrivate(), IsAdmin(), Command("stats"), state="*")
+async def show_stats(message: types.Message):
+    """
+    Show the running submission statistics (no Google Sheets reads).
+    """
+    await answer_pre(message, stats.render())
+
+
+@dp.message_handler(IsPrivate(), IsAdmin(), Command("announce"), state="*")
+async def announce(message: types.Message):
+    """
+    Send an announcement to every known user: /announce <text>
+    """
+    text = message.get_args()
+    if not text:
+        await message.answer("Usage: /announce <text>")
+        return
+
+    await message.answer(f"📣 Sending the announcement to {len(known_users.all())} users...")
+    summary = await broadcaster.broadcast(message.bot, known_users.all(), text)
+    await message.answer(f"📣 Announcement finished: {summary}")
+
+
+@dp.message_handler(IsPrivate(), IsAdmin(), Command("export"), state="*")
+async def export(message: types.Message):
+    """
+    Send a worksheet as a gzip-compressed file: /export <Humans|Animals|Aliens> [csv|jsonl]
+    """
+    args = message.get_args().split()
+    worksheet_name = args[0].capitalize() if args else ""
+    fmt = args[1].lower() if len(args) > 1 else "csv"
+    if worksheet_name not in WORKSHEETS or fmt not in EXPORT_FORMATS:
+        await message.answer(f"Usage: /export <{'|'.join(WORKSHEETS)}> [{'|'.join(EXPORT_FORMATS)}]")
+        return
+
+    await types.ChatActions.upload_document()
+    try:
+        # gspread is blocking, so the sheet is read and compressed in a worker thread
+        path, count = await asyncio.get_running_loop().run_in_executor(None, export_worksheet, worksheet_name, fmt)
+    except Exception as e:
+        await message.answer(f"❌ Export failed: {e}")
+        return
+
+    try:
+        document = types.InputFile(path, filename=f"{worksheet_name.lower()}.{fmt}.gz")
+        await message.answer_document(document, caption=f"📦 {worksheet_name}: {count} rows")
+    finally:
+        os.remove(path)
+
+
+def format_submission(submission: dict) -> str:
+    lines = [f"{submission['being']}"]
+    lines += [f"{name}: {value}" for name, value in submission["fields"].items()]
+    return "\n".join(lines)
+
+
+@dp.message_handler(IsPrivate(), IsAdmin(), Command("find"), state="*")
+async def find_submission(message: types.Message):
+    """
+    Look up a submission by id in the local mirror: /find <id>
+    """
+    unique_id = message.get_args().strip()
+    if not unique_id:
+        await message.answer("Usage: /find <id>")
+        return
+
+    submission = submissions.find(unique_id)
+    if submission is None:
+        await message.answer(f"Nothing found for #{unique_id.lstrip('#')}")
+        return
+    await message.answer(hpre(format_submission(submission)))
+
+
+@dp.message_handler(IsPrivate(), IsAdmin(), Command("by"), state="*")
+async def submissions_by(message: types.Message):
+    """
+    Latest submissions of an initiator, by Telegram id or full name: /by <user>
+    """
+    initiator = message.get_args().strip()
+    if not initiator:
+        await message.answer("Usage: /by <user id or full name>")
+        return
+
+    found = submissions.by_initiator(initiator)
+    if not found:
+        await message.answer(f"Nothing found for {initiator}")
+        return
+    await message.answer(hpre("\n\n".join(format_submission(submission) for submission in found)))
+
+
+@dp.message_handler(IsPrivate(), IsAdmin(), content_types=types.ContentType.DOCUMENT, state="*")
+async def bulk_import(message: types.Message):
+    """
+    Import offline classifications from an uploaded CSV/XLSX file with a header row:
+    type, then the wizard fields (gender, age, nationality, species, race, ...).
+    """
+    file_name = message.document.file_name or ""
+    if not file_name.lower().endswith(IMPORT_EXTENSIONS):
+        await message.answer(f"📥 Send a {' or '.join(IMPORT_EXTENSIONS)} file to import classifications.")
+        return
+
+    await message.answer(f"📥 Importing {file_name}...")
+    content = await message.bot.download_file_by_id(message.document.file_id, destination=io.BytesIO())
+    # Validation and the Sheets appends are blocking, keep them off the loop
+    report = await asyncio.get_running_loop().run_in_executor(
+        None, import_file, content.getvalue(), file_name, message.from_user.full_name)
+
+    await message.answer(report.summary())
+    if not report.errors:
+        return
+    errors_text = "\n".join(f"Line {line}: {error}" if line else error for line, error in report.errors)
+    if len(errors_text) <= 3500:
+        await message.answer(hpre(errors_text))
+    else:
+        document = types.InputFile(io.BytesIO(report.errors_csv()), filename=f"{file_name}.errors.csv")
+        await message.answer_document(document, caption="❌ Rejected rows")
@@ -1,27 +1,70 @@
 import re
 import asyncio
-from filters import IsPrivate
+import logging
+from filters import InlinePick, IsPrivate
 from datetime import datetime
 from aiogram import types
 from aiogram.dispatcher import FSMContext
 from aiogram.dispatcher.filters import Command
 from aiogram.types import CallbackQuery
-from utils.db_api.google_sheets import GoogleSheetsClient
-from loader import dp, bot
-from difflib import get_close_matches
+from utils.edits import edits
+from utils.submit import single_flight_submit
+from utils.submit_queue import QUEUE_FULL_TEXT, submit_queue
+from utils.misc.fuzzy import nationality_index, color_index
+from utils.validation import HUMAN_AGE_RANGE, HUMAN_HEIGHT_RANGE
+from utils.misc.snowflake import submission_ids
+from utils import wizard
+from loader import dp
 from states.classify_state import ClassifyState, ClassifyAnimalState, ClassifyAlienState
 from keyboards.inline.choose_type import choose_type_keyboard
-from data.predefined_lists import nationalities, colors
+from keyboards.inline.candidates import candidates_keyboard, candidates_text
+from keyboards.inline.search import search_keyboard
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-from data.config import GROUP_ID
+from data.config import GROUP_ID, WIZARD_SINGLE_MESSAGE
+
+
+def human_summary(data: dict) -> str:
+    """
+    Summary of the human wizard answers shown before submitting (Markdown).
+    :param data: FSM data of the wizard.
+    """
+    return (
+        f"📋 **Here is the data you provided:**\n\n"
+        f"👤 Gender: {data.get('gender', 'Not provided')}\n"
+        f"📅 Age: {data.get('age', 'Not provided')} years\n"
+        f"🌍 Nationality: {data.get('nationality', 'Not provided')}\n"
+        f"🎓 Education: {data.get('education', 'Not provided')}\n"
+        f"👁️ Eye Color: {data.get('eye_color', 'Not provided')}\n"
+        f"💇 Hair Color: {data.get('hair_color', 'Not provided')}\n"
+        f"📏 Height: {data.get('height', 'Not provided')} cm\n\n"
+        "Please choose what to do next:"
+    )
+
+
+def human_group_message(post_data: dict) -> str:
+    """
+    Report of a human submission posted to the group.
+    :param post_data: Submission fields, with unique_id, date and specie.
+    """
+    return (
+        f"🆔 #{post_data['unique_id']}\n"
+        f"📅 {post_data['date']}\n"
+        f"👤 Specie: {post_data['specie']}\n"
+        f"⚧️ Gender: {post_data.get('gender', 'N/A')}\n"
+        f"🌍 Nationality: {post_data.get('nationality', 'N/A')}\n"
+        f"🎓 Education: {post_data.get('education', 'N/A')}\n"
+        f"👁️ Eye Color: {post_data.get('eye_color', 'N/A')}\n"
+        f"💇 Hair Color: {post_data.get('hair_color', 'N/A')}\n"
+        f"📏 Height: {post_data.get('height', 'N/A')} cm"
+    )
 
 
 @dp.message_handler(IsPrivate(),Command("classify"))
-async def start_classification(message: types.Message):
+async def start_classification(message: types.Message, state: FSMContext):
     """
     Entry point for the /classify command.
     """
-    await message.answer("What type of being?", reply_markup=choose_type_keyboard)
+    await wizard.ask(message, state, "What type of being?", reply_markup=choose_type_keyboard, new=True)
     await ClassifyState.choose_type.set()  # Set the state to choose a being type
 
 
@@ -38,7 +81,8 @@ async def process_being_type(call: CallbackQuery, state: FSMContext):
         await state.finish()
         return
 
-    await call.message.edit_reply_markup()  # Remove inline buttons after selection
+    if not WIZARD_SINGLE_MESSAGE:
+        await edits.edit(call.message, reply_markup=None)  # Remove inline buttons after selection
 
     if choice == "human":
         keyboard = InlineKeyboardMarkup(row_width=2)
@@ -47,10 +91,12 @@ async def process_being_type(call: CallbackQuery, state: FSMContext):
             InlineKeyboardButton(text="👩 Female", callback_data="gender_female"),
         )
 
-        await call.message.answer("You selected: 👤 Human. Please provide the gender (Male/Female):", reply_markup=keyboard)
+        await wizard.ask(call.message, state, "You selected: 👤 Human. Please provide the gender (Male/Female):",
+                         reply_markup=keyboard)
         await ClassifyState.human_gender.set()  # Transition to the first Human flow state
     elif choice == "animal":
-        await call.message.answer("Please provide the species (e.g., Dog, Cat):")
+        await wizard.ask(call.message, state, "Please provide the species (e.g., Dog, Cat):",
+                         reply_markup=search_keyboard("species"))
         await ClassifyAnimalState.species.set()
 
     elif choice == "alien":
@@ -59,7 +105,7 @@ async def process_being_type(call: CallbackQuery, state: FSMContext):
             InlineKeyboardButton(text="✅ Yes", callback_data="humanoid_yes"),
             InlineKeyboardButton(text="❌ No", callback_data="humanoid_no"),
         )
-        await call.message.answer("🛸 Is the alien humanoid? Please select one:", reply_markup=keyboard)
+        await wizard.ask(call.message, state, "🛸 Is the alien humanoid? Please select one:", reply_markup=keyboard)
         await ClassifyAlienState.humanoid.set()
     else:
         await call.message.answer("Invalid choice. Please use the buttons provided.")
@@ -74,8 +120,8 @@ async def process_human_data(message: types.Message, state: FSMContext):
 
     if current_state == ClassifyState.human_gender.state:
         # Handle gender input
-        await message.delete()
-        await message.answer(f"✨ You have to provide your gender.\nPlease choose one of them above: 👆🏻\n👨 Male or 👩 Female")
+        await wizard.hint(message, state, f"✨ You have to provide your gender.\nPlease choose one of them above: 👆🏻\n👨 Male or 👩 Female",
+                          delete=True)
 
     elif current_state == ClassifyState.human_age.state:
         # Handle age input
@@ -85,7 +131,7 @@ async def process_human_data(message: types.Message, state: FSMContext):
                 await message.answer("Invalid age. Please enter a realistic age between 15 and 120.")
                 return
             await state.update_data(age=age)
-            await message.answer("What is your nationality?")
+            await message.answer("What is your nationality?", reply_markup=search_keyboard("nat"))
             await ClassifyState.human_nationality.set()
         except ValueError:
             await message.answer("Invalid input. Please enter a numeric value for age.")
@@ -98,17 +144,13 @@ async def process_human_data(message: types.Message, state: FSMContext):
             return
 
         nationality = input_text.capitalize()
-        similar_nationalities = get_close_matches(nationality, nationalities, n=10, cutoff=0.4)
+        similar_nationalities = nationality_index.close_matches(nationality)
         if not similar_nationalities:
             await message.answer("No similar nationalities found. Please try again with a different input.")
             return
 
-        keyboard = InlineKeyboardMarkup(row_width=5)
-        for i, name in enumerate(similar_nationalities):
-            keyboard.insert(InlineKeyboardButton(text=f"{i + 1}", callback_data=f"nationality_{i}"))
-        keyboard.add(InlineKeyboardButton(text="🔄 Reenter", callback_data="reenter_nationality"))
-
-        results = "\n".join([f"{i + 1}. {name}" for i, name in enumerate(similar_nationalities)])
+        keyboard = candidates_keyboard("nationality", len(similar_nationalities), "reenter_nationality")
+        results = candidates_text(similar_nationalities)
         await message.answer(
             f"Did you mean one of these nationalities?\n\n{results}\n\n"
             "Please select one using the buttons below:",
@@ -128,9 +170,8 @@ async def process_gender_selection(call: CallbackQuery, state: FSMContext):
     await state.update_data(gender=gender.capitalize())
 
     # Acknowledge and move to the next step
-    await call.message.edit_text(f"Gender selected: {gender.capitalize()}")
     await call.answer()
-    await call.message.answer("What is your age (in years)?")
+    await wizard.ask(call.message, state, "What is your age (in years)?", done=f"Gender selected: {gender.capitalize()}")
     await ClassifyState.human_age.set()
 
 
@@ -142,17 +183,27 @@ async def process_human_age(message: types.Message, state: FSMContext):
     try:
         age = int(message.text.strip())
 
-        # Validate age
-        if age <= 8 or age >= 101:
-            await message.answer("Invalid age. Please enter a realistic age between 8 and 101.")
+        # Validate age (same range as the bulk import)
+        low, high = HUMAN_AGE_RANGE
+        if not low <= age <= high:
+            await wizard.hint(message, state, f"Invalid age. Please enter a realistic age between {low} and {high}.")
             return
 
         # Save age to state
         await state.update_data(age=age)
-        await message.answer("What is your nationality?")
+        await wizard.ask(message, state, "What is your nationality?", reply_markup=search_keyboard("nat"))
         await ClassifyState.human_nationality.set()
     except ValueError:
-        await message.answer("Invalid input. Please enter a numeric value for age.")
+        await wizard.hint(message, state, "Invalid input. Please enter a numeric value for age.")
+
+
+@dp.message_handler(IsPrivate(), InlinePick(nationality_index),
+                    state=[ClassifyState.human_nationality, ClassifyState.HUMAN_NATIONALITY])
+async def pick_human_nationality(message: types.Message, state: FSMContext, pick: str):
+    """
+    Nationality chosen from the inline suggestions: no "Did you mean" round trip.
+    """
+    await nationality_chosen(message, state, pick)
 
 
 @dp.message_handler(IsPrivate(), state=ClassifyState.human_nationality)
@@ -164,30 +215,24 @@ async def process_human_nationality(message: types.Message, state: FSMContext):
 
     # Validate if the input is purely text
     if not input_text.isalpha():
-        await message.answer("Invalid input. Please provide a valid text-only nationality (e.g., American, Uzbek).")
+        await wizard.hint(message, state, "Invalid input. Please provide a valid text-only nationality (e.g., American, Uzbek).")
         return
 
     # Capitalize the input and search for similar nationalities
     nationality = input_text.capitalize()
-    similar_nationalities = get_close_matches(nationality, nationalities, n=10, cutoff=0.4)
+    similar_nationalities = nationality_index.close_matches(nationality)
 
     if not similar_nationalities:
-        await message.answer(
-            "No similar nationalities found. Please try again with a different input."
-        )
+        await wizard.hint(message, state, "No similar nationalities found. Please try again with a different input.")
         return
 
-    # Create an inline keyboard with a maximum of 5 buttons per row
-    keyboard = InlineKeyboardMarkup(row_width=5)
-    for i, name in enumerate(similar_nationalities):
-        keyboard.insert(InlineKeyboardButton(text=f"{i + 1}", callback_data=f"nationality_{i}"))
-    keyboard.add(InlineKeyboardButton(text="🔄 Reenter", callback_data="reenter"))
+    # Numbered buttons for the candidates (cached keyboard)
+    keyboard = candidates_keyboard("nationality", len(similar_nationalities), "reenter")
 
     # Send the message with the results and buttons
-    results = "\n".join(
-        [f"{i + 1}. {name}" for i, name in enumerate(similar_nationalities)]
-    )
-    await message.answer(
+    results = candidates_text(similar_nationalities)
+    await wizard.ask(
+        message, state,
         f"Did you mean one of these nationalities?\n\n{results}\n\n"
         "Please select one using the buttons below:",
         reply_markup=keyboard
@@ -200,8 +245,21 @@ async def process_human_nationality(message: types.Message, state: FSMContext):
 
 @dp.message_handler(IsPrivate(), state=ClassifyState.HUMAN_NATIONALITY)
 async def process_human_nationality(message: types.Message, state: FSMContext):
-    await message.delete()
-    await message.answer(f"✨ You have to choose and click from the 🔢 number(s) above\nor you have to click 🔄 Reenter to edit your entry 📝")
+    await wizard.hint(message, state, "✨ You have to choose and click from the 🔢 number(s) above\nor you have to click 🔄 Reenter to edit your entry 📝", delete=True)
+
+
+async def nationality_chosen(message: types.Message, state: FSMContext, nationality: str, done: str = None):
+    """
+    Store the nationality and ask for the education level.
+    """
+    await state.update_data(nationality=nationality)
+    keyboard = InlineKeyboardMarkup(row_width=2)
+    keyboard.add(
+        InlineKeyboardButton(text="🎓 Higher", callback_data="education_higher"),
+        InlineKeyboardButton(text="🏫 School", callback_data="education_school"),
+    )
+    await wizard.ask(message, state, "What is your level of education?", reply_markup=keyboard, done=done)
+    await ClassifyState.human_education.set()
 
 
 @dp.callback_query_handler(lambda call: call.data.startswith("nationality_"), state=ClassifyState.HUMAN_NATIONALITY)
@@ -216,19 +274,10 @@ async def process_nationality_selection(call: CallbackQuery, state: FSMContext):
     selected_index = int(call.data.split("_")[1])
     selected_nationality = similar_nationalities[selected_index]
 
-    # Update the state with the selected nationality
-    await state.update_data(nationality=selected_nationality)
-
     # Acknowledge the selection and move to the next step
-    await call.message.edit_text(f"Nationality selected: {selected_nationality}")
     await call.answer()
-    keyboard = InlineKeyboardMarkup(row_width=2)
-    keyboard.add(
-        InlineKeyboardButton(text="🎓 Higher", callback_data="education_higher"),
-        InlineKeyboardButton(text="🏫 School", callback_data="education_school"),
-    )
-    await call.message.answer("What is your level of education?", reply_markup=keyboard)
-    await ClassifyState.human_education.set()
+    await nationality_chosen(call.message, state, selected_nationality,
+                             done=f"Nationality selected: {selected_nationality}")
 
 
 @dp.callback_query_handler(lambda call: call.data == "reenter", state=ClassifyState.HUMAN_NATIONALITY)
@@ -237,14 +286,13 @@ async def process_nationality_reenter(call: CallbackQuery, state: FSMContext):
     """
     Allow the user to reenter the nationality if they click the Reenter button.
     """
-    await call.message.edit_text("Please provide the nationality again:")
+    await wizard.edit(call.message, state, "Please provide the nationality again:", reply_markup=search_keyboard("nat"))
     await call.answer()
 
 @dp.message_handler(IsPrivate(), state=ClassifyState.human_education)
 async def process_human_gender(message: types.Message, state: FSMContext):
-    await message.delete()
-    await message.answer(f"✨ You have to provide your eduction level. Please choose one of them above: 👆🏻\n"
-                         f"🎓 Higher or 🏫 School")
+    await wizard.hint(message, state, f"✨ You have to provide your eduction level. Please choose one of them above: 👆🏻\n"
+                                      f"🎓 Higher or 🏫 School", delete=True)
 
 
 @dp.callback_query_handler(lambda call: call.data.startswith("education_"), state=ClassifyState.human_education)
@@ -258,12 +306,18 @@ async def process_education_selection(call: CallbackQuery, state: FSMContext):
     await state.update_data(education=education.capitalize())
 
     # Acknowledge and move to the next step
-    await call.message.edit_text(f"Education level selected: {education.capitalize()}")
     await call.answer()
-    await call.message.answer("What is your eye color?")
+    await wizard.ask(call.message, state, "What is your eye color?", reply_markup=search_keyboard("color"),
+                     done=f"Education level selected: {education.capitalize()}")
     await ClassifyState.human_eye_color.set()
 
 
+@dp.message_handler(IsPrivate(), InlinePick(color_index),
+                    state=[ClassifyState.human_eye_color, ClassifyState.HUMAN_EYE_COLOR])
+async def pick_human_eye_color(message: types.Message, state: FSMContext, pick: str):
+    await eye_color_chosen(message, state, pick)
+
+
 @dp.message_handler(IsPrivate(), state=ClassifyState.human_eye_color)
 async def process_human_eye_color(message: types.Message, state: FSMContext):
     """
@@ -273,30 +327,24 @@ async def process_human_eye_color(message: types.Message, state: FSMContext):
 
     # Validate if the input is purely text
     if not input_text.isalpha():
-        await message.answer("Invalid input. Please provide a valid text-only color (e.g., Red, Blue, Green).")
+        await wizard.hint(message, state, "Invalid input. Please provide a valid text-only color (e.g., Red, Blue, Green).")
         return
 
     # Capitalize the input and search for similar colors
     color = input_text.capitalize()
-    similar_colors = get_close_matches(color, colors, n=10, cutoff=0.4)
+    similar_colors = color_index.close_matches(color)
 
     if not similar_colors:
-        await message.answer(
-            "No similar colors found. Please try again with a different input."
-        )
+        await wizard.hint(message, state, "No similar colors found. Please try again with a different input.")
         return
 
-    # Create an inline keyboard with a maximum of 5 buttons per row
-    keyboard = InlineKeyboardMarkup(row_width=5)
-    for i, name in enumerate(similar_colors):
-        keyboard.insert(InlineKeyboardButton(text=f"{i + 1}", callback_data=f"color_{i}"))
-    keyboard.add(InlineKeyboardButton(text="🔄 Reenter", callback_data="reenter_color"))
+    # Numbered buttons for the candidates (cached keyboard)
+    keyboard = candidates_keyboard("color", len(similar_colors), "reenter_color")
 
     # Send the message with the results and buttons
-    results = "\n".join(
-        [f"{i + 1}. {name}" for i, name in enumerate(similar_colors)]
-    )
-    await message.answer(
+    results = candidates_text(similar_colors)
+    await wizard.ask(
+        message, state,
         f"Did you mean one of these colors?\n\n{results}\n\n"
         "Please select one using the buttons below:",
         reply_markup=keyboard
@@ -308,8 +356,16 @@ async def process_human_eye_color(message: types.Message, state: FSMContext):
 
 @dp.message_handler(IsPrivate(), state=ClassifyState.HUMAN_EYE_COLOR)
 async def process_human_gender(message: types.Message, state: FSMContext):
-    await message.delete()
-    await message.answer(f"✨ You have to choose and click from the 🔢 number(s) above\nor you have to click 🔄 Reenter to edit your entry 📝")
+    await wizard.hint(message, state, "✨ You have to choose and click from the 🔢 number(s) above\nor you have to click 🔄 Reenter to edit your entry 📝", delete=True)
+
+
+async def eye_color_chosen(message: types.Message, state: FSMContext, color: str, done: str = None):
+    """
+    Store the eye color and ask for the hair color.
+    """
+    await state.update_data(eye_color=color)
+    await wizard.ask(message, state, "What is the hair color?", reply_markup=search_keyboard("color"), done=done)
+    await ClassifyState.human_hair_color.set()
 
 
 @dp.callback_query_handler(lambda call: call.data.startswith("color_"), state=ClassifyState.HUMAN_EYE_COLOR)
@@ -324,14 +380,9 @@ async def process_color_selection(call: CallbackQuery, state: FSMContext):
     selected_index = int(call.data.split("_")[1])
     selected_color = similar_colors[selected_index]
 
-    # Update the state with the selected color
-    await state.update_data(eye_color=selected_color)
-
     # Acknowledge the selection and move to the next step
-    await call.message.edit_text(f"Eye color selected: {selected_color}")
     await call.answer()
-    await call.message.answer("What is the hair color?")
-    await ClassifyState.human_hair_color.set()
+    await eye_color_chosen(call.message, state, selected_color, done=f"Eye color selected: {selected_color}")
 
 
 @dp.callback_query_handler(lambda call: call.data == "reenter_color", state=ClassifyState.HUMAN_EYE_COLOR)
@@ -340,10 +391,16 @@ async def process_color_reenter(call: CallbackQuery, state: FSMContext):
     """
     Allow the user to reenter the color if they click the Reenter button.
     """
-    await call.message.edit_text("Please provide the eye color again:")
+    await wizard.edit(call.message, state, "Please provide the eye color again:", reply_markup=search_keyboard("color"))
     await call.answer()
 
 
+@dp.message_handler(IsPrivate(), InlinePick(color_index),
+                    state=[ClassifyState.human_hair_color, ClassifyState.HUMAN_HAIR_COLOR])
+async def pick_human_hair_color(message: types.Message, state: FSMContext, pick: str):
+    await hair_color_chosen(message, state, pick)
+
+
 @dp.message_handler(IsPrivate(), state=ClassifyState.human_hair_color)
 async def process_human_eye_color(message: types.Message, state: FSMContext):
     """
@@ -353,30 +410,24 @@ async def process_human_eye_color(message: types.Message, state: FSMContext):
 
     # Validate if the input is purely text
     if not input_text.isalpha():
-        await message.answer("Invalid input. Please provide a valid text-only color (e.g., Red, Blue, Green).")
+        await wizard.hint(message, state, "Invalid input. Please provide a valid text-only color (e.g., Red, Blue, Green).")
         return
 
     # Capitalize the input and search for similar colors
     hair_color = input_text.capitalize()
-    similar_hair_colors = get_close_matches(hair_color, colors, n=10, cutoff=0.4)
+    similar_hair_colors = color_index.close_matches(hair_color)
 
     if not similar_hair_colors:
-        await message.answer(
-            "No similar colors found. Please try again with a different input."
-        )
+        await wizard.hint(message, state, "No similar colors found. Please try again with a different input.")
         return
 
-    # Create an inline keyboard with a maximum of 5 buttons per row
-    keyboard1 = InlineKeyboardMarkup(row_width=5)
-    for i, name in enumerate(similar_hair_colors):
-        keyboard1.insert(InlineKeyboardButton(text=f"{i + 1}", callback_data=f"color_{i}"))
-    keyboard1.add(InlineKeyboardButton(text="🔄 Reenter", callback_data="reenter_color"))
+    # Numbered buttons for the candidates (cached keyboard)
+    keyboard1 = candidates_keyboard("color", len(similar_hair_colors), "reenter_color")
 
     # Send the message with the results and buttons
-    results = "\n".join(
-        [f"{i + 1}. {name}" for i, name in enumerate(similar_hair_colors)]
-    )
-    await message.answer(
+    results = candidates_text(similar_hair_colors)
+    await wizard.ask(
+        message, state,
         f"Did you mean one of these colors?\n\n{results}\n\n"
         "Please select one using the buttons below:",
         reply_markup=keyboard1
@@ -389,8 +440,16 @@ async def process_human_eye_color(message: types.Message, state: FSMContext):
 
 @dp.message_handler(state=ClassifyState.HUMAN_HAIR_COLOR)
 async def process_human_gender(message: types.Message, state: FSMContext):
-    await message.delete()
-    await message.answer(f"✨ You have to choose and click from the 🔢 number(s) above\nor you have to click 🔄 Reenter to edit your entry 📝")
+    await wizard.hint(message, state, "✨ You have to choose and click from the 🔢 number(s) above\nor you have to click 🔄 Reenter to edit your entry 📝", delete=True)
+
+
+async def hair_color_chosen(message: types.Message, state: FSMContext, color: str, done: str = None):
+    """
+    Store the hair color and ask for the height.
+    """
+    await state.update_data(hair_color=color)
+    await wizard.ask(message, state, "Finally, what is the height (numeric, in cm)?", done=done)
+    await ClassifyState.human_height.set()
 
 
 @dp.callback_query_handler(lambda call: call.data.startswith("color_"), state=ClassifyState.HUMAN_HAIR_COLOR)
@@ -405,14 +464,9 @@ async def process_color_selection(call: CallbackQuery, state: FSMContext):
     selected_index = int(call.data.split("_")[1])
     selected_color = similar_hair_colors[selected_index]
 
-    # Update the state with the selected color
-    await state.update_data(hair_color=selected_color)
-
     # Acknowledge the selection and move to the next step
-    await call.message.edit_text(f"Hair color selected: {selected_color}")
     await call.answer()
-    await call.message.answer("Finally, what is the height (numeric, in cm)?")
-    await ClassifyState.human_height.set()
+    await hair_color_chosen(call.message, state, selected_color, done=f"Hair color selected: {selected_color}")
 
 
 @dp.callback_query_handler(lambda call: call.data == "reenter_color", state=ClassifyState.HUMAN_HAIR_COLOR)
@@ -421,7 +475,7 @@ async def process_color_reenter(call: CallbackQuery, state: FSMContext):
     """
     Allow the user to reenter the color if they click the Reenter button.
     """
-    await call.message.edit_text("Please provide the hair color again:")
+    await wizard.edit(call.message, state, "Please provide the hair color again:", reply_markup=search_keyboard("color"))
     await call.answer()
 
 
@@ -434,35 +488,16 @@ async def process_human_height(message: types.Message, state: FSMContext):
         height = int(message.text.strip())
 
         # Validate height
-        if height < 50 or height > 250:
-            await message.answer("Invalid height. Please enter a realistic height between 50 cm and 250 cm.")
+        low, high = HUMAN_HEIGHT_RANGE
+        if not low <= height <= high:
+            await wizard.hint(message, state, f"Invalid height. Please enter a realistic height between {low} cm and {high} cm.")
             return
 
         # Save height to state
         await state.update_data(height=height)
 
-        # Retrieve all gathered data
-        data = await state.get_data()
-        gender = data.get("gender", "Not provided")
-        age = data.get("age", "Not provided")
-        nationality = data.get("nationality", "Not provided")
-        education = data.get("education", "Not provided")
-        eye_color = data.get("eye_color", "Not provided")
-        hair_color = data.get("hair_color", "Not provided")
-        height = data.get("height", "Not provided")
-
-        # Format the gathered data
-        summary = (
-            f"📋 **Here is the data you provided:**\n\n"
-            f"👤 Gender: {gender}\n"
-            f"📅 Age: {age} years\n"
-            f"🌍 Nationality: {nationality}\n"
-            f"🎓 Education: {education}\n"
-            f"👁️ Eye Color: {eye_color}\n"
-            f"💇 Hair Color: {hair_color}\n"
-            f"📏 Height: {height} cm\n\n"
-            "Please choose what to do next:"
-        )
+        # Format all gathered data
+        summary = human_summary(await state.get_data())
 
         # Create inline buttons
         keyboard = InlineKeyboardMarkup(row_width=2)
@@ -472,9 +507,9 @@ async def process_human_height(message: types.Message, state: FSMContext):
         )
 
         # Send the summary and buttons
-        await message.answer(summary, reply_markup=keyboard, parse_mode="Markdown")
+        await wizard.ask(message, state, summary, reply_markup=keyboard, parse_mode="Markdown")
     except ValueError:
-        await message.answer("Invalid input. Please enter a numeric value for height (in cm).")
+        await wizard.hint(message, state, "Invalid input. Please enter a numeric value for height (in cm).")
 
 
 @dp.callback_query_handler(lambda call: call.data == "edit_data", state=ClassifyState.human_height)
@@ -499,7 +534,8 @@ async def handle_edit_data(call: CallbackQuery, state: FSMContext):
         keyboard.add(InlineKeyboardButton(text=label, callback_data=callback_data))
 
     # Send the list of steps to the user
-    await call.message.answer(
+    await wizard.ask(
+        call.message, state,
         "✏️ Please choose which field you'd like to edit:",
         reply_markup=keyboard,
     )
@@ -516,7 +552,7 @@ async def edit_gender(call: CallbackQuery, state: FSMContext):
         InlineKeyboardButton(text="👨 Male", callback_data="gender_male"),
         InlineKeyboardButton(text="👩 Female", callback_data="gender_female"),
     )
-    await call.message.edit_text("👤 Please select your gender:", reply_markup=keyboard)
+    await wizard.edit(call.message, state, "👤 Please select your gender:", reply_markup=keyboard)
     await call.answer()
     await ClassifyState.human_gender.set()
 
@@ -526,7 +562,7 @@ async def edit_age(call: CallbackQuery, state: FSMContext):
     """
     Allow the user to edit their age.
     """
-    await call.message.edit_text("📅 Please provide your age (in years):")
+    await wizard.edit(call.message, state, "📅 Please provide your age (in years):")
     await call.answer()
     await ClassifyState.human_age.set()
 
@@ -535,7 +571,7 @@ async def edit_nationality(call: CallbackQuery, state: FSMContext):
     """
     Allow the user to edit their nationality.
     """
-    await call.message.edit_text("🌍 Please provide your nationality:")
+    await wizard.edit(call.message, state, "🌍 Please provide your nationality:")
     await call.answer()
     await ClassifyState.human_nationality.set()
 
@@ -550,7 +586,7 @@ async def edit_education(call: CallbackQuery, state: FSMContext):
         InlineKeyboardButton(text="🎓 Higher", callback_data="education_higher"),
         InlineKeyboardButton(text="🏫 School", callback_data="education_school"),
     )
-    await call.message.edit_text("🎓 Please select your education level:", reply_markup=keyboard)
+    await wizard.edit(call.message, state, "🎓 Please select your education level:", reply_markup=keyboard)
     await call.answer()
     await ClassifyState.human_education.set()
 
@@ -559,7 +595,7 @@ async def edit_eye_color(call: CallbackQuery, state: FSMContext):
     """
     Allow the user to edit their eye color.
     """
-    await call.message.edit_text("👁️ Please provide your eye color:")
+    await wizard.edit(call.message, state, "👁️ Please provide your eye color:")
     await call.answer()
     await ClassifyState.human_eye_color.set()
 
@@ -569,7 +605,7 @@ async def edit_hair_color(call: CallbackQuery, state: FSMContext):
     """
     Allow the user to edit their hair color.
     """
-    await call.message.edit_text("💇 Please provide your hair color:")
+    await wizard.edit(call.message, state, "💇 Please provide your hair color:")
     await call.answer()
     await ClassifyState.human_hair_color.set()
 
@@ -580,27 +616,19 @@ async def edit_height(call: CallbackQuery, state: FSMContext):
     """
     Allow the user to edit their height.
     """
-    await call.message.edit_text("📏 Please provide your height (in cm):")
+    await wizard.edit(call.message, state, "📏 Please provide your height (in cm):")
     await call.answer()
     await ClassifyState.human_height.set()
 
 
 
 @dp.callback_query_handler(lambda call: call.data == "submit_data", state="*")
+@single_flight_submit
 async def handle_submit_data(call: CallbackQuery, state: FSMContext):
     """
     Handle the submission of user data to a Telegram group and Google Sheets, including row count for No. of line.
     """
 
-    # Start with a "processing" message
-    loading_message = await call.message.edit_text("⏳ Processing your data: 0%")
-
-    # Incrementally update the percentage
-    for i in range(10, 101, 10):  # Increment by 10% up to 100%
-        await asyncio.sleep(0.5)  # Simulate processing time
-        await loading_message.edit_text(f"⏳ Processing your data: {i}%")
-
-
     # Retrieve all data from FSMContext
     data = await state.get_data()
     gender = data.get("gender", "Not provided")
@@ -612,25 +640,11 @@ async def handle_submit_data(call: CallbackQuery, state: FSMContext):
     height = data.get("height", "Not provided")
 
     # Generate unique ID and current date
-    unique_id = str(int(datetime.now().timestamp()))
+    unique_id = submission_ids.next_base32()
     current_date = datetime.now().strftime("%Y-%m-%d")
 
-    # Initialize Google Sheets client
-    sheets_client = GoogleSheetsClient(credentials_file="credentials.json", spreadsheet_name="Being Classification Data")
-    sheets_client.authenticate()
-
-    # Fetch existing rows to calculate the row count
-    try:
-        rows = sheets_client.get_data("Humans")  # Replace "Humans" with the correct worksheet name
-        row_count = len(rows)  # Add 1 for the new row
-    except Exception as e:
-        await call.message.edit_text(f"❌ Failed to fetch row count: {e}")
-        await call.answer()
-        return
-
     # Prepare data for group posting
     post_data = {
-        "no_of_line": row_count,  # Use the calculated row count
         "unique_id": unique_id,
         "initiator": call.from_user.full_name,
         "gender": gender,
@@ -645,20 +659,10 @@ async def handle_submit_data(call: CallbackQuery, state: FSMContext):
     }
 
     # Format the message template for group posting
-    group_message = (
-        f"🆔 #{post_data['unique_id']}\n"
-        f"📅 {post_data['date']}\n"
-        f"👤 Specie: {post_data['specie']}\n"
-        f"⚧️ Gender: {post_data.get('gender', 'N/A')}\n"
-        f"🌍 Nationality: {post_data.get('nationality', 'N/A')}\n"
-        f"🎓 Education: {post_data.get('education', 'N/A')}\n"
-        f"👁️ Eye Color: {post_data.get('eye_color', 'N/A')}\n"
-        f"💇 Hair Color: {post_data.get('hair_color', 'N/A')}\n"
-        f"📏 Height: {post_data.get('height', 'N/A')} cm"
-    )
+    group_message = human_group_message(post_data)
 
     sheet_data = {
-        "no_of_line": row_count,  # Use the calculated row count
+        "no_of_line": 0,  # Row count, filled in by the submit pipeline
         "unique_id": unique_id,
         "initiator": call.from_user.full_name,
         "gender": gender,
@@ -674,23 +678,32 @@ async def handle_submit_data(call: CallbackQuery, state: FSMContext):
     # Telegram group ID
     group_id = GROUP_ID  # Replace with your actual group ID
 
-    try:
-        # Post to Telegram group
-        await bot.send_message(chat_id=group_id, text=group_message)
-
-        # Save to Google Sheets
-        sheets_client.append_data("Humans", list(sheet_data.values()))
+    row_data = list(sheet_data.values())
 
-        # Acknowledge success
-        # Final success message
-        await loading_message.edit_text(
-            "✅ Your data has been successfully posted to the group and saved to Google Sheets. Thank you! 🎉")
-        await call.answer()
+    try:
+        # Wait for a free submit worker; the message shows the queue position meanwhile
+        job = submit_queue.put(call.message, "Humans", row_data, call.from_user.id, group_id, group_message)
+    except asyncio.QueueFull:
+        await call.answer(QUEUE_FULL_TEXT, show_alert=True)
+        return
+    await call.answer()
 
+    try:
+        # Row count, group post and Google Sheets append, each within its time budget
+        result = await job
     except Exception as e:
         # Handle errors
-        await call.message.edit_text(f"❌ An error occurred: {e}. Please try again.")
-        await call.answer()
+        await edits.edit(call.message, f"❌ An error occurred: {e}. Please try again.")
+        await state.finish()
+        return
 
-    # Finish the state
+    # Finish the state; the id lets a repeated tap be answered without resubmitting
     await state.finish()
+
+    # The data is saved by now: a failed confirmation is only logged, an error
+    # message here would invite the user to submit it again
+    try:
+        await edits.edit(call.message, result)
+    except Exception as err:
+        logging.warning(f"Submit #{unique_id} saved, but the confirmation was not shown: {err}")
+    return unique_id
@@ -1,24 +1,27 @@
 import asyncio
+import logging
 from datetime import datetime
-from mailbox import Message
-from os.path import defpath
 from filters import IsPrivate
 from aiogram import types
 from aiogram.dispatcher import FSMContext
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery
 
-from loader import dp, bot
+from loader import dp
 from states.classify_state import ClassifyAlienState
 from data.predefined_lists import colors  # Assuming skin colors might be predefined
-from utils.db_api.google_sheets import GoogleSheetsClient
+from utils.edits import edits
+from utils.submit import SubmitError, single_flight_submit
+from utils.submit_queue import QUEUE_FULL_TEXT, submit_queue
+from utils.misc.snowflake import submission_ids
+from utils.validation import ALIEN_WEIGHT_RANGE
+from utils import wizard
 from data.config import GROUP_ID
 
 
 # Entry point for alien classification
 @dp.message_handler(IsPrivate(), state=ClassifyAlienState.humanoid)
-async def start_alien_classification(message: types.Message):
-    await message.delete()
-    await message.answer(f"You have to choose (yes or no) from buttons above👆🏻")
+async def start_alien_classification(message: types.Message, state: FSMContext):
+    await wizard.hint(message, state, f"You have to choose (yes or no) from buttons above👆🏻", delete=True)
 
 # Handle humanoid selection
 @dp.callback_query_handler(lambda call: call.data in ["humanoid_yes", "humanoid_no"], state=ClassifyAlienState.humanoid)
@@ -31,7 +34,7 @@ async def process_humanoid(call: CallbackQuery, state: FSMContext):
 
     if is_humanoid:
         # If humanoid, ask for race
-        await call.message.edit_text("🛸 What is the race of the alien? (e.g., X, Y, Z):")
+        await wizard.edit(call.message, state, "🛸 What is the race of the alien? (e.g., X, Y, Z):")
         await ClassifyAlienState.race.set()
     else:
         """
@@ -69,10 +72,9 @@ async def process_humanoid(call: CallbackQuery, state: FSMContext):
         )
 
         # Send the summary to the user
-        await call.message.edit_text(summary, parse_mode="Markdown", reply_markup=keyboard)
+        await wizard.edit(call.message, state, summary, parse_mode="Markdown", reply_markup=keyboard)
         await call.answer()
-
-        await state.finish()
+        # The data stays in the state until submit_alien_data_no (or Edit) uses it
 
 
 @dp.callback_query_handler(lambda call: call.data == "edit_alien_data_no", state="*")
@@ -90,7 +92,7 @@ async def edit_humanoid_only(call: CallbackQuery, state: FSMContext):
             InlineKeyboardButton(text="✅ Yes", callback_data="humanoid_yes"),
             InlineKeyboardButton(text="❌ No", callback_data="humanoid_no")
         )
-        await call.message.edit_text("🛸 Is the alien humanoid? Please select one:", reply_markup=keyboard)
+        await wizard.edit(call.message, state, "🛸 Is the alien humanoid? Please select one:", reply_markup=keyboard)
         await ClassifyAlienState.humanoid.set()
     else:
         # If humanoid is not "No", allow editing all fields as usual
@@ -105,35 +107,21 @@ async def edit_humanoid_only(call: CallbackQuery, state: FSMContext):
             InlineKeyboardButton(text="1️⃣ Humanoid", callback_data="edit_humanoid"),
             InlineKeyboardButton(text="✅ Done Editing", callback_data="done_editing")
         )
-        await call.message.edit_text(edit_message, parse_mode="Markdown", reply_markup=keyboard)
+        await wizard.edit(call.message, state, edit_message, parse_mode="Markdown", reply_markup=keyboard)
 
     await call.answer()
 
 @dp.callback_query_handler(lambda call: call.data == "submit_alien_data_no", state="*")
+@single_flight_submit
 async def submit_alien_data_no(call: CallbackQuery, state: FSMContext):
     """
     Handle the submission of alien classification data when Humanoid is 'No'.
     Post the data to the group and save it to Google Sheets.
     """
-    # Start with a "processing" message
-    loading_message = await call.message.edit_text("⏳ Processing your data: 0%")
-
-    # Incrementally update the percentage
-    for i in range(10, 101, 10):  # Increment by 10% up to 100%
-        await asyncio.sleep(0.5)  # Simulate processing time
-        await loading_message.edit_text(f"⏳ Processing your data: {i}%")
-
     # Generate unique ID and current date
-    unique_id = str(int(datetime.now().timestamp()))
+    unique_id = submission_ids.next_base32()
     current_date = datetime.now().strftime("%Y-%m-%d")
 
-    # Initialize Google Sheets client
-    sheets_client = GoogleSheetsClient(credentials_file="credentials.json",
-                                       spreadsheet_name="Being Classification Data")
-    sheets_client.authenticate()
-    rows = sheets_client.get_data("Aliens")  # Replace "Humans" with the correct worksheet name
-    row_count = len(rows)
-
     # Fetch all collected data
     data = await state.get_data()
 
@@ -148,19 +136,11 @@ async def submit_alien_data_no(call: CallbackQuery, state: FSMContext):
         f"⚖️ *Weight*: {data.get('weight', 'None')}\n"
     )
 
-    group_id = -1002292534432  # Replace with your group ID
-
-    try:
-        # Post to Telegram group
-        await bot.send_message(chat_id=group_id, text=group_message, parse_mode="Markdown")
-    except Exception as e:
-        await call.message.edit_text(f"❌ Failed to post to the group: {e}")
-        await call.answer()
-        return
+    group_id = GROUP_ID  # Replace with your group ID
 
     # Prepare data for Google Sheets
     row_data = [
-        row_count,  # No. of line
+        0,  # No. of line, filled in by the submit pipeline
         unique_id,   # Unique Bot Data #
         call.from_user.full_name,       # Initiator Name
         data.get("humanoid", "No"),     # Humanoid
@@ -173,22 +153,34 @@ async def submit_alien_data_no(call: CallbackQuery, state: FSMContext):
     ]
 
     try:
-        # Save to Google Sheets
-        sheets_client.append_data("Aliens", row_data)  # Append to the "Aliens" worksheet
-
-        # Acknowledge submission
-        await loading_message.edit_text(
-            "✅ Your data has been successfully posted to the group and saved to Google Sheets. Thank you! 🎉")
-        await call.answer()
+        # Wait for a free submit worker; the message shows the queue position meanwhile
+        job = submit_queue.put(call.message, "Aliens", row_data, call.from_user.id, group_id, group_message,
+                               parse_mode="Markdown")
+    except asyncio.QueueFull:
+        await call.answer(QUEUE_FULL_TEXT, show_alert=True)
+        return
+    await call.answer()
 
-    except Exception as e:
+    try:
+        # Row count, group post and append to the "Aliens" worksheet, each within its time budget
+        result = await job
+    except SubmitError as e:
         # Handle errors
-        await call.message.edit_text(f"❌ Failed to save to Google Sheets: {e}")
-        await call.answer()
+        await edits.edit(call.message, f"❌ {e}")
+        await state.finish()
+        return
 
-    # Finish the state
+    # Finish the state; the id lets a repeated tap be answered without resubmitting
     await state.finish()
 
+    # The data is saved by now: a failed confirmation is only logged, an error
+    # message here would invite the user to submit it again
+    try:
+        await edits.edit(call.message, result)
+    except Exception as err:
+        logging.warning(f"Submit #{unique_id} saved, but the confirmation was not shown: {err}")
+    return unique_id
+
 
 
 @dp.message_handler(IsPrivate(), state=ClassifyAlienState.race)
@@ -199,11 +191,11 @@ async def process_alien_race(message: types.Message, state: FSMContext):
     race = message.text.strip()
     race = race.upper()
     if race not in ["X", "Y", "Z"]:  # Validate race
-        await message.answer("❌ Invalid race. Please enter X, Y, or Z.")
+        await wizard.hint(message, state, "❌ Invalid race. Please enter X, Y, or Z.")
         return
 
     await state.update_data(race=race)
-    await message.answer("🎨 What is the alien's skin color?")
+    await wizard.ask(message, state, "🎨 What is the alien's skin color?")
     await ClassifyAlienState.skin_color.set()
 
 @dp.message_handler(IsPrivate(), state=ClassifyAlienState.skin_color)
@@ -213,7 +205,7 @@ async def process_alien_skin_color(message: types.Message, state: FSMContext):
     """
     skin_color = message.text.strip().capitalize()
     if skin_color not in colors:  # Check if the color exists in predefined colors
-        await message.answer(f"❌ Invalid color. Please provide a valid skin color.")
+        await wizard.hint(message, state, f"❌ Invalid color. Please provide a valid skin color.")
         return
 
     await state.update_data(skin_color=skin_color)
@@ -224,13 +216,12 @@ async def process_alien_skin_color(message: types.Message, state: FSMContext):
         InlineKeyboardButton(text="✅ Yes", callback_data="dangerous_yes"),
         InlineKeyboardButton(text="❌ No", callback_data="dangerous_no"),
     )
-    await message.answer("🛸 Is the alien dangerous?", reply_markup=keyboard)
+    await wizard.ask(message, state, "🛸 Is the alien dangerous?", reply_markup=keyboard)
     await ClassifyAlienState.dangerous.set()
 
 @dp.message_handler(IsPrivate(), state=ClassifyAlienState.dangerous)
 async def error_dangerous(message: types.Message, state: FSMContext):
-    await message.delete()
-    await message.answer(f"You have choose yes or no button above👆🏻")
+    await wizard.hint(message, state, f"You have choose yes or no button above👆🏻", delete=True)
 
 @dp.callback_query_handler(lambda call: call.data in ["dangerous_yes", "dangerous_no"], state=ClassifyAlienState.dangerous)
 async def process_alien_dangerous(call: CallbackQuery, state: FSMContext):
@@ -246,13 +237,12 @@ async def process_alien_dangerous(call: CallbackQuery, state: FSMContext):
         InlineKeyboardButton(text="✅ Yes", callback_data="reason_yes"),
         InlineKeyboardButton(text="❌ No", callback_data="reason_no"),
     )
-    await call.message.edit_text("🛸 Does the alien have a reason?", reply_markup=keyboard)
+    await wizard.edit(call.message, state, "🛸 Does the alien have a reason?", reply_markup=keyboard)
     await ClassifyAlienState.has_reason.set()
 
 @dp.message_handler(IsPrivate(), state=ClassifyAlienState.has_reason)
 async def error_dangerous(message: types.Message, state: FSMContext):
-    await message.delete()
-    await message.answer(f"You have choose yes or no button above👆🏻")
+    await wizard.hint(message, state, f"You have choose yes or no button above👆🏻", delete=True)
 
 @dp.callback_query_handler(lambda call: call.data in ["reason_yes", "reason_no"], state=ClassifyAlienState.has_reason)
 async def process_alien_reason(call: CallbackQuery, state: FSMContext):
@@ -262,7 +252,7 @@ async def process_alien_reason(call: CallbackQuery, state: FSMContext):
     has_reason = call.data == "reason_yes"
     await state.update_data(has_reason="Yes" if has_reason else "No")
 
-    await call.message.edit_text("⚖️ What is the alien's weight (in kg)?")
+    await wizard.edit(call.message, state, "⚖️ What is the alien's weight (in kg)?")
     await ClassifyAlienState.weight.set()
 
 
@@ -273,9 +263,10 @@ async def process_alien_weight(message: types.Message, state: FSMContext):
     """
     weight = message.text.strip()
 
-    # Validate weight
-    if not weight.isdigit() or int(weight) <= 0:
-        await message.answer("❌ Invalid weight. Please provide a valid weight in kilograms.")
+    # Validate weight (same range as the bulk import)
+    low, high = ALIEN_WEIGHT_RANGE
+    if not weight.isdigit() or not low <= int(weight) <= high:
+        await wizard.hint(message, state, "❌ Invalid weight. Please provide a valid weight in kilograms.")
         return
 
     # Save weight to state
@@ -303,7 +294,7 @@ async def process_alien_weight(message: types.Message, state: FSMContext):
     )
 
     # Send summary to the user
-    await message.answer(summary, parse_mode="Markdown", reply_markup=keyboard)
+    await wizard.ask(message, state, summary, parse_mode="Markdown", reply_markup=keyboard)
 
 @dp.callback_query_handler(lambda call: call.data == "edit_alien_data", state="*")
 async def edit_alien_data(call: CallbackQuery, state: FSMContext):
@@ -338,7 +329,7 @@ async def edit_alien_data(call: CallbackQuery, state: FSMContext):
     )
 
     # Send the edit options to the user
-    await call.message.edit_text(edit_message, parse_mode="Markdown", reply_markup=keyboard)
+    await wizard.edit(call.message, state, edit_message, parse_mode="Markdown", reply_markup=keyboard)
     await call.answer()
 
 @dp.callback_query_handler(lambda call: call.data == "edit_humanoid", state="*")
@@ -351,7 +342,7 @@ async def edit_humanoid(call: CallbackQuery, state: FSMContext):
         InlineKeyboardButton(text="✅ Yes", callback_data="humanoid_yes"),
         InlineKeyboardButton(text="❌ No", callback_data="humanoid_no"),
     )
-    await call.message.edit_text("🛸 Is the alien humanoid? Please select one:", reply_markup=keyboard)
+    await wizard.edit(call.message, state, "🛸 Is the alien humanoid? Please select one:", reply_markup=keyboard)
     await ClassifyAlienState.humanoid.set()
 
 
@@ -360,7 +351,7 @@ async def edit_race(call: CallbackQuery, state: FSMContext):
     """
     Allow the user to edit the race field.
     """
-    await call.message.edit_text("🛸 What is the race of the alien? (e.g., X, Y, Z):")
+    await wizard.edit(call.message, state, "🛸 What is the race of the alien? (e.g., X, Y, Z):")
     await ClassifyAlienState.race.set()
 
 @dp.callback_query_handler(lambda call: call.data == "edit_skin_color", state="*")
@@ -368,7 +359,7 @@ async def edit_skin_color(call: CallbackQuery, state: FSMContext):
     """
     Allow the user to edit the skin color field.
     """
-    await call.message.edit_text("🎨 What is the alien's skin color?")
+    await wizard.edit(call.message, state, "🎨 What is the alien's skin color?")
     await ClassifyAlienState.skin_color.set()
 
 @dp.callback_query_handler(lambda call: call.data == "edit_dangerous", state="*")
@@ -381,7 +372,7 @@ async def edit_dangerous(call: CallbackQuery, state: FSMContext):
         InlineKeyboardButton(text="✅ Yes", callback_data="dangerous_yes"),
         InlineKeyboardButton(text="❌ No", callback_data="dangerous_no"),
     )
-    await call.message.edit_text("⚠️ Is the alien dangerous?", reply_markup=keyboard)
+    await wizard.edit(call.message, state, "⚠️ Is the alien dangerous?", reply_markup=keyboard)
     await ClassifyAlienState.dangerous.set()
 
 @dp.callback_query_handler(lambda call: call.data == "edit_has_reason", state="*")
@@ -394,7 +385,7 @@ async def edit_has_reason(call: CallbackQuery, state: FSMContext):
         InlineKeyboardButton(text="✅ Yes", callback_data="reason_yes"),
         InlineKeyboardButton(text="❌ No", callback_data="reason_no"),
     )
-    await call.message.edit_text("🧐 Does the alien have a reason?", reply_markup=keyboard)
+    await wizard.edit(call.message, state, "🧐 Does the alien have a reason?", reply_markup=keyboard)
     await ClassifyAlienState.has_reason.set()
 
 @dp.callback_query_handler(lambda call: call.data == "edit_weight", state="*")
@@ -402,7 +393,7 @@ async def edit_weight(call: CallbackQuery, state: FSMContext):
     """
     Allow the user to edit the weight field.
     """
-    await call.message.edit_text("⚖️ What is the alien's weight (in kg)?")
+    await wizard.edit(call.message, state, "⚖️ What is the alien's weight (in kg)?")
     await ClassifyAlienState.weight.set()
 
 @dp.callback_query_handler(lambda call: call.data == "done_editing", state="*")
@@ -429,34 +420,21 @@ async def done_editing(call: CallbackQuery, state: FSMContext):
         InlineKeyboardButton(text="✅ Submit Data", callback_data="submit_alien_data")
     )
 
-    await call.message.edit_text(summary, parse_mode="Markdown", reply_markup=keyboard)
+    await wizard.edit(call.message, state, summary, parse_mode="Markdown", reply_markup=keyboard)
     await call.answer()
 
 
 @dp.callback_query_handler(lambda call: call.data == "submit_alien_data", state="*")
+@single_flight_submit
 async def submit_alien_data(call: CallbackQuery, state: FSMContext):
     """
     Handle the submission of alien classification data.
     Post the data to the group and save it to Google Sheets.
     """
-    # Start with a "processing" message
-    loading_message = await call.message.edit_text("⏳ Processing your data: 0%")
-
-    # Incrementally update the percentage
-    for i in range(10, 101, 10):  # Increment by 10% up to 100%
-        await asyncio.sleep(0.5)  # Simulate processing time
-        await loading_message.edit_text(f"⏳ Processing your data: {i}%")
-
     # Generate unique ID and current date
-    unique_id = str(int(datetime.now().timestamp()))
+    unique_id = submission_ids.next_base32()
     current_date = datetime.now().strftime("%Y-%m-%d")
 
-    # Initialize Google Sheets client
-    sheets_client = GoogleSheetsClient(credentials_file="credentials.json",
-                                       spreadsheet_name="Being Classification Data")
-    sheets_client.authenticate()
-    rows = sheets_client.get_data("Aliens")  # Replace "Humans" with the correct worksheet name
-    row_count = len(rows)
     # Fetch all collected data
     data = await state.get_data()
 
@@ -473,17 +451,9 @@ async def submit_alien_data(call: CallbackQuery, state: FSMContext):
 
     group_id = GROUP_ID  # Replace with your group ID
 
-    try:
-        # Post to Telegram group
-        await bot.send_message(chat_id=group_id, text=group_message, parse_mode="Markdown")
-    except Exception as e:
-        await call.message.edit_text(f"❌ Failed to post to the group: {e}")
-        await call.answer()
-        return
-
     # Prepare data for Google Sheets
     row_data = [
-        row_count,  # No. of line (to be dynamically calculated)
+        0,  # No. of line, filled in by the submit pipeline
         unique_id,   # Unique Bot Data #
         call.from_user.full_name,       # Initiator Name
         data.get("humanoid", "N/A"),    # Humanoid
@@ -496,18 +466,30 @@ async def submit_alien_data(call: CallbackQuery, state: FSMContext):
     ]
 
     try:
-        # Save to Google Sheets
-        sheets_client.append_data("Aliens", row_data)  # Append to the "Aliens" worksheet
-
-        # Acknowledge submission
-        await loading_message.edit_text(
-            "✅ Your data has been successfully posted to the group and saved to Google Sheets. Thank you! 🎉")
-        await call.answer()
+        # Wait for a free submit worker; the message shows the queue position meanwhile
+        job = submit_queue.put(call.message, "Aliens", row_data, call.from_user.id, group_id, group_message,
+                               parse_mode="Markdown")
+    except asyncio.QueueFull:
+        await call.answer(QUEUE_FULL_TEXT, show_alert=True)
+        return
+    await call.answer()
 
-    except Exception as e:
+    try:
+        # Row count, group post and append to the "Aliens" worksheet, each within its time budget
+        result = await job
+    except SubmitError as e:
         # Handle errors
-        await call.message.edit_text(f"❌ Failed to save to Google Sheets: {e}")
-        await call.answer()
+        await edits.edit(call.message, f"❌ {e}")
+        await state.finish()
+        return
 
-    # Finish the state
+    # Finish the state; the id lets a repeated tap be answered without resubmitting
     await state.finish()
+
+    # The data is saved by now: a failed confirmation is only logged, an error
+    # message here would invite the user to submit it again
+    try:
+        await edits.edit(call.message, result)
+    except Exception as err:
+        logging.warning(f"Submit #{unique_id} saved, but the confirmation was not shown: {err}")
+    return unique_id
@@ -1,16 +1,32 @@
 import asyncio
+import logging
 from datetime import datetime
-from difflib import get_close_matches
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery
 from aiogram import types
 from aiogram.dispatcher import FSMContext
-from loader import dp, bot
-from filters import IsPrivate
-from data.predefined_lists import animals, colors
+from loader import dp
+from filters import InlinePick, IsPrivate
+from keyboards.inline.candidates import candidates_keyboard, candidates_text
+from keyboards.inline.search import search_keyboard
+from utils.misc.fuzzy import animal_index, color_index
+from utils.validation import ANIMAL_AGE_RANGE, ANIMAL_WEIGHT_RANGE
 from states.classify_state import ClassifyAnimalState
-from utils.db_api.google_sheets import GoogleSheetsClient
+from utils.edits import edits
+from utils.submit import single_flight_submit
+from utils.submit_queue import QUEUE_FULL_TEXT, submit_queue
+from utils.misc.snowflake import submission_ids
+from utils import wizard
 from data.config import GROUP_ID
 
+@dp.message_handler(IsPrivate(), InlinePick(animal_index),
+                    state=[ClassifyAnimalState.species, ClassifyAnimalState.SPECIES])
+async def pick_animal_species(message: types.Message, state: FSMContext, pick: str):
+    """
+    Species chosen from the inline suggestions: no "Did you mean" round trip.
+    """
+    await species_chosen(message, state, pick)
+
+
 @dp.message_handler(IsPrivate(), state=ClassifyAnimalState.species)
 async def process_animal_species(message: types.Message, state: FSMContext):
     """
@@ -20,26 +36,24 @@ async def process_animal_species(message: types.Message, state: FSMContext):
 
     # Validate if the input is purely text
     if not input_text.isalpha():
-        await message.answer("Invalid input. Please provide a valid text-only species (e.g., Dog, Cat).")
+        await wizard.hint(message, state, "Invalid input. Please provide a valid text-only species (e.g., Dog, Cat).")
         return
 
     # Capitalize the input and search for similar animals
     species = input_text.capitalize()
-    similar_animals = get_close_matches(species, animals, n=10, cutoff=0.4)
+    similar_animals = animal_index.close_matches(species)
 
     if not similar_animals:
-        await message.answer("No similar animals found. Please try again with a different input.")
+        await wizard.hint(message, state, "No similar animals found. Please try again with a different input.")
         return
 
-    # Create an inline keyboard with a maximum of 5 buttons per row
-    keyboard = InlineKeyboardMarkup(row_width=5)
-    for i, name in enumerate(similar_animals):
-        keyboard.insert(InlineKeyboardButton(text=f"{i + 1}", callback_data=f"animal_{i}"))
-    keyboard.add(InlineKeyboardButton(text="🔄 Reenter", callback_data="reenter_species"))
+    # Numbered buttons for the candidates (cached keyboard)
+    keyboard = candidates_keyboard("animal", len(similar_animals), "reenter_species")
 
     # Send the message with the results and buttons
-    results = "\n".join([f"{i + 1}. {name}" for i, name in enumerate(similar_animals)])
-    await message.answer(
+    results = candidates_text(similar_animals)
+    await wizard.ask(
+        message, state,
         f"Did you mean one of these animals?\n\n{results}\n\n"
         "Please select one using the buttons below:",
         reply_markup=keyboard
@@ -52,8 +66,24 @@ async def process_animal_species(message: types.Message, state: FSMContext):
 
 @dp.message_handler(IsPrivate(), state=ClassifyAnimalState.SPECIES)
 async def process_animal_species_repeat(message: types.Message, state: FSMContext):
-    await message.delete()
-    await message.answer("✨ You have to choose and click from the 🔢 number(s) above\nor you have to click 🔄 Reenter to edit your entry 📝")
+    await wizard.hint(message, state, "✨ You have to choose and click from the 🔢 number(s) above\n"
+                                      "or you have to click 🔄 Reenter to edit your entry 📝", delete=True)
+
+
+async def species_chosen(message: types.Message, state: FSMContext, species: str, done: str = None):
+    """
+    Store the species and ask whether it is a mammal.
+    """
+    await state.update_data(species=species)
+    keyboard = InlineKeyboardMarkup(row_width=2)
+    keyboard.add(
+        InlineKeyboardButton(text="✅ Yes", callback_data="mammal_yes"),
+        InlineKeyboardButton(text="❌ No", callback_data="mammal_no")
+    )
+
+    await wizard.ask(message, state, "🦘 Is this a mammal? (Yes/No)\n\nPlease select one:", reply_markup=keyboard,
+                     done=done)
+    await ClassifyAnimalState.mammal.set()
 
 
 @dp.callback_query_handler(lambda call: call.data.startswith("animal_"), state=ClassifyAnimalState.SPECIES)
@@ -68,20 +98,9 @@ async def process_animal_selection(call: CallbackQuery, state: FSMContext):
     selected_index = int(call.data.split("_")[1])
     selected_species = similar_animals[selected_index]
 
-    # Update the state with the selected species
-    await state.update_data(species=selected_species)
-
     # Acknowledge the selection and move to the next step
-    await call.message.edit_text(f"Species selected: {selected_species}")
     await call.answer()
-    keyboard = InlineKeyboardMarkup(row_width=2)
-    keyboard.add(
-        InlineKeyboardButton(text="✅ Yes", callback_data="mammal_yes"),
-        InlineKeyboardButton(text="❌ No", callback_data="mammal_no")
-    )
-
-    await call.message.answer("🦘 Is this a mammal? (Yes/No)\n\nPlease select one:", reply_markup=keyboard)
-    await ClassifyAnimalState.mammal.set()
+    await species_chosen(call.message, state, selected_species, done=f"Species selected: {selected_species}")
 
 
 @dp.callback_query_handler(lambda call: call.data == "reenter_species", state=ClassifyAnimalState.SPECIES)
@@ -90,13 +109,12 @@ async def process_animal_reenter(call: CallbackQuery, state: FSMContext):
     Allow the user to reenter the species if they click the Reenter button.
     """
     await ClassifyAnimalState.species.set()
-    await call.message.edit_text("Please provide the species again:")
+    await wizard.edit(call.message, state, "Please provide the species again:", reply_markup=search_keyboard("species"))
     await call.answer()
 
 @dp.message_handler(IsPrivate(), state=ClassifyAnimalState.mammal)
 async def process_animal_mammal(message: types.Message, state: FSMContext):
-    await message.delete()
-    await message.answer(f"You have to choose, yes or no button above\nnothing else is accepted")
+    await wizard.hint(message, state, "You have to choose, yes or no button above\nnothing else is accepted", delete=True)
 
 @dp.callback_query_handler(lambda call: call.data in ["mammal_yes", "mammal_no"], state=ClassifyAnimalState.mammal)
 async def process_mammal_response(call: CallbackQuery, state: FSMContext):
@@ -107,7 +125,6 @@ async def process_mammal_response(call: CallbackQuery, state: FSMContext):
     await state.update_data(mammal=is_mammal)
 
     # Acknowledge the user's response and move to the next question
-    await call.message.edit_text(f"🦘 Mammal: {is_mammal}")
     await call.answer()
 
     # Move to the next step: Is this a predator?
@@ -117,13 +134,13 @@ async def process_mammal_response(call: CallbackQuery, state: FSMContext):
         InlineKeyboardButton(text="🐾 No", callback_data="predator_no")
     )
 
-    await call.message.answer("🦁 Is this a predator? Please select one:", reply_markup=keyboard)
+    await wizard.ask(call.message, state, "🦁 Is this a predator? Please select one:", reply_markup=keyboard,
+                     done=f"🦘 Mammal: {is_mammal}")
     await ClassifyAnimalState.predator.set()
 
 @dp.message_handler(IsPrivate(), state=ClassifyAnimalState.predator)
 async def process_animal_mammal(message: types.Message, state: FSMContext):
-    await message.delete()
-    await message.answer(f"You have to choose, yes or no button above\nnothing else is accepted")
+    await wizard.hint(message, state, "You have to choose, yes or no button above\nnothing else is accepted", delete=True)
 
 @dp.callback_query_handler(lambda call: call.data in ["predator_yes", "predator_no"], state=ClassifyAnimalState.predator)
 async def process_predator_response(call: CallbackQuery, state: FSMContext):
@@ -134,14 +151,19 @@ async def process_predator_response(call: CallbackQuery, state: FSMContext):
     await state.update_data(predator=is_predator)
 
     # Acknowledge the user's response
-    await call.message.edit_text(f"🦁 Predator: {is_predator}")
     await call.answer()
 
     # Move to the next step: Animal color
-    await call.message.answer("🎨 What is the color of the animal? (e.g., Brown, White, Black):")
+    await wizard.ask(call.message, state, "🎨 What is the color of the animal? (e.g., Brown, White, Black):",
+                     reply_markup=search_keyboard("color"), done=f"🦁 Predator: {is_predator}")
     await ClassifyAnimalState.color.set()
 
 
+@dp.message_handler(IsPrivate(), InlinePick(color_index), state=ClassifyAnimalState.color)
+async def pick_animal_color(message: types.Message, state: FSMContext, pick: str):
+    await animal_color_chosen(message, state, pick)
+
+
 @dp.message_handler(IsPrivate(), state=ClassifyAnimalState.color)
 async def process_animal_color(message: types.Message, state: FSMContext):
     """
@@ -151,26 +173,24 @@ async def process_animal_color(message: types.Message, state: FSMContext):
 
     # Validate if the input is purely text
     if not input_text.isalpha():
-        await message.answer("❌ Invalid input. Please provide a valid text-only color (e.g., Brown, Black, White).")
+        await wizard.hint(message, state, "❌ Invalid input. Please provide a valid text-only color (e.g., Brown, Black, White).")
         return
 
     # Capitalize the input and search for similar colors
     color_input = input_text.capitalize()
-    similar_colors = get_close_matches(color_input, colors, n=10, cutoff=0.4)
+    similar_colors = color_index.close_matches(color_input)
 
     if not similar_colors:
-        await message.answer("❌ No similar colors found. Please try again with a different input.")
+        await wizard.hint(message, state, "❌ No similar colors found. Please try again with a different input.")
         return
 
-    # Create a dynamic inline keyboard for color selection
-    keyboard = InlineKeyboardMarkup(row_width=5)
-    for i, color in enumerate(similar_colors):
-        keyboard.insert(InlineKeyboardButton(text=f"{i + 1}", callback_data=f"color_{i}"))
-    keyboard.add(InlineKeyboardButton(text="🔄 Reenter", callback_data="reenter_color"))
+    # Numbered buttons for the candidates (cached keyboard)
+    keyboard = candidates_keyboard("color", len(similar_colors), "reenter_color")
 
     # Send the message with the results and buttons
-    results = "\n".join([f"{i + 1}. {color}" for i, color in enumerate(similar_colors)])
-    await message.answer(
+    results = candidates_text(similar_colors)
+    await wizard.ask(
+        message, state,
         f"🎨 Did you mean one of these colors?\n\n{results}\n\n"
         "Please select one using the buttons below:",
         reply_markup=keyboard
@@ -179,6 +199,15 @@ async def process_animal_color(message: types.Message, state: FSMContext):
     # Save the similar colors in FSMContext for later selection
     await state.update_data(similar_colors=similar_colors)
 
+async def animal_color_chosen(message: types.Message, state: FSMContext, color: str, done: str = None):
+    """
+    Store the color and ask for the weight.
+    """
+    await state.update_data(color=color)
+    await wizard.ask(message, state, "⚖️ What is the weight of the animal? (in kg):", done=done)
+    await ClassifyAnimalState.weight.set()
+
+
 @dp.callback_query_handler(lambda call: call.data.startswith("color_"), state=ClassifyAnimalState.color)
 async def process_color_selection(call: CallbackQuery, state: FSMContext):
     """
@@ -192,16 +221,9 @@ async def process_color_selection(call: CallbackQuery, state: FSMContext):
         selected_index = int(call.data.split("_")[1])
         selected_color = similar_colors[selected_index]
 
-        # Save the selected color to the state
-        await state.update_data(color=selected_color)
-
         # Acknowledge the selection and move to the next step
-        await call.message.edit_text(f"🎨 Color selected: {selected_color}")
         await call.answer()
-
-        # Ask the user for the animal's weight
-        await call.message.answer("⚖️ What is the weight of the animal? (in kg):")
-        await ClassifyAnimalState.weight.set()
+        await animal_color_chosen(call.message, state, selected_color, done=f"🎨 Color selected: {selected_color}")
     except (ValueError, IndexError):
         await call.answer("❌ An error occurred while processing your selection. Please try again.", show_alert=True)
 
@@ -212,7 +234,7 @@ async def process_color_reenter(call: CallbackQuery, state: FSMContext):
     Allow the user to reenter the color if they click the Reenter button.
     """
     await ClassifyAnimalState.color.set()
-    await call.message.edit_text("🎨 Please provide the color again:")
+    await wizard.edit(call.message, state, "🎨 Please provide the color again:", reply_markup=search_keyboard("color"))
     await call.answer()
 
 @dp.message_handler(IsPrivate(), state=ClassifyAnimalState.weight)
@@ -224,21 +246,23 @@ async def process_animal_weight(message: types.Message, state: FSMContext):
 
     # Validate if the input is numeric
     if not input_text.isdigit():
-        await message.answer("❌ Invalid input. Please provide a numeric value for the weight (e.g., 15, 200).")
+        await wizard.hint(message, state, "❌ Invalid input. Please provide a numeric value for the weight (e.g., 15, 200).")
         return
 
     # Convert input to integer and validate the range
     weight = int(input_text)
-    if weight <= 0 or weight > 10000:  # Assuming 10,000 kg is a reasonable maximum weight for an animal
-        await message.answer("❌ Invalid weight. Please provide a realistic weight value (e.g., between 1 and 10,000 kg).")
+    low, high = ANIMAL_WEIGHT_RANGE  # Same range as the bulk import
+    if not low <= weight <= high:
+        await wizard.hint(message, state,
+                          f"❌ Invalid weight. Please provide a realistic weight value (e.g., between {low} and {high:,} kg).")
         return
 
     # Save the weight to the state
     await state.update_data(weight=weight)
 
     # Acknowledge the weight and move to the next step
-    await message.answer(f"⚖️ Weight: {weight} kg recorded.")
-    await message.answer("📅 What is the age of the animal? (in months):")
+    await wizard.ask(message, state, "📅 What is the age of the animal? (in months):",
+                     done=f"⚖️ Weight: {weight} kg recorded.")
     await ClassifyAnimalState.age.set()
 
 
@@ -251,21 +275,22 @@ async def process_animal_age(message: types.Message, state: FSMContext):
 
     # Validate if the input is numeric
     if not input_text.isdigit():
-        await message.answer("❌ Invalid input. Please provide a numeric value for the age (e.g., 12, 60).")
+        await wizard.hint(message, state, "❌ Invalid input. Please provide a numeric value for the age (e.g., 12, 60).")
         return
 
     # Convert input to integer and validate the range
     age = int(input_text)
-    if age < 0 or age > 3600:  # Assuming 3600 months (~300 years) is a reasonable maximum age for an animal
-        await message.answer("❌ Invalid age. Please provide a realistic age value (e.g., between 0 and 3600 months).")
+    low, high = ANIMAL_AGE_RANGE  # Same range as the bulk import
+    if not low <= age <= high:
+        await wizard.hint(message, state,
+                          f"❌ Invalid age. Please provide a realistic age value (e.g., between {low} and {high} months).")
         return
 
     # Save the age to the state
     await state.update_data(age=age)
 
-    # Acknowledge the age and finish the classification process
-    await message.answer(f"📅 Age: {age} months recorded.")
-    await message.answer("✅ Classification complete! You can now submit the data or edit it.")
+    # Acknowledged together with the summary below
+    done = (f"📅 Age: {age} months recorded.", "✅ Classification complete! You can now submit the data or edit it.")
 
     """
         Display the final collected data to the user for review.
@@ -290,7 +315,7 @@ async def process_animal_age(message: types.Message, state: FSMContext):
     )
 
     # Display the final summary
-    await message.answer(summary, reply_markup=keyboard)
+    await wizard.ask(message, state, summary, reply_markup=keyboard, done=done)
     # await message.answer()
 
 
@@ -316,7 +341,8 @@ async def edit_animal_data(call: CallbackQuery, state: FSMContext):
         keyboard.insert(InlineKeyboardButton(text=f"{i}", callback_data=f"edit_animal_{i}"))
     keyboard.add(InlineKeyboardButton(text="❌ Cancel", callback_data="cancel_edit"))
 
-    await call.message.edit_text(
+    await wizard.edit(
+        call.message, state,
         f"✏️ Select the part you want to edit:\n\n{steps_text}",
         reply_markup=keyboard
     )
@@ -328,7 +354,7 @@ async def edit_species(call: CallbackQuery, state: FSMContext):
     Allow the user to reenter the species.
     """
     await ClassifyAnimalState.species.set()
-    await call.message.edit_text("🦘 Please provide the species again:")
+    await wizard.edit(call.message, state, "🦘 Please provide the species again:")
     await call.answer()
 
 
@@ -343,7 +369,7 @@ async def edit_mammal(call: CallbackQuery, state: FSMContext):
         InlineKeyboardButton(text="✅ Yes", callback_data="mammal_yes"),
         InlineKeyboardButton(text="❌ No", callback_data="mammal_no")
     )
-    await call.message.edit_text("🦘 Is this a mammal? Please select one:", reply_markup=keyboard)
+    await wizard.edit(call.message, state, "🦘 Is this a mammal? Please select one:", reply_markup=keyboard)
     await call.answer()
 
 
@@ -358,7 +384,7 @@ async def edit_predator(call: CallbackQuery, state: FSMContext):
         InlineKeyboardButton(text="🦁 Yes", callback_data="predator_yes"),
         InlineKeyboardButton(text="🐾 No", callback_data="predator_no")
     )
-    await call.message.edit_text("🦁 Is this a predator? Please select one:", reply_markup=keyboard)
+    await wizard.edit(call.message, state, "🦁 Is this a predator? Please select one:", reply_markup=keyboard)
     await call.answer()
 
 
@@ -368,7 +394,7 @@ async def edit_color(call: CallbackQuery, state: FSMContext):
     Allow the user to reenter the color data.
     """
     await ClassifyAnimalState.color.set()
-    await call.message.edit_text("🎨 Please provide the color again:")
+    await wizard.edit(call.message, state, "🎨 Please provide the color again:", reply_markup=search_keyboard("color"))
     await call.answer()
 
 
@@ -378,7 +404,7 @@ async def edit_weight(call: CallbackQuery, state: FSMContext):
     Allow the user to reenter the weight data.
     """
     await ClassifyAnimalState.weight.set()
-    await call.message.edit_text("⚖️ Please provide the weight again (in kg):")
+    await wizard.edit(call.message, state, "⚖️ Please provide the weight again (in kg):")
     await call.answer()
 
 
@@ -388,7 +414,7 @@ async def edit_age(call: CallbackQuery, state: FSMContext):
     Allow the user to reenter the age data.
     """
     await ClassifyAnimalState.age.set()
-    await call.message.edit_text("📅 Please provide the age again (in months):")
+    await wizard.edit(call.message, state, "📅 Please provide the age again (in months):")
     await call.answer()
 
 
@@ -398,80 +424,76 @@ async def edit_age(call: CallbackQuery, state: FSMContext):
     Allow the user to reenter the age data.
     """
     await ClassifyAnimalState.age.set()
-    await call.message.edit_text("📅 Please provide the age again (in months):")
+    await wizard.edit(call.message, state, "📅 Please provide the age again (in months):")
     await call.answer()
 
 
 @dp.callback_query_handler(lambda call: call.data == "submit_animal_data", state="*")
+@single_flight_submit
 async def submit_animal_data(call: CallbackQuery, state: FSMContext):
     """
     Submit the final animal classification data.
     """
 
-    # Start with a "processing" message
-    loading_message = await call.message.edit_text("⏳ Processing your data: 0%")
-
-    # Incrementally update the percentage
-    for i in range(10, 101, 10):  # Increment by 10% up to 100%
-        await asyncio.sleep(0.5)  # Simulate processing time
-        await loading_message.edit_text(f"⏳ Processing your data: {i}%")
-
     data = await state.get_data()
     # Telegram group ID
     group_id = GROUP_ID  # Replace with your actual group ID
 
-    # Initialize Google Sheets client
-    sheets_client = GoogleSheetsClient(credentials_file="credentials.json",
-                                       spreadsheet_name="Being Classification Data")
-    sheets_client.authenticate()
-
     # Generate unique ID and current date
-    unique_id = str(int(datetime.now().timestamp()))
+    unique_id = submission_ids.next_base32()
     current_date = datetime.now().strftime("%Y-%m-%d")
-    rows = sheets_client.get_data("Animals")  # Replace "Humans" with the correct worksheet name
-    row_count = len(rows)
+
+    # Prepare data for submission
+    row_data = [
+        0,  # No. of line, filled in by the submit pipeline
+        unique_id,
+        call.from_user.full_name,
+        data.get("species", "N/A"),    # Species
+        data.get("mammal", "N/A"),     # Mammal
+        data.get("predator", "N/A"),   # Predator
+        data.get("color", "N/A"),      # Color
+        data.get("weight", "N/A"),     # Weight
+        data.get("age", "N/A"),        # Age
+        current_date       # Date
+    ]
+
+    # Format the message template for group posting
+    group_message = (
+        f"📋 *Animal Classification Report*\n\n"
+        f"🔢 *ID*: #{unique_id}\n"
+        f"📅 *Date*: {current_date}\n\n"
+        f"🦘 *Species*: {data.get('species', 'N/A')}\n"
+        f"✅ *Mammal*: {data.get('mammal', 'N/A')}\n"
+        f"🦁 *Predator*: {data.get('predator', 'N/A')}\n"
+        f"🎨 *Color*: {data.get('color', 'N/A')}\n"
+        f"⚖️ *Weight*: {data.get('weight', 'N/A')} kg\n"
+        f"📅 *Age*: {data.get('age', 'N/A')} months\n"
+    )
 
     try:
-        # Prepare data for submission
-        row_data = [
-            row_count,  # No. of line (You need to calculate this dynamically)
-            unique_id,
-            call.from_user.full_name,
-            data.get("species", "N/A"),    # Species
-            data.get("mammal", "N/A"),     # Mammal
-            data.get("predator", "N/A"),   # Predator
-            data.get("color", "N/A"),      # Color
-            data.get("weight", "N/A"),     # Weight
-            data.get("age", "N/A"),        # Age
-            current_date       # Date
-        ]
-
-        # Format the message template for group posting
-        group_message = (
-            f"📋 *Animal Classification Report*\n\n"
-            f"🔢 *ID*: #{unique_id}\n"
-            f"📅 *Date*: {current_date}\n\n"
-            f"🦘 *Species*: {data.get('species', 'N/A')}\n"
-            f"✅ *Mammal*: {data.get('mammal', 'N/A')}\n"
-            f"🦁 *Predator*: {data.get('predator', 'N/A')}\n"
-            f"🎨 *Color*: {data.get('color', 'N/A')}\n"
-            f"⚖️ *Weight*: {data.get('weight', 'N/A')} kg\n"
-            f"📅 *Age*: {data.get('age', 'N/A')} months\n"
-        )
-
-        # Post to Telegram group
-        await bot.send_message(chat_id=group_id, text=group_message)
-        sheets_client.append_data("Animals", row_data)
-
-        # Final success message
-        await loading_message.edit_text(
-            "✅ Your data has been successfully posted to the group and saved to Google Sheets. Thank you! 🎉")
-        await call.answer()
+        # Wait for a free submit worker; the message shows the queue position meanwhile
+        job = submit_queue.put(call.message, "Animals", row_data, call.from_user.id, group_id, group_message)
+    except asyncio.QueueFull:
+        await call.answer(QUEUE_FULL_TEXT, show_alert=True)
+        return
+    await call.answer()
 
+    try:
+        # Row count, group post and Google Sheets append, each within its time budget
+        result = await job
     except Exception as e:
         # Handle errors
-        await call.message.edit_text(f"❌ An error occurred: {e}. Please try again.")
-        await call.answer()
+        await edits.edit(call.message, f"❌ An error occurred: {e}. Please try again.")
+        await state.finish()
+        return
 
-    # Finish the state
+    # Finish the state; the id lets a repeated tap be answered without resubmitting
     await state.finish()
+
+    # The data is saved by now: a failed confirmation is only logged, an error
+    # message here would invite the user to submit it again
+    try:
+        await edits.edit(call.message, result)
+    except Exception as err:
+        logging.warning(f"Submit #{unique_id} saved, but the confirmation was not shown: {err}")
+    return unique_id
@@ -0,0 +1,53 @@
+from functools import lru_cache
+
+from aiogram import types
+
+from data.config import INLINE_CACHE_TIME
+from loader import dp
+from utils.misc.fuzzy import animal_index, color_index, nationality_index
+
+# First word of the inline query -> vocabulary
+INLINE_FIELDS = {
+    "nat": nationality_index,
+    "nationality": nationality_index,
+    "species": animal_index,
+    "animal": animal_index,
+    "color": color_index,
+    "colour": color_index,
+}
+
+MAX_RESULTS = 20
+
+
+@lru_cache(maxsize=4096)
+def inline_results(field: str, query: str) -> tuple:
+    """
+    Suggestions for one normalized query, built once and reused for everyone.
+    """
+    index = INLINE_FIELDS[field]
+    return tuple(
+        types.InlineQueryResultArticle(
+            id=f"{field}:{position}",
+            title=word,
+            input_message_content=types.InputTextMessageContent(message_text=word),
+        )
+        for position, word in enumerate(index.complete(query, limit=MAX_RESULTS))
+    )
+
+
+@dp.inline_handler(state="*")
+async def autocomplete(inline_query: types.InlineQuery):
+    """
+    Vocabulary autocomplete, e.g. "@bot nat uzb". The chosen word is sent to the
+    chat and accepted by the wizard in one step (see filters.InlinePick).
+    """
+    field, _, query = inline_query.query.strip().partition(" ")
+    field = field.lower()
+    if field not in INLINE_FIELDS:
+        # No field yet: show how to use it
+        await inline_query.answer([], cache_time=INLINE_CACHE_TIME, switch_pm_text="Try: nat uzb, species dog, color bl",
+                                   switch_pm_parameter="inline_help")
+        return
+
+    results = inline_results(field, query.strip().lower())
+    await inline_query.answer(list(results), cache_time=INLINE_CACHE_TIME)
@@ -1 +1,3 @@
 from . import choose_type
+from . import candidates
+from . import search
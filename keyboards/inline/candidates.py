@@ -0,0 +1,22 @@
+from functools import lru_cache
+
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+
+
+@lru_cache(maxsize=None)
+def candidates_keyboard(prefix: str, count: int, reenter_data: str) -> InlineKeyboardMarkup:
+    """
+    Numbered "Did you mean" keyboard: buttons 1..count with callback data
+    ``{prefix}_{index}`` plus a Reenter button. Only depends on its arguments,
+    so every combination is built once and shared (do not modify the result).
+    """
+    # Create an inline keyboard with a maximum of 5 buttons per row
+    keyboard = InlineKeyboardMarkup(row_width=5)
+    for i in range(count):
+        keyboard.insert(InlineKeyboardButton(text=f"{i + 1}", callback_data=f"{prefix}_{i}"))
+    keyboard.add(InlineKeyboardButton(text="🔄 Reenter", callback_data=reenter_data))
+    return keyboard
+
+
+def candidates_text(candidates: list) -> str:
+    return "\n".join([f"{i + 1}. {name}" for i, name in enumerate(candidates)])
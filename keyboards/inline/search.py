@@ -0,0 +1,14 @@
+from functools import lru_cache
+
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+
+
+@lru_cache(maxsize=None)
+def search_keyboard(field: str) -> InlineKeyboardMarkup:
+    """
+    "Search" button that opens inline mode in the current chat, prefilled with
+    ``@bot <field> `` (see handlers/users/inline.py). Shared, do not modify.
+    """
+    keyboard = InlineKeyboardMarkup()
+    keyboard.add(InlineKeyboardButton(text="🔎 Search", switch_inline_query_current_chat=f"{field} "))
+    return keyboard
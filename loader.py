@@ -1,9 +1,23 @@
-from aiogram import Bot, Dispatcher, types
+import aiohttp
+from aiogram import Dispatcher, types
+from aiogram.bot.api import TelegramAPIServer, TELEGRAM_PRODUCTION
 from aiogram.contrib.fsm_storage.memory import MemoryStorage
 from data import config
+from utils.misc.http_pools import PooledBot
 
-# Initialize bot with token
-bot = Bot(token=config.BOT_TOKEN, parse_mode=types.ParseMode.HTML)
+# Use a local Bot API server (e.g. benchmarks.telegram_server) when configured
+server = TelegramAPIServer.from_base(config.BOT_API_SERVER) if config.BOT_API_SERVER else TELEGRAM_PRODUCTION
+
+# Initialize bot with token and a tuned connection pool
+bot = PooledBot(
+    token=config.BOT_TOKEN,
+    parse_mode=types.ParseMode.HTML,
+    server=server,
+    connections_limit=config.BOT_API_CONNECTIONS,
+    timeout=aiohttp.ClientTimeout(total=config.BOT_API_TIMEOUT, connect=config.BOT_API_CONNECT_TIMEOUT),
+    keepalive_timeout=config.BOT_API_KEEPALIVE,
+    dns_cache_ttl=config.BOT_API_DNS_TTL,
+)
 
 # Initialize dispatcher
 storage = MemoryStorage()
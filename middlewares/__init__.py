@@ -1,8 +1,16 @@
 from aiogram import Dispatcher
 
 from loader import dp
+from data.config import TRAFFIC_CAPTURE_FILE, TRAFFIC_CAPTURE_SALT
+from .known_users import KnownUsersMiddleware
+from .log_context import LogContextMiddleware
 from .throttling import ThrottlingMiddleware
+from .traffic_capture import TrafficCaptureMiddleware
 
 
 if __name__ == "middlewares":
+    dp.middleware.setup(LogContextMiddleware())
+    if TRAFFIC_CAPTURE_FILE:
+        dp.middleware.setup(TrafficCaptureMiddleware(TRAFFIC_CAPTURE_FILE, TRAFFIC_CAPTURE_SALT))
+    dp.middleware.setup(KnownUsersMiddleware())
     dp.middleware.setup(ThrottlingMiddleware())
@@ -0,0 +1,14 @@
+from aiogram import types
+from aiogram.dispatcher.middlewares import BaseMiddleware
+
+from utils.db_api.known_users import known_users
+
+
+class KnownUsersMiddleware(BaseMiddleware):
+    """
+    Remember everyone who writes to the bot in private, for announcements.
+    """
+
+    async def on_pre_process_message(self, message: types.Message, data: dict):
+        if message.chat.type == types.ChatType.PRIVATE and message.from_user:
+            known_users.add(message.from_user.id)
@@ -0,0 +1,28 @@
+from aiogram import types
+from aiogram.dispatcher.middlewares import BaseMiddleware
+
+from utils.misc.logging import log_context
+
+
+class LogContextMiddleware(BaseMiddleware):
+    """
+    Make the update id, user id and FSM state available to every log record
+    written while the update is processed.
+    """
+
+    async def on_pre_process_update(self, update: types.Update, data: dict):
+        user = chat_id = None
+        if update.message or update.edited_message:
+            message = update.message or update.edited_message
+            user, chat_id = message.from_user, message.chat.id
+        elif update.callback_query:
+            user = update.callback_query.from_user
+            chat_id = update.callback_query.message.chat.id if update.callback_query.message else user.id
+        elif update.inline_query:
+            user = update.inline_query.from_user
+            chat_id = user.id
+
+        state = None
+        if user is not None:
+            state = await self.manager.dispatcher.storage.get_state(chat=chat_id, user=user.id)
+        log_context.set({"update_id": update.update_id, "user_id": user.id if user else None, "state": state})
@@ -0,0 +1,27 @@
+import logging
+
+from aiogram import types
+from aiogram.dispatcher.middlewares import BaseMiddleware
+
+from utils.misc.traffic_log import TrafficLogWriter
+
+
+class TrafficCaptureMiddleware(BaseMiddleware):
+    """
+    Record every incoming update (with anonymized user ids) for later replay
+    by benchmarks/replay.py.
+    """
+
+    def __init__(self, path: str, salt: str):
+        self.writer = TrafficLogWriter(path, salt)
+        super(TrafficCaptureMiddleware, self).__init__()
+
+    async def on_pre_process_update(self, update: types.Update, data: dict):
+        try:
+            self.writer.write(update.to_python())
+        except Exception as err:
+            # Capturing must never break update processing
+            logging.warning(f"Traffic capture failed: {err}")
+
+    def close(self):
+        self.writer.close()
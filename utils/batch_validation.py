@@ -0,0 +1,168 @@
+# Column-at-a-time validation for bulk imports. NumPy is optional: without it
+# the same rules run row by row (see utils/validation.py). It is imported on the
+# first import file, not at startup (this module is loaded with the admin handlers).
+np = None
+
+from utils.validation import (FIELDS, NOT_HUMANOID, Field, ValidationError, choice_error, fuzzy_word, int_error,
+                              range_error, to_int, validate_fields)
+
+
+class ColumnarResult:
+    """
+    Validated columns of one worksheet.
+    :ivar columns: One list per field (sheet order) with the normalized values; None where invalid.
+    :ivar valid: Per-row flags (a NumPy bool array when NumPy is available).
+    :ivar errors: Row position -> first error message of that row.
+    """
+
+    def __init__(self, worksheet_name: str, columns: list, valid, errors: dict):
+        self.worksheet_name = worksheet_name
+        self.columns = columns
+        self.valid = valid
+        self.errors = errors
+
+    def rows(self):
+        """
+        Yield (row position, field values) of the valid rows.
+        """
+        for position, ok in enumerate(self.valid):
+            if ok:
+                yield position, [column[position] for column in self.columns]
+
+
+def _raw_columns(worksheet_name: str, columns: dict, count: int) -> list:
+    """
+    Raw cells of every field, in sheet order; missing columns read as empty cells.
+    """
+    return [["" if value is None else str(value) for value in columns[field.column]]
+            if field.column in columns else [""] * count
+            for field in FIELDS[worksheet_name]]
+
+
+def _validate_rows(worksheet_name: str, columns: dict, count: int) -> ColumnarResult:
+    fields = FIELDS[worksheet_name]
+    raw = _raw_columns(worksheet_name, columns, count)
+    result = [[None] * count for _ in fields]
+    valid = [True] * count
+    errors = {}
+    for position, cells in enumerate(zip(*raw)):
+        try:
+            values = validate_fields(worksheet_name, {field.column: cell for field, cell in zip(fields, cells)})
+        except ValidationError as err:
+            valid[position] = False
+            errors[position] = str(err)
+            continue
+        for column, value in zip(result, values):
+            column[position] = value
+    return ColumnarResult(worksheet_name, result, valid, errors)
+
+
+def _factorize(raw: list) -> tuple:
+    """
+    :return: (distinct cells in first-seen order, position of each row's cell in them)
+    """
+    codes = {}
+    add = codes.setdefault
+    inverse = np.fromiter((add(value, len(codes)) for value in raw), dtype=np.int64, count=len(raw))
+    return list(codes), inverse
+
+
+def _int_uniques(field: Field, uniques: list) -> tuple:
+    """
+    Parse the distinct cells once and apply the range mask to all of them.
+    :return: (normalized values, ok mask, error messages), all per distinct cell
+    """
+    numbers = np.zeros(len(uniques), dtype=np.int64)
+    parsed = np.zeros(len(uniques), dtype=bool)
+    for position, value in enumerate(uniques):
+        try:
+            numbers[position] = to_int(value)
+            parsed[position] = True
+        except (ValueError, OverflowError):
+            pass
+    low, high = field.rule
+    ok = parsed & (numbers >= low) & (numbers <= high)
+
+    values = [f"{number}{field.suffix}" if field.suffix else number for number in numbers.tolist()]
+    messages = [None if good else int_error(field, value) if not is_number else range_error(field, number)
+                for value, number, is_number, good in zip(uniques, numbers.tolist(), parsed, ok)]
+    return values, ok, messages
+
+
+def _lookup_uniques(field: Field, uniques: list) -> tuple:
+    """
+    Map the distinct cells through the precomputed lower-case hash table; only
+    the misses of vocabulary columns go through fuzzy matching.
+    :return: (normalized values, ok mask, error messages), all per distinct cell
+    """
+    if field.kind == "choice":
+        values = [field.by_lower.get(value.strip().lower()) for value in uniques]
+    else:
+        index = field.rule
+        values = [index.lookup(value) for value in uniques]
+        values = [word if word is not None else fuzzy_word(index, value) for word, value in zip(values, uniques)]
+    ok = np.fromiter((value is not None for value in values), dtype=bool, count=len(values))
+    messages = [None if value is not None else choice_error(field, raw) for value, raw in zip(values, uniques)]
+    return values, ok, messages
+
+
+def _validate_columns(worksheet_name: str, columns: dict, count: int) -> ColumnarResult:
+    fields = FIELDS[worksheet_name]
+    valid = np.ones(count, dtype=bool)
+    errors = {}
+    result = []
+
+    # Rows that skip every field after the first (non-humanoid aliens)
+    short = None
+    for index, (field, raw) in enumerate(zip(fields, _raw_columns(worksheet_name, columns, count))):
+        uniques, inverse = _factorize(raw)
+        if field.kind == "int":
+            values, ok, messages = _int_uniques(field, uniques)
+        else:
+            values, ok, messages = _lookup_uniques(field, uniques)
+        column = np.array(values + [None], dtype=object)[inverse]
+        row_ok = ok[inverse]
+
+        if short is not None:
+            row_ok |= short
+            column[short] = NOT_HUMANOID[index]
+        # Keep only the first error of each row, in field order
+        for position in np.flatnonzero(valid & ~row_ok).tolist():
+            errors[position] = messages[inverse[position]]
+        valid &= row_ok
+        result.append(column)
+
+        if index == 0 and worksheet_name == "Aliens":
+            short = valid & (column == "No")
+
+    for column in result:
+        column[~valid] = None
+    return ColumnarResult(worksheet_name, [column.tolist() for column in result], valid, errors)
+
+
+def _load_numpy() -> bool:
+    """
+    Import NumPy on first use.
+    :return: False if it is not installed.
+    """
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            np = False
+        else:
+            np = numpy
+    return np is not False
+
+
+def validate_batch(worksheet_name: str, columns: dict, count: int) -> ColumnarResult:
+    """
+    Validate and normalize many rows of one worksheet with the wizard rules.
+    :param worksheet_name: Humans, Animals or Aliens.
+    :param columns: Column name (lower case) -> raw cells, one per row.
+    :param count: Number of rows.
+    """
+    if not count or not _load_numpy():
+        return _validate_rows(worksheet_name, columns, count)
+    return _validate_columns(worksheet_name, columns, count)
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+
+from aiogram import Bot
+from aiogram.utils.exceptions import RetryAfter
+
+from data.config import BROADCAST_CONCURRENCY, BROADCAST_PER_CHAT_INTERVAL, BROADCAST_RATE
+from utils.misc import metrics
+
+
+class BroadcastSummary:
+    """
+    Outcome of one broadcast.
+    """
+
+    def __init__(self, total: int):
+        self.total = total
+        self.sent = 0
+        self.retries = 0
+        self.timed_out = 0
+        self.failed = {}  # chat_id -> reason
+        self.elapsed = 0.0
+
+    def __str__(self):
+        return (f"{self.sent}/{self.total} sent, {len(self.failed)} failed, {self.timed_out} timed out, "
+                f"{self.retries} retries in {self.elapsed:.1f} s")
+
+
+class Broadcaster:
+    """
+    Send one message to many chats with bounded concurrency, at most ``rate``
+    messages per second overall, a minimum interval between messages to the same
+    chat and RetryAfter handling.
+    """
+
+    def __init__(self, concurrency: int = 10, per_chat_interval: float = 1.0, max_retries: int = 3,
+                 rate: float = 25.0):
+        self.concurrency = concurrency
+        self.per_chat_interval = per_chat_interval
+        self.max_retries = max_retries
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_send = 0.0
+        # chat_id -> time.monotonic() of the last message, oldest first; only chats
+        # messaged within the last per_chat_interval are kept
+        self._last_sent = OrderedDict()
+
+    def _prune(self, now: float):
+        """
+        Forget chats messaged more than per_chat_interval ago: they need no wait.
+        """
+        horizon = now - self.per_chat_interval
+        while self._last_sent and next(iter(self._last_sent.values())) <= horizon:
+            self._last_sent.popitem(last=False)
+
+    async def _wait_for_chat(self, chat_id):
+        now = time.monotonic()
+        self._prune(now)
+        wait = self._last_sent.get(chat_id, float("-inf")) + self.per_chat_interval - now
+        if wait > 0:
+            await asyncio.sleep(wait)
+        self._last_sent[chat_id] = time.monotonic()
+        self._last_sent.move_to_end(chat_id)
+
+    async def _pace(self):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        start = max(now, self._next_send)
+        self._next_send = start + self.interval
+        await asyncio.sleep(start - now)
+
+    async def _send(self, bot: Bot, chat_id, text: str, summary: BroadcastSummary,
+                    semaphore: asyncio.Semaphore, kwargs: dict):
+        for attempt in range(self.max_retries + 1):
+            async with semaphore:
+                await self._wait_for_chat(chat_id)
+                await self._pace()
+                try:
+                    await bot.send_message(chat_id, text, **kwargs)
+                    summary.sent += 1
+                    return
+                except RetryAfter as err:
+                    retry_after = err.timeout
+                except Exception as err:
+                    # Blocked bot, deleted chat, network error... retrying does not help
+                    summary.failed[chat_id] = str(err)
+                    return
+            if attempt == self.max_retries:
+                break
+            # Wait without holding a slot, so other chats keep being sent meanwhile
+            summary.retries += 1
+            metrics.inc("broadcast_retries_total")
+            await asyncio.sleep(retry_after)
+        summary.failed[chat_id] = "Too many RetryAfter errors"
+
+    async def broadcast(self, bot: Bot, chat_ids, text: str, timeout: float = None, **kwargs) -> BroadcastSummary:
+        """
+        Send the text to every chat.
+        :param bot: Bot to send with.
+        :param chat_ids: Recipients; duplicates are sent once.
+        :param text: Message text.
+        :param timeout: Stop waiting after this many seconds; unsent chats count as timed out.
+        :param kwargs: Extra send_message arguments (parse_mode, reply_markup, ...).
+        :return: BroadcastSummary
+        """
+        chat_ids = list(dict.fromkeys(chat_ids))
+        summary = BroadcastSummary(len(chat_ids))
+        started = time.monotonic()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = [asyncio.ensure_future(self._send(bot, chat_id, text, summary, semaphore, kwargs))
+                 for chat_id in chat_ids]
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            summary.timed_out = len(pending)
+
+        summary.elapsed = time.monotonic() - started
+        metrics.inc("broadcast_messages_sent_total", summary.sent)
+        metrics.inc("broadcast_messages_failed_total", len(summary.failed) + summary.timed_out)
+        for chat_id, reason in summary.failed.items():
+            logging.warning(f"Broadcast to {chat_id} failed: {reason}")
+        return summary
+
+
+broadcaster = Broadcaster(concurrency=BROADCAST_CONCURRENCY, per_chat_interval=BROADCAST_PER_CHAT_INTERVAL,
+                          rate=BROADCAST_RATE)
@@ -0,0 +1,149 @@
+import csv
+import io
+from datetime import date, datetime, time
+
+from data.config import IMPORT_BATCH_SIZE
+from utils.db_api.google_sheets import WORKSHEETS, get_sheets_client
+from utils.misc.snowflake import submission_ids
+from utils.submit import save_submissions
+from utils.batch_validation import validate_batch
+from utils.validation import ValidationError, worksheet_of
+
+IMPORT_EXTENSIONS = (".csv", ".xlsx")
+# Accepted "date" cells; spreadsheets write dates with a time of day
+DATE_FORMATS = ("%Y-%m-%d", "%Y-%m-%d %H:%M:%S")
+
+
+def cell_text(cell) -> str:
+    """
+    Text of an XLSX cell as it would be typed: 27.0 -> "27", dates -> "YYYY-MM-DD", TRUE -> "Yes".
+    """
+    if cell is None:
+        return ""
+    if isinstance(cell, bool):
+        return "Yes" if cell else "No"
+    if isinstance(cell, float) and cell.is_integer():
+        return str(int(cell))
+    if isinstance(cell, datetime) and cell.time() == time():
+        return cell.strftime("%Y-%m-%d")
+    if isinstance(cell, date):
+        return cell.isoformat()
+    return str(cell)
+
+
+def parse_date(value: str):
+    """
+    :return: The date as YYYY-MM-DD, or None if it is not a date.
+    """
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return None
+
+
+def read_rows(content: bytes, file_name: str) -> tuple:
+    """
+    Parse an uploaded file. Column names are lower-cased.
+    :return: (header, iterator of (line number, row) for the non-empty data rows)
+    """
+    if file_name.lower().endswith(".xlsx"):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ValidationError("XLSX files need the openpyxl package on the server, upload a CSV file instead")
+        sheet = load_workbook(io.BytesIO(content), read_only=True, data_only=True).active
+        rows = ([cell_text(cell) for cell in row] for row in sheet.iter_rows(values_only=True))
+    else:
+        rows = csv.reader(io.StringIO(content.decode("utf-8-sig")))
+
+    header = [column.strip().lower() for column in next(rows, [])]
+    if "type" not in header:
+        raise ValidationError("The first row must be a header with a \"type\" column")
+    width = len(header)
+    # Rows are padded/cut to the header width so they can be transposed into columns
+    data = ((line, (row + [""] * (width - len(row)))[:width])
+            for line, row in enumerate(rows, start=2) if any(value.strip() for value in row))
+    return header, data
+
+
+class ImportReport:
+    def __init__(self):
+        self.imported = {worksheet_name: 0 for worksheet_name in WORKSHEETS}
+        self.errors = []  # (line, message)
+
+    def summary(self) -> str:
+        imported = ", ".join(f"{name}: {count}" for name, count in self.imported.items())
+        return f"📥 Imported {sum(self.imported.values())} rows ({imported}), {len(self.errors)} rejected."
+
+    def errors_csv(self) -> bytes:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["line", "error"])
+        writer.writerows(self.errors)
+        return buffer.getvalue().encode("utf-8")
+
+
+def import_file(content: bytes, file_name: str, initiator: str) -> ImportReport:
+    """
+    Validate the rows of each worksheet column by column with the wizard rules, then append the valid rows to their
+    worksheets in batches of IMPORT_BATCH_SIZE. Blocking, run it in an executor.
+    Optional columns: "initiator" (defaults to the uploader) and "date" (YYYY-MM-DD, defaults to today).
+    """
+    report = ImportReport()
+    today = datetime.now().strftime("%Y-%m-%d")
+    try:
+        header, data = read_rows(content, file_name)
+        type_position = header.index("type")
+        groups = {worksheet_name: ([], []) for worksheet_name in WORKSHEETS}  # (lines, rows)
+        for line, row in data:
+            try:
+                lines, rows = groups[worksheet_of({"type": row[type_position]})]
+            except ValidationError as err:
+                report.errors.append((line, str(err)))
+                continue
+            lines.append(line)
+            rows.append(row)
+    except ValidationError as err:
+        report.errors.append((0, f"Unreadable file: {err}"))
+        return report
+    except Exception as err:  # UnicodeDecodeError, csv.Error, BadZipFile, openpyxl errors on a damaged file ...
+        report.errors.append((0, f"Unreadable file: {type(err).__name__}: {err}"))
+        return report
+
+    checked_dates = {}
+    valid = {worksheet_name: [] for worksheet_name in WORKSHEETS}
+    for worksheet_name, (lines, rows) in groups.items():
+        if not rows:
+            continue
+        columns = dict(zip(header, zip(*rows)))
+        result = validate_batch(worksheet_name, columns, len(rows))
+        report.errors.extend((lines[position], message) for position, message in result.errors.items())
+        initiators = columns.get("initiator", ())
+        dates = columns.get("date", ())
+        for position, fields in result.rows():
+            raw_date = (dates[position].strip() if dates else "") or today
+            if raw_date not in checked_dates:
+                checked_dates[raw_date] = parse_date(raw_date)
+            if checked_dates[raw_date] is None:
+                report.errors.append((lines[position], f"Date must be YYYY-MM-DD, got {raw_date!r}"))
+                continue
+            record_initiator = initiators[position].strip() if initiators else ""
+            valid[worksheet_name].append((record_initiator or initiator, fields, checked_dates[raw_date]))
+    report.errors.sort()
+
+    client = get_sheets_client()
+    for worksheet_name, records in valid.items():
+        for start in range(0, len(records), IMPORT_BATCH_SIZE):
+            batch = records[start:start + IMPORT_BATCH_SIZE]
+            row_count = client.reserve_row_numbers(worksheet_name, len(batch))
+            rows = [[row_count + offset, submission_ids.next_base32(), record_initiator, *fields, record_date]
+                    for offset, (record_initiator, fields, record_date) in enumerate(batch)]
+            try:
+                save_submissions(worksheet_name, rows)
+            except Exception as err:
+                report.errors.append((0, f"{worksheet_name}: {len(records) - start} rows not saved: {err}"))
+                break
+            report.imported[worksheet_name] += len(rows)
+    return report
@@ -1,5 +1,94 @@
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+# gspread, oauth2client and requests are imported on first use (see preload()),
+# so importing the handlers stays cheap at startup.
+import re
+import threading
+import time
+
+from data.config import (SHEETS_API_SERVER, SHEETS_BREAKER_FAILURES, SHEETS_BREAKER_RESET, SHEETS_BREAKER_SLOW_CALL,
+                         SHEETS_CONNECT_TIMEOUT, SHEETS_CREDENTIALS_FILE, SHEETS_POOL_SIZE, SHEETS_READ_TIMEOUT,
+                         SHEETS_ROW_COUNT_TTL, SPREADSHEET_NAME)
+from utils.misc.circuit_breaker import CircuitBreaker, CircuitOpen
+
+# Worksheets of the classification spreadsheet
+WORKSHEETS = ("Humans", "Animals", "Aliens")
+
+# Header rows of the classification worksheets
+WORKSHEET_HEADERS = {
+    "Humans": ["No.", "ID", "Initiator", "Gender", "Age", "Nationality", "Education",
+               "Eye Color", "Hair Color", "Height", "Date"],
+    "Animals": ["No.", "ID", "Initiator", "Species", "Mammal", "Predator", "Color",
+                "Weight", "Age", "Date"],
+    "Aliens": ["No.", "ID", "Initiator", "Humanoid", "Race", "Skin Color", "Dangerous",
+               "Has Reason", "Weight", "Date"],
+}
+
+
+# Every Sheets API call goes through the breaker; while it is open, calls fail at once with CircuitOpen
+sheets_breaker = CircuitBreaker("sheets", failures=SHEETS_BREAKER_FAILURES, slow_call=SHEETS_BREAKER_SLOW_CALL,
+                                reset_timeout=SHEETS_BREAKER_RESET)
+
+
+def is_outage(err: Exception) -> bool:
+    """
+    True for errors that mean Google is unavailable: 429, 5xx, timeouts and
+    connection errors. Client errors (bad range, missing worksheet) are not.
+    """
+    response = getattr(err, "response", None)
+    status = getattr(response, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    import requests
+    return isinstance(err, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+
+def is_unavailable(err: Exception) -> bool:
+    """
+    True if a GoogleSheetsClient error (which wraps the gspread one) means Google Sheets is down, not that the request
+    was wrong.
+    """
+    return isinstance(err, CircuitOpen) or is_outage(err) or (err.__context__ is not None and is_outage(err.__context__))
+
+
+def sheets_call(function, *args, **kwargs):
+    return sheets_breaker.call(function, *args, is_failure=is_outage, **kwargs)
+
+
+def appended_last_row(response) -> int:
+    """
+    Row number of the last row written by an append request, taken from the
+    updatedRange of its response (e.g. "'Humans'!A41:K42" -> 42), or None.
+    """
+    try:
+        updated_range = response["updates"]["updatedRange"]
+    except (KeyError, TypeError):
+        return None
+    match = re.search(r"(\d+)$", updated_range)
+    return int(match.group(1)) if match else None
+
+
+def preload():
+    """
+    Import the Google API stack ahead of the first submit, e.g. from a startup task.
+    """
+    import gspread  # noqa: F401
+    from oauth2client.service_account import ServiceAccountCredentials  # noqa: F401
+
+
+def configure_http(client):
+    """
+    Size the connection pool of a gspread client's (long-lived) requests session,
+    set connect/read timeouts (cut to the submit deadline, if any) and report its
+    connection reuse in the metrics.
+    """
+    from utils.db_api.sheets_http import DeadlineAdapter
+    from utils.misc.http_pools import track_requests_session
+
+    session = getattr(client, "http_client", client).session
+    # Pools for sheets.googleapis.com, www.googleapis.com and the token endpoint
+    session.mount("https://", DeadlineAdapter(pool_connections=4, pool_maxsize=SHEETS_POOL_SIZE))
+    client.set_timeout((SHEETS_CONNECT_TIMEOUT, SHEETS_READ_TIMEOUT))
+    track_requests_session(session)
+
 
 class GoogleSheetsClient:
     def __init__(self, credentials_file: str, spreadsheet_name: str):
@@ -12,19 +101,51 @@ class GoogleSheetsClient:
         self.spreadsheet_name = spreadsheet_name
         self.client = None
         self.sheet = None
+        self._worksheets = {}
+        # Worksheet name -> (row count, time.monotonic() it was read at)
+        self._row_counts = {}
+        # Worksheet name -> next "No." not handed out yet by reserve_row_numbers, and its lock
+        self._reserved = {}
+        self._reserve_locks = {}
 
     def authenticate(self):
         """
         Authenticate and authorize with the Google Sheets API.
         """
+        import gspread
+        from oauth2client.service_account import ServiceAccountCredentials
+
         try:
-            scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-            creds = ServiceAccountCredentials.from_json_keyfile_name(self.credentials_file, scope)
-            self.client = gspread.authorize(creds)
-            self.sheet = self.client.open(self.spreadsheet_name)
+            if SHEETS_API_SERVER:
+                # Local Sheets API stand-in: no credentials and no token exchange
+                from google.auth.credentials import AnonymousCredentials
+                from utils.db_api.local_server import use_local_server
+                self.client = gspread.Client(auth=AnonymousCredentials())
+                configure_http(self.client)
+                use_local_server(self.client, SHEETS_API_SERVER, pool_connections=4, pool_maxsize=SHEETS_POOL_SIZE)
+            else:
+                scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+                creds = ServiceAccountCredentials.from_json_keyfile_name(self.credentials_file, scope)
+                self.client = gspread.authorize(creds)
+                configure_http(self.client)
+            self.sheet = sheets_call(self.client.open, self.spreadsheet_name)
+            self._worksheets.clear()
+            self._row_counts.clear()
+        except CircuitOpen:
+            raise
         except Exception as e:
             raise RuntimeError(f"Failed to authenticate with Google Sheets: {e}")
 
+    def worksheet(self, worksheet_name: str):
+        """
+        Return the worksheet handle, fetching its metadata only once.
+        :param worksheet_name: Name of the worksheet.
+        """
+        worksheet = self._worksheets.get(worksheet_name)
+        if worksheet is None:
+            worksheet = self._worksheets[worksheet_name] = sheets_call(self.sheet.worksheet, worksheet_name)
+        return worksheet
+
     def append_data(self, worksheet_name: str, data: list):
         """
         Append a row of data to the specified worksheet.
@@ -32,28 +153,145 @@ class GoogleSheetsClient:
         :param data: List of data to append as a row.
         """
         try:
-            worksheet = self.sheet.worksheet(worksheet_name)
-            worksheet.append_row(data)
+            worksheet = self.worksheet(worksheet_name)
+            response = sheets_call(worksheet.append_row, data)
+        except CircuitOpen:
+            raise
         except Exception as e:
             raise RuntimeError(f"Failed to append data to worksheet '{worksheet_name}': {e}")
+        self._sync_row_count(worksheet_name, response, 1)
+
+    def append_rows(self, worksheet_name: str, rows: list):
+        """
+        Append several rows to the worksheet in a single request.
+        :param worksheet_name: Name of the worksheet to append data to.
+        :param rows: List of rows (each row is a list of values).
+        """
+        try:
+            worksheet = self.worksheet(worksheet_name)
+            response = sheets_call(worksheet.append_rows, rows)
+        except CircuitOpen:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to append {len(rows)} rows to worksheet '{worksheet_name}': {e}")
+        self._sync_row_count(worksheet_name, response, len(rows))
+
+    def _sync_row_count(self, worksheet_name: str, response, appended: int):
+        """
+        Update the cached row count after an append. The append response says where
+        the rows landed, which also takes in rows other processes appended meanwhile.
+        """
+        last_row = appended_last_row(response)
+        if last_row is not None:
+            self._row_counts[worksheet_name] = (last_row, time.monotonic())
+        elif worksheet_name in self._row_counts:
+            count, read_at = self._row_counts[worksheet_name]
+            self._row_counts[worksheet_name] = (count + appended, read_at)
 
     def get_row_count(self, worksheet_name: str) -> int:
         """
         Get the number of rows currently in the worksheet.
+        The count is re-synced by every append and read from the sheet again once it is
+        older than SHEETS_ROW_COUNT_TTL, so rows added by other processes are picked up.
         :param worksheet_name: Name of the worksheet.
-        :return: Number of rows in the worksheet (excluding the header row).
+        :return: Number of rows in the worksheet (including the header row).
         """
+        cached = self._row_counts.get(worksheet_name)
+        if cached is not None and time.monotonic() - cached[1] < SHEETS_ROW_COUNT_TTL:
+            return cached[0]
         try:
-            worksheet = self.sheet.worksheet(worksheet_name)
-            return len(worksheet.get_all_values())  # Count rows in the sheet
+            worksheet = self.worksheet(worksheet_name)
+            count = len(sheets_call(worksheet.get_all_values))  # Count rows
+            self._row_counts[worksheet_name] = (count, time.monotonic())
+            return count
+        except CircuitOpen:
+            raise
         except Exception as e:
             raise RuntimeError(f"Failed to get row count for worksheet '{worksheet_name}': {e}")
 
+    def reserve_row_numbers(self, worksheet_name: str, count: int = 1) -> int:
+        """
+        Hand out the "No." values of rows about to be appended. Numbers are taken
+        under a per-worksheet lock and never handed out twice by this process, even
+        while earlier rows are still on their way to the sheet; a row whose append
+        fails leaves a gap.
+        :param worksheet_name: Name of the worksheet.
+        :param count: Number of consecutive rows.
+        :return: The first of the reserved numbers.
+        """
+        with self._reserve_locks.setdefault(worksheet_name, threading.Lock()):
+            first = max(self.get_row_count(worksheet_name), self._reserved.get(worksheet_name, 0))
+            self._reserved[worksheet_name] = first + count
+            return first
+
     def get_data(self, worksheet_name: str) -> list:
         """
         Fetch all rows of data from the specified worksheet.
         :param worksheet_name: The name of the worksheet.
         :return: A list of rows (each row is a list of cell values).
         """
-        worksheet = self.sheet.worksheet(worksheet_name)
-        return worksheet.get_all_values()
\ No newline at end of file
+        worksheet = self.worksheet(worksheet_name)
+        return sheets_call(worksheet.get_all_values)
+
+    def iter_rows(self, worksheet_name: str, page_size: int = 1000):
+        """
+        Yield the rows of a worksheet, reading it in pages of page_size rows so
+        only one page is held in memory at a time.
+        :param worksheet_name: The name of the worksheet.
+        :param page_size: Rows fetched per request.
+        """
+        worksheet = self.worksheet(worksheet_name)
+        start = 1
+        while True:
+            try:
+                page = sheets_call(worksheet.get, f"{start}:{start + page_size - 1}")
+            except CircuitOpen:
+                raise
+            except Exception as e:
+                raise RuntimeError(f"Failed to read rows {start}+ of worksheet '{worksheet_name}': {e}")
+            yield from page
+            # The API leaves out trailing empty rows, so a short page is the last one
+            if len(page) < page_size:
+                return
+            start += page_size
+
+    def ping(self):
+        """
+        Cheap request (spreadsheet metadata) used to probe whether Google Sheets is back.
+        """
+        sheets_call(self.sheet.fetch_sheet_metadata)
+
+    def warm_up(self, worksheet_names=WORKSHEETS):
+        """
+        Prefetch worksheet handles and row counts.
+        :param worksheet_names: Worksheets to prefetch.
+        """
+        for worksheet_name in worksheet_names:
+            self.get_row_count(worksheet_name)
+
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+def get_sheets_client() -> GoogleSheetsClient:
+    """
+    Return the process-wide authenticated client, creating it on first use.
+    Safe to call from the event loop and from worker threads.
+    """
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            client = GoogleSheetsClient(credentials_file=SHEETS_CREDENTIALS_FILE, spreadsheet_name=SPREADSHEET_NAME)
+            client.authenticate()
+            _shared_client = client
+        return _shared_client
+
+
+def use_sheets_client(client):
+    """
+    Replace the shared client, e.g. with an in-memory fake in benchmarks.
+    """
+    global _shared_client
+    with _shared_lock:
+        _shared_client = client
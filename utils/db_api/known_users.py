@@ -0,0 +1,36 @@
+import sqlite3
+from datetime import datetime
+
+from data.config import LOCAL_DB
+
+
+class KnownUsers:
+    """
+    Ids of every user who has talked to the bot in private, kept in the local
+    SQLite database (used for announcements).
+    """
+
+    def __init__(self, path: str):
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("CREATE TABLE IF NOT EXISTS known_users (user_id INTEGER PRIMARY KEY, first_seen TEXT)")
+        self.db.commit()
+        self._ids = {user_id for (user_id,) in self.db.execute("SELECT user_id FROM known_users")}
+
+    def add(self, user_id: int) -> bool:
+        """
+        Remember a user. Only the first sighting touches the database.
+        :return: True if the user is new.
+        """
+        if user_id in self._ids:
+            return False
+        self.db.execute("INSERT OR IGNORE INTO known_users (user_id, first_seen) VALUES (?, ?)",
+                        (user_id, datetime.now().isoformat(timespec="seconds")))
+        self.db.commit()
+        self._ids.add(user_id)
+        return True
+
+    def all(self) -> list:
+        return sorted(self._ids)
+
+
+known_users = KnownUsers(LOCAL_DB)
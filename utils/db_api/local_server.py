@@ -0,0 +1,30 @@
+from urllib.parse import urlsplit
+
+from utils.db_api.sheets_http import DeadlineAdapter
+
+
+class LocalServerAdapter(DeadlineAdapter):
+    """
+    Transport adapter that sends Google API requests to a local server instead
+    (see benchmarks/sheets_server.py).
+    """
+
+    def __init__(self, base_url: str, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url.rstrip("/")
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        request.url = self.base_url + parts.path + (f"?{parts.query}" if parts.query else "")
+        return super().send(request, **kwargs)
+
+
+def use_local_server(client, base_url: str, **adapter_kwargs):
+    """
+    Route all Sheets and Drive traffic of a gspread client to a local server.
+    :param adapter_kwargs: HTTPAdapter pool settings.
+    """
+    session = getattr(client, "http_client", client).session
+    adapter = LocalServerAdapter(base_url, **adapter_kwargs)
+    session.mount("https://sheets.googleapis.com", adapter)
+    session.mount("https://www.googleapis.com", adapter)
@@ -0,0 +1,77 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+from data.config import LOCAL_DB
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    unique_id TEXT PRIMARY KEY,
+    being TEXT NOT NULL,
+    row TEXT NOT NULL,
+    user_id INTEGER,
+    chat_id TEXT NOT NULL,
+    text TEXT NOT NULL,
+    parse_mode TEXT,
+    posted INTEGER NOT NULL DEFAULT 0,
+    created TEXT NOT NULL
+);
+"""
+
+
+class Outbox:
+    """
+    Submissions between "Submit" and the sheet append, kept in the local SQLite
+    database. An entry is written before the group post, marked once the post
+    went out and removed when the row is in the sheet, so a pipeline cut short
+    by a restart can be finished later.
+    """
+
+    def __init__(self, path: str):
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def put(self, being: str, row: list, user_id: int, chat_id, text: str, parse_mode: str = None):
+        """
+        :param being: Worksheet name (Humans, Animals or Aliens).
+        :param row: The row to append: [No., ID, Initiator, ..., Date].
+        :param user_id: Telegram id of the initiator.
+        :param chat_id: Group the report is posted to.
+        :param text: The group report.
+        :param parse_mode: parse_mode of the report, None for the bot default.
+        """
+        with self._lock, self.db:
+            self.db.execute("INSERT OR REPLACE INTO outbox (unique_id, being, row, user_id, chat_id, text, parse_mode, "
+                            "posted, created) VALUES (?, ?, ?, ?, ?, ?, ?, 0, ?)",
+                            (row[1], being, json.dumps(row, ensure_ascii=False, default=str), user_id, str(chat_id),
+                             text, parse_mode, datetime.now().isoformat(timespec="seconds")))
+
+    def mark_posted(self, unique_id: str):
+        with self._lock, self.db:
+            self.db.execute("UPDATE outbox SET posted = 1 WHERE unique_id = ?", (unique_id,))
+
+    def remove(self, unique_id: str):
+        with self._lock, self.db:
+            self.db.execute("DELETE FROM outbox WHERE unique_id = ?", (unique_id,))
+
+    def pending(self) -> list:
+        """
+        :return: Entries as dicts, oldest first.
+        """
+        with self._lock:
+            records = self.db.execute("SELECT * FROM outbox ORDER BY created").fetchall()
+        return [dict(record, row=json.loads(record["row"])) for record in records]
+
+    def __contains__(self, unique_id: str) -> bool:
+        with self._lock:
+            return self.db.execute("SELECT 1 FROM outbox WHERE unique_id = ?", (unique_id,)).fetchone() is not None
+
+    def __len__(self):
+        with self._lock:
+            return self.db.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+
+outbox = Outbox(LOCAL_DB)
@@ -0,0 +1,17 @@
+from requests.adapters import HTTPAdapter
+
+from utils.misc.deadline import current_deadline
+
+
+class DeadlineAdapter(HTTPAdapter):
+    """
+    Transport adapter that cuts request timeouts to what is left of the current
+    deadline (utils.misc.deadline), so a Sheets call made by a submit stage gives
+    up together with the stage instead of holding its worker thread.
+    """
+
+    def send(self, request, **kwargs):
+        deadline = current_deadline.get()
+        if deadline is not None:
+            kwargs["timeout"] = deadline.clip(kwargs.get("timeout"))
+        return super().send(request, **kwargs)
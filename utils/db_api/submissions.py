@@ -0,0 +1,126 @@
+import json
+import sqlite3
+import threading
+
+from data.config import LOCAL_DB
+from utils.db_api.google_sheets import WORKSHEET_HEADERS, WORKSHEETS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    unique_id TEXT PRIMARY KEY,
+    being TEXT NOT NULL,
+    initiator TEXT NOT NULL COLLATE NOCASE,
+    user_id INTEGER,
+    date TEXT,
+    row TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS submissions_initiator ON submissions (initiator);
+CREATE INDEX IF NOT EXISTS submissions_user_id ON submissions (user_id);
+CREATE INDEX IF NOT EXISTS submissions_date ON submissions (date);
+CREATE INDEX IF NOT EXISTS submissions_being ON submissions (being, date);
+CREATE TABLE IF NOT EXISTS submissions_meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+class SubmissionStore:
+    """
+    Local SQLite mirror of the classification worksheets, indexed by id,
+    initiator, user id, date and being type. Rows are stored exactly as they are
+    written to the sheet: [No., ID, Initiator, ..., Date].
+    """
+
+    def __init__(self, path: str):
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def add(self, being: str, row: list, user_id: int = None, replace: bool = True):
+        """
+        Mirror one worksheet row.
+        :param being: Worksheet name (Humans, Animals or Aliens).
+        :param row: The row as appended to the sheet.
+        :param user_id: Telegram id of the initiator, when known.
+        :param replace: Overwrite an existing row with the same id.
+        """
+        self.add_many(being, [row], user_id=user_id, replace=replace)
+
+    def add_many(self, being: str, rows: list, user_id: int = None, replace: bool = True):
+        """
+        Mirror several rows of one worksheet in a single transaction.
+        """
+        rows = [[str(value) for value in row] for row in rows]
+        verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+        with self._lock, self.db:
+            self.db.executemany(f"{verb} INTO submissions (unique_id, being, initiator, user_id, date, row) "
+                                "VALUES (?, ?, ?, ?, ?, ?)",
+                                [(row[1], being, row[2], user_id, row[-1], json.dumps(row, ensure_ascii=False))
+                                 for row in rows])
+
+    @staticmethod
+    def _to_dict(record: sqlite3.Row) -> dict:
+        row = json.loads(record["row"])
+        header = WORKSHEET_HEADERS.get(record["being"], [])
+        return {
+            "being": record["being"],
+            "user_id": record["user_id"],
+            "fields": dict(zip(header, row)) if len(header) == len(row) else dict(enumerate(row)),
+        }
+
+    def find(self, unique_id: str):
+        """
+        :return: The submission with this id, or None.
+        """
+        with self._lock:
+            record = self.db.execute("SELECT * FROM submissions WHERE unique_id = ?",
+                                     (unique_id.lstrip("#").upper(),)).fetchone()
+        return self._to_dict(record) if record else None
+
+    def by_initiator(self, initiator: str, limit: int = 20) -> list:
+        """
+        Latest submissions of an initiator, by Telegram id or (case-insensitive) name.
+        """
+        if initiator.isdigit():
+            query, value = "user_id = ?", int(initiator)
+        else:
+            query, value = "initiator = ?", initiator
+        with self._lock:
+            records = self.db.execute(f"SELECT * FROM submissions WHERE {query} ORDER BY date DESC, unique_id DESC "
+                                      "LIMIT ?", (value, limit)).fetchall()
+        return [self._to_dict(record) for record in records]
+
+    def is_backfilled(self) -> bool:
+        with self._lock:
+            return self.db.execute("SELECT 1 FROM submissions_meta WHERE key = 'backfilled'").fetchone() is not None
+
+    def backfill(self, client, worksheet_names=WORKSHEETS, batch_size: int = 500) -> int:
+        """
+        One-time import of the rows already in the sheet. Rows recorded live are kept.
+        Blocking, run it in an executor.
+        :param client: Authenticated GoogleSheetsClient.
+        :param batch_size: Rows committed per transaction.
+        :return: Number of rows read.
+        """
+        count = 0
+        for worksheet_name in worksheet_names:
+            width = len(WORKSHEET_HEADERS[worksheet_name])
+            rows = client.iter_rows(worksheet_name)
+            next(rows, None)  # Header row
+            batch = []
+            for row in rows:
+                if len(row) > 2 and row[1]:
+                    # The API drops empty trailing cells
+                    batch.append(row + [""] * (width - len(row)))
+                if len(batch) >= batch_size:
+                    self.add_many(worksheet_name, batch, replace=False)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                self.add_many(worksheet_name, batch, replace=False)
+                count += len(batch)
+        with self._lock, self.db:
+            self.db.execute("INSERT OR REPLACE INTO submissions_meta (key, value) VALUES ('backfilled', ?)", (count,))
+        return count
+
+
+submissions = SubmissionStore(LOCAL_DB)
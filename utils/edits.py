@@ -0,0 +1,145 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+
+from aiogram import Bot, types
+from aiogram.types.base import TelegramObject
+from aiogram.utils.exceptions import MessageNotModified
+
+from data.config import EDIT_COALESCE_INTERVAL
+from utils.misc import metrics
+
+UNSET = object()
+
+
+def content_hash(value) -> str:
+    if isinstance(value, TelegramObject):
+        value = value.to_python()
+    return hashlib.sha1(json.dumps(value, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
+class PendingEdit:
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+        self.text = None
+        self.reply_markup = UNSET
+        self.kwargs = {}
+
+
+class EditCoalescer:
+    """
+    Buffer edits per message. A message is edited at most once per ``interval``
+    seconds; edits requested in between are merged (the latest text and markup
+    win) into a single editMessageText or editMessageReplyMarkup call. Edits that
+    would not change what was last sent are skipped.
+
+    All edits of a message should go through the coalescer, otherwise the
+    remembered content goes stale.
+    """
+
+    def __init__(self, interval: float = 1.0, size: int = 4096):
+        self.interval = interval
+        self.size = size
+        self._pending = {}
+        self._unresolved = set()
+        self._last_flush = OrderedDict()
+        # (chat_id, message_id) -> [text hash or None, markup hash or None]
+        self._sent = OrderedDict()
+
+    def edit(self, message: types.Message, text: str = None, reply_markup=UNSET, **kwargs) -> asyncio.Future:
+        """
+        Request an edit of a message sent by the bot. The returned future
+        resolves to True once the edit was sent, or False if it was skipped;
+        await it when the edit must be visible before going on.
+        :param message: The message to edit.
+        :param text: New text; None keeps the current text.
+        :param reply_markup: New inline keyboard, None to remove it. With a new
+            text and no markup the keyboard is removed, like editMessageText does.
+        :param kwargs: Extra editMessageText arguments (parse_mode, ...).
+        """
+        key = (message.chat.id, message.message_id)
+        if key not in self._sent:
+            self._remember(key, None, content_hash(message.reply_markup) if message.reply_markup else content_hash(None))
+
+        pending = self._pending.get(key)
+        if pending is None:
+            loop = asyncio.get_event_loop()
+            pending = self._pending[key] = PendingEdit(loop.create_future())
+            pending.future.add_done_callback(self._log_failure)
+            self._unresolved.add(pending.future)
+            pending.future.add_done_callback(self._unresolved.discard)
+            delay = self._last_flush.get(key, float("-inf")) + self.interval - time.monotonic()
+            loop.call_later(max(delay, 0), lambda: asyncio.ensure_future(self._flush(message.bot, key)))
+        else:
+            metrics.inc("edits_coalesced_total")
+
+        if text is not None:
+            pending.text = text
+            pending.reply_markup = None if reply_markup is UNSET else reply_markup
+            pending.kwargs = kwargs
+        elif reply_markup is not UNSET:
+            pending.reply_markup = reply_markup
+        return pending.future
+
+    async def drain(self):
+        """
+        Wait until every buffered edit has been sent or skipped.
+        """
+        while self._unresolved:
+            await asyncio.gather(*self._unresolved, return_exceptions=True)
+
+    def forget(self, chat_id: int, message_id: int):
+        """
+        Drop what is remembered about a message that was edited around the coalescer.
+        """
+        self._sent.pop((chat_id, message_id), None)
+
+    def _remember(self, key, text_hash, markup_hash):
+        self._sent[key] = [text_hash, markup_hash]
+        self._sent.move_to_end(key)
+        while len(self._sent) > self.size:
+            self._sent.popitem(last=False)
+
+    @staticmethod
+    def _log_failure(future: asyncio.Future):
+        if not future.cancelled() and future.exception() is not None:
+            logging.warning(f"Message edit failed: {future.exception()}")
+
+    async def _flush(self, bot: Bot, key: tuple):
+        pending = self._pending.pop(key)
+        self._last_flush[key] = time.monotonic()
+        self._last_flush.move_to_end(key)
+        while len(self._last_flush) > self.size:
+            self._last_flush.popitem(last=False)
+
+        chat_id, message_id = key
+        sent_text, sent_markup = self._sent.get(key, [None, None])
+        markup = None if pending.reply_markup is UNSET else pending.reply_markup
+        text_hash = content_hash([pending.text, pending.kwargs]) if pending.text is not None else sent_text
+        markup_hash = content_hash(markup) if pending.reply_markup is not UNSET else sent_markup
+        if text_hash == sent_text and markup_hash == sent_markup:
+            metrics.inc("edits_skipped_total")
+            pending.future.set_result(False)
+            return
+
+        try:
+            if pending.text is not None:
+                await bot.edit_message_text(pending.text, chat_id, message_id, reply_markup=markup, **pending.kwargs)
+            else:
+                await bot.edit_message_reply_markup(chat_id, message_id, reply_markup=markup)
+        except MessageNotModified:
+            metrics.inc("edits_skipped_total")
+            self._remember(key, text_hash, markup_hash)
+            pending.future.set_result(False)
+        except Exception as err:
+            pending.future.set_exception(err)
+        else:
+            metrics.inc("edits_sent_total")
+            self._remember(key, text_hash, markup_hash)
+            pending.future.set_result(True)
+
+
+edits = EditCoalescer(interval=EDIT_COALESCE_INTERVAL)
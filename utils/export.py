@@ -0,0 +1,44 @@
+import csv
+import gzip
+import json
+import os
+import tempfile
+
+from utils.db_api.google_sheets import get_sheets_client
+
+EXPORT_FORMATS = ("csv", "jsonl")
+
+
+def export_worksheet(worksheet_name: str, fmt: str = "csv", page_size: int = 1000) -> tuple:
+    """
+    Stream a worksheet into a gzip-compressed temp file. Blocking, run it in an executor.
+    The caller owns the file and must delete it.
+    :param worksheet_name: Worksheet to export.
+    :param fmt: "csv", or "jsonl" (one object per row, keyed by the header row).
+    :param page_size: Rows read from the sheet per request.
+    :return: (path of the .gz file, number of data rows written)
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    rows = get_sheets_client().iter_rows(worksheet_name, page_size=page_size)
+    descriptor, path = tempfile.mkstemp(prefix=f"{worksheet_name.lower()}-", suffix=f".{fmt}.gz")
+    os.close(descriptor)
+    count = 0
+    try:
+        with gzip.open(path, "wt", encoding="utf-8", newline="") as file:
+            if fmt == "csv":
+                writer = csv.writer(file)
+                for count, row in enumerate(rows):
+                    writer.writerow(row)
+            else:
+                header = next(rows, [])
+                for count, row in enumerate(rows, start=1):
+                    # Short rows (empty trailing cells) are padded with empty strings
+                    record = dict(zip(header, row + [""] * (len(header) - len(row))))
+                    file.write(json.dumps(record, ensure_ascii=False))
+                    file.write("\n")
+    except Exception:
+        os.remove(path)
+        raise
+    return path, count
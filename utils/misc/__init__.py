@@ -1,2 +1,3 @@
 from .throttling import rate_limit
 from . import logging
+from . import metrics
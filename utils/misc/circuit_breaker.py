@@ -0,0 +1,96 @@
+import threading
+import time
+
+from utils.misc import metrics
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpen(RuntimeError):
+    """
+    Raised instead of calling a dependency whose circuit is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Stop calling a dependency that keeps failing. After ``failures`` failed or
+    slow (longer than ``slow_call`` seconds) calls in a row the circuit opens and
+    calls are refused at once. After ``reset_timeout`` seconds one trial call is
+    let through (half-open): success closes the circuit, failure opens it again.
+    Thread-safe, the Sheets calls run on the loop and in worker threads.
+    """
+
+    def __init__(self, name: str, failures: int = 3, slow_call: float = 10.0, reset_timeout: float = 30.0):
+        self.name = name
+        self.failures = failures
+        self.slow_call = slow_call
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self._consecutive = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        metrics.gauge("circuit_open", 0, circuit=name)
+
+    def allow(self) -> bool:
+        """
+        :return: True if a call may be made now. In half-open state only one trial call at a time is allowed.
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    metrics.inc("circuit_rejected_total", circuit=self.name)
+                    return False
+                self._set_state(HALF_OPEN)
+            if self._probing:
+                metrics.inc("circuit_rejected_total", circuit=self.name)
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self, duration: float = 0.0):
+        if duration > self.slow_call:
+            self.record_failure()
+            return
+        with self._lock:
+            self._consecutive = 0
+            self._probing = False
+            if self.state != CLOSED:
+                self._set_state(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._consecutive += 1
+            self._probing = False
+            if self.state == HALF_OPEN or self._consecutive >= self.failures:
+                self._opened_at = time.monotonic()
+                if self.state != OPEN:
+                    self._set_state(OPEN)
+
+    def _set_state(self, state: str):
+        self.state = state
+        metrics.inc("circuit_transitions_total", circuit=self.name, state=state)
+        metrics.gauge("circuit_open", int(state != CLOSED), circuit=self.name)
+
+    def call(self, function, *args, is_failure=lambda err: True, **kwargs):
+        """
+        Call ``function`` through the breaker.
+        :param is_failure: Tells outages (5xx, timeouts) from errors that don't count against the dependency.
+        :raises CircuitOpen: While the circuit is open.
+        """
+        if not self.allow():
+            raise CircuitOpen(f"{self.name} is unavailable, retrying in at most {self.reset_timeout:.0f} s")
+        started = time.monotonic()
+        try:
+            result = function(*args, **kwargs)
+        except Exception as err:
+            if is_failure(err):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        self.record_success(time.monotonic() - started)
+        return result
@@ -0,0 +1,81 @@
+import asyncio
+import contextvars
+import time
+from contextlib import contextmanager
+
+from utils.misc import metrics
+
+# Deadline of the stage being run; read by the Sheets HTTP adapter to shorten request timeouts
+current_deadline = contextvars.ContextVar("current_deadline", default=None)
+
+
+class StageTimeout(asyncio.TimeoutError):
+    def __init__(self, stage: str):
+        super().__init__(f"{stage} took too long")
+        self.stage = stage
+
+
+class Deadline:
+    """
+    Time budget of one operation split into named stages. Each stage gets its own
+    budget, cut to whatever is left of the overall deadline, and reports its
+    duration and timeouts as ``<prefix>_stage_*`` metrics.
+    """
+
+    def __init__(self, seconds: float, prefix: str = "submit"):
+        self.expires_at = time.monotonic() + seconds
+        self.prefix = prefix
+        self.stage = None
+
+    def remaining(self) -> float:
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def budget(self, seconds: float) -> float:
+        return min(seconds, self.remaining())
+
+    def clip(self, timeout):
+        """
+        Shorten a requests-style timeout (None, seconds or (connect, read)) to the time left.
+        """
+        remaining = max(self.remaining(), 0.001)
+        if timeout is None:
+            return remaining
+        if isinstance(timeout, tuple):
+            return tuple(remaining if part is None else min(part, remaining) for part in timeout)
+        return min(timeout, remaining)
+
+    @contextmanager
+    def _stage(self, stage: str, budget: float):
+        self.stage = stage
+        stage_deadline = Deadline(self.budget(budget), self.prefix)
+        token = current_deadline.set(stage_deadline)
+        started = time.monotonic()
+        try:
+            yield stage_deadline.remaining()
+        except asyncio.TimeoutError:
+            metrics.inc(f"{self.prefix}_stage_timeouts_total", stage=stage)
+            raise StageTimeout(stage)
+        finally:
+            current_deadline.reset(token)
+            metrics.inc(f"{self.prefix}_stage_seconds_total", time.monotonic() - started, stage=stage)
+            metrics.inc(f"{self.prefix}_stages_total", stage=stage)
+
+    async def run(self, stage: str, budget: float, awaitable):
+        """
+        Await a coroutine within the stage budget; it is cancelled when the budget runs out.
+        :raises StageTimeout: When the budget ran out.
+        """
+        with self._stage(stage, budget) as timeout:
+            return await asyncio.wait_for(awaitable, timeout)
+
+    async def run_sync(self, stage: str, budget: float, function, *args):
+        """
+        Run a blocking call in a worker thread within the stage budget. The thread
+        can't be cancelled: it sees the stage deadline (current_deadline) so its
+        HTTP requests time out with it, and its result is dropped if it comes late.
+        :raises StageTimeout: When the budget ran out.
+        """
+        with self._stage(stage, budget) as timeout:
+            context = contextvars.copy_context()
+            future = asyncio.get_running_loop().run_in_executor(None, context.run, function, *args)
+            return await asyncio.wait_for(future, timeout)
@@ -0,0 +1,96 @@
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from difflib import get_close_matches
+
+from data.predefined_lists import animals, colors, nationalities
+
+# close_matches defaults: the candidates the wizards offer
+MATCHES = 10
+CUTOFF = 0.4
+
+
+class VocabularyIndex:
+    """
+    Fuzzy lookup over a fixed vocabulary. Returns exactly what
+    difflib.get_close_matches returns, but repeated queries (the same typos come
+    up again and again) are answered from a bounded LRU cache. Safe to use from
+    the event loop and worker threads (bulk import) at the same time.
+    """
+
+    def __init__(self, words: list, cache_size: int = 4096):
+        self.words = tuple(words)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # Vocabulary word -> its default close_matches answer, filled by prime()
+        self._exact = {}
+        # Case-insensitive exact lookup: lower-cased word -> (vocabulary position, word)
+        self.by_lower = {word.lower(): (position, word) for position, word in enumerate(self.words)}
+        # Sorted lower-cased words, for prefix search with bisect
+        self._sorted = sorted(self.by_lower)
+
+    def lookup(self, query: str):
+        """
+        :return: The vocabulary word equal to the query ignoring case and surrounding spaces, or None.
+        """
+        found = self.by_lower.get(query.strip().lower())
+        return found[1] if found else None
+
+    def prime(self):
+        """
+        Precompute the default close_matches answer of every vocabulary word, so exact
+        answers never hit difflib. Runs difflib over the whole vocabulary once per word
+        (hundreds of milliseconds): call it from a worker thread.
+        """
+        self._exact = {word: tuple(get_close_matches(word, self.words, n=MATCHES, cutoff=CUTOFF))
+                       for word in self.words}
+
+    def close_matches(self, query: str, n: int = MATCHES, cutoff: float = CUTOFF) -> list:
+        """
+        :param query: User input, already normalized (e.g. capitalized).
+        :return: Up to n vocabulary words, best match first.
+        """
+        if n == MATCHES and cutoff == CUTOFF and query in self._exact:
+            return list(self._exact[query])
+        key = (query, n, cutoff)
+        with self._cache_lock:
+            matches = self._cache.get(key)
+            if matches is not None:
+                self._cache.move_to_end(key)
+                return list(matches)
+        # difflib runs outside the lock; two threads may compute the same key, both get the same answer
+        matches = tuple(get_close_matches(query, self.words, n=n, cutoff=cutoff))
+        with self._cache_lock:
+            self._cache[key] = matches
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)  # Least recently used
+        return list(matches)
+
+    def complete(self, query: str, limit: int = 20) -> list:
+        """
+        Ranked suggestions for a partial input: prefix matches (alphabetical), then
+        words containing the query, then fuzzy matches for typos.
+        """
+        query = query.strip().lower()
+        if not query:
+            return [self.by_lower[word][1] for word in self._sorted[:limit]]
+
+        results = []
+        position = bisect_left(self._sorted, query)
+        while position < len(self._sorted) and self._sorted[position].startswith(query) and len(results) < limit:
+            results.append(self.by_lower[self._sorted[position]][1])
+            position += 1
+        if len(results) < limit:
+            seen = set(results)
+            results += [word for word in self.words if query in word.lower() and word not in seen][:limit - len(results)]
+        if len(results) < limit:
+            seen = set(results)
+            results += [word for word in self.close_matches(query.capitalize(), n=limit) if word not in seen]
+        return results[:limit]
+
+
+nationality_index = VocabularyIndex(nationalities)
+color_index = VocabularyIndex(colors)
+animal_index = VocabularyIndex(animals)
@@ -0,0 +1,102 @@
+import weakref
+
+import aiohttp
+from aiogram import Bot
+from aiogram.utils import json
+
+from utils.misc import metrics
+
+# Connection stats per endpoint ("bot_api", "sheets"):
+#   http_requests_total             requests sent
+#   http_connections_opened_total   new connections, i.e. TCP + TLS handshakes
+#   http_connections_reused_total   requests served by a kept-alive connection (Bot API only)
+#   http_connections_idle           open sockets waiting in the pool
+#   http_connections_in_use         open sockets serving a request (Bot API only)
+
+
+def trace_config(endpoint: str) -> aiohttp.TraceConfig:
+    """
+    aiohttp request tracing that feeds the connection metrics.
+    """
+    async def on_request_start(session, context, params):
+        metrics.inc("http_requests_total", endpoint=endpoint)
+
+    async def on_connection_create_end(session, context, params):
+        metrics.inc("http_connections_opened_total", endpoint=endpoint)
+
+    async def on_connection_reuseconn(session, context, params):
+        metrics.inc("http_connections_reused_total", endpoint=endpoint)
+
+    config = aiohttp.TraceConfig()
+    config.on_request_start.append(on_request_start)
+    config.on_connection_create_end.append(on_connection_create_end)
+    config.on_connection_reuseconn.append(on_connection_reuseconn)
+    return config
+
+
+class PooledBot(Bot):
+    """
+    Bot whose aiohttp pool keeps connections alive, caches DNS lookups and
+    reports connection reuse in the metrics.
+    """
+
+    def __init__(self, *args, keepalive_timeout: float = 60.0, dns_cache_ttl: int = 300, **kwargs):
+        """
+        :param keepalive_timeout: Seconds an idle connection is kept open.
+        :param dns_cache_ttl: Seconds a resolved Bot API address is cached.
+        Other arguments (connections_limit, timeout, ...) go to Bot.
+        """
+        super().__init__(*args, **kwargs)
+        self._connector_init.update(keepalive_timeout=keepalive_timeout, use_dns_cache=True,
+                                    ttl_dns_cache=dns_cache_ttl)
+        self._connector = None
+        metrics.register_collector(self._collect)
+
+    async def get_new_session(self) -> aiohttp.ClientSession:
+        self._connector = self._connector_class(**self._connector_init)
+        return aiohttp.ClientSession(connector=self._connector, json_serialize=json.dumps,
+                                     trace_configs=[trace_config("bot_api")])
+
+    def _collect(self):
+        connector = self._connector
+        if connector is None or connector.closed:
+            idle = in_use = 0
+        else:
+            # aiohttp keeps no public counters: idle connections per host, and the ones handed out
+            idle = sum(len(connections) for connections in getattr(connector, "_conns", {}).values())
+            in_use = len(getattr(connector, "_acquired", ()))
+        metrics.gauge("http_connections_idle", idle, endpoint="bot_api")
+        metrics.gauge("http_connections_in_use", in_use, endpoint="bot_api")
+
+
+_sheets_sessions = weakref.WeakSet()
+
+
+def track_requests_session(session):
+    """
+    Report the urllib3 pools of a requests session (the Sheets client's) in the metrics.
+    """
+    _sheets_sessions.add(session)
+
+
+def _collect_sheets():
+    opened = requests = idle = 0
+    for session in list(_sheets_sessions):
+        for adapter in session.adapters.values():
+            pools = getattr(adapter, "poolmanager", None)
+            if pools is None:
+                continue
+            for key in pools.pools.keys():
+                pool = pools.pools.get(key)
+                if pool is None:
+                    continue
+                opened += pool.num_connections
+                requests += pool.num_requests
+                idle += sum(1 for connection in list(pool.pool.queue)
+                            if connection is not None and getattr(connection, "sock", None) is not None)
+    metrics.gauge("http_connections_opened_total", opened, endpoint="sheets")
+    metrics.gauge("http_requests_total", requests, endpoint="sheets")
+    metrics.gauge("http_connections_idle", idle, endpoint="sheets")
+
+
+metrics.register_collector(_collect_sheets)
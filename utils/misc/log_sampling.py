@@ -0,0 +1,56 @@
+import asyncio
+import time
+
+
+class LogSampler:
+    """
+    Per-key log rate limit: at most ``burst`` records per ``period`` seconds.
+    Records over the limit are only counted; when a window that suppressed
+    records ends, ``report(key, suppressed, period)`` is called from a loop timer.
+    """
+
+    def __init__(self, burst: int = 5, period: float = 60.0, report=None):
+        self.burst = burst
+        self.period = period
+        self.report = report
+        self._windows = {}
+
+    def allow(self, key) -> bool:
+        """
+        Check whether a record for the key may be logged now.
+        :return: True if the record may be logged.
+        """
+        now = time.monotonic()
+        window = self._windows.get(key)
+        if window is not None and now - window[0] >= self.period:
+            # Its timer has not run (no event loop): report it now
+            self._close(key, window)
+            window = None
+        if window is None:
+            # [window start, logged, suppressed]
+            window = self._windows[key] = [now, 0, 0]
+
+        if window[1] < self.burst:
+            window[1] += 1
+            return True
+        if not window[2]:
+            self._schedule_close(key, window)
+        window[2] += 1
+        return False
+
+    def _schedule_close(self, key, window: list):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        loop.call_later(max(window[0] + self.period - time.monotonic(), 0), self._close, key, window)
+
+    def _close(self, key, window: list):
+        """
+        End the window of the key and report what it suppressed.
+        """
+        if self._windows.get(key) is not window:
+            return
+        del self._windows[key]
+        if window[2] and self.report is not None:
+            self.report(key, window[2], self.period)
@@ -1,6 +1,188 @@
+import atexit
+import itertools
+import json
 import logging
+import queue
+from collections import deque
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
 
-logging.basicConfig(format=u'%(filename)s [LINE:%(lineno)d] #%(levelname)-8s [%(asctime)s]  %(message)s',
-                    level=logging.INFO,
-                    # level=logging.DEBUG,  # Можно заменить на другой уровень логгирования.
-                    )
+from aiogram.dispatcher.handler import current_handler
+
+from data.config import LOG_FORMAT, LOG_QUEUE_SIZE
+from . import metrics
+
+TEXT_FORMAT = u'%(filename)s [LINE:%(lineno)d] #%(levelname)-8s [%(asctime)s]  %(message)s'
+
+# Per-update context (update_id, user_id, FSM state), set by LogContextMiddleware
+log_context = ContextVar("log_context", default=None)
+
+
+class ContextFilter(logging.Filter):
+    """
+    Attach the current update id, user id, FSM state and handler name to records.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = log_context.get() or {}
+        record.update_id = context.get("update_id")
+        record.user_id = context.get("user_id")
+        record.state = context.get("state")
+        record.handler = getattr(current_handler.get(None), "__name__", None)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "file": record.filename,
+            "line": record.lineno,
+            "message": record.getMessage(),
+            "update_id": getattr(record, "update_id", None),
+            "user_id": getattr(record, "user_id", None),
+            "state": getattr(record, "state", None),
+            "handler": getattr(record, "handler", None),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class LogQueue(queue.Queue):
+    """
+    Bounded queue of log records, one FIFO per level. When it is full, the least
+    important record goes first: a new record evicts the oldest record of the
+    lowest level below its own (DEBUG before INFO before WARNING ...), otherwise
+    the new record is dropped. Records still come out in the order they were
+    logged. Every operation costs O(number of levels), whatever the queue size.
+    """
+
+    def _init(self, maxsize):
+        self.levels = {}  # levelno -> deque of (sequence number, record)
+        self._size = 0
+        self._sequence = itertools.count()
+
+    def _qsize(self):
+        return self._size
+
+    def _put(self, item):
+        level = float("inf") if item is None else item.levelno  # The stop sentinel is never evicted
+        self.levels.setdefault(level, deque()).append((next(self._sequence), item))
+        self._size += 1
+
+    def _get(self):
+        level = min((level for level, records in self.levels.items() if records),
+                    key=lambda level: self.levels[level][0][0])
+        self._size -= 1
+        return self.levels[level].popleft()[1]
+
+    def admits(self, levelno: int) -> bool:
+        """
+        Whether a record of this level would be queued now (checked again by offer).
+        """
+        with self.mutex:
+            if self.maxsize <= 0 or self._qsize() < self.maxsize:
+                return True
+            return any(records and level < levelno for level, records in self.levels.items())
+
+    def offer(self, record: logging.LogRecord) -> bool:
+        with self.mutex:
+            if self.maxsize <= 0 or self._qsize() < self.maxsize:
+                self._put(record)
+                self.unfinished_tasks += 1
+                self.not_empty.notify()
+                return True
+
+            lowest = min((level for level, records in self.levels.items() if records), default=None)
+            if lowest is None or lowest >= record.levelno:
+                metrics.inc("log_records_dropped_total", level=record.levelname)
+                return False
+            _, victim = self.levels[lowest].popleft()
+            self._size -= 1
+            self._put(record)
+            self.not_empty.notify()
+            metrics.inc("log_records_dropped_total", level=victim.levelname)
+            return True
+
+    def put(self, item, block=True, timeout=None):
+        if item is None:
+            # QueueListener's stop sentinel must get through even when the queue is full
+            with self.mutex:
+                self._put(item)
+                self.unfinished_tasks += 1
+                self.not_empty.notify()
+            return
+        super().put(item, block, timeout)
+
+
+_exception_formatter = logging.Formatter()
+
+
+class LoopSafeQueueHandler(QueueHandler):
+    """
+    Hand records to the writer thread. Only the message and the traceback are
+    rendered on the event loop; the JSON or text layout is done by the writer.
+    """
+
+    def __init__(self, log_queue: LogQueue):
+        super().__init__(log_queue)
+        self.addFilter(ContextFilter())
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render the message and the traceback now, so the queue holds no arguments or
+        # frames (they may change or keep large objects alive); the layout is left to the writer thread
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def emit(self, record: logging.LogRecord):
+        # A record the full queue would drop is not worth rendering
+        if not self.queue.admits(record.levelno):
+            metrics.inc("log_records_dropped_total", level=record.levelname)
+            return
+        super().emit(record)
+
+    def enqueue(self, record: logging.LogRecord):
+        self.queue.offer(record)
+
+
+def setup_logging(level: int = logging.INFO) -> QueueListener:
+    """
+    Route all logging through a bounded queue to a background writer thread.
+    """
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT))
+
+    log_queue = LogQueue(LOG_QUEUE_SIZE)
+    root = logging.getLogger()
+    root.addHandler(LoopSafeQueueHandler(log_queue))
+    root.setLevel(level)
+    # root.setLevel(logging.DEBUG)  # Можно заменить на другой уровень логгирования.
+
+    queue_listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    queue_listener.start()
+    return queue_listener
+
+
+def stop_logging():
+    """
+    Write out the queued records and stop the writer thread. Safe to call more than once.
+    """
+    if getattr(listener, "_thread", None) is not None:
+        listener.stop()
+
+
+listener = setup_logging()
+atexit.register(stop_logging)
@@ -0,0 +1,57 @@
+from collections import defaultdict
+
+# In-process metrics: counters only grow, gauges hold the last value set.
+# Keys are (name, sorted label items).
+_counters = defaultdict(int)
+_gauges = {}
+_collectors = []
+
+
+def _key(name: str, labels: dict) -> tuple:
+    return name, tuple(sorted(labels.items()))
+
+
+def inc(name: str, value: int = 1, **labels):
+    """
+    Increase a counter.
+    """
+    _counters[_key(name, labels)] += value
+
+
+def gauge(name: str, value: float, **labels):
+    """
+    Set a gauge to the given value.
+    """
+    _gauges[_key(name, labels)] = value
+
+
+def register_collector(collector):
+    """
+    Register a callable that updates gauges right before metrics are read.
+    """
+    _collectors.append(collector)
+
+
+def get(name: str, **labels) -> float:
+    key = _key(name, labels)
+    return _counters.get(key, _gauges.get(key, 0))
+
+
+def snapshot() -> dict:
+    """
+    Return all metrics as ``{"name{label=value}": value}``.
+    """
+    for collector in _collectors:
+        collector()
+    result = {}
+    for (name, labels), value in list(_counters.items()) + list(_gauges.items()):
+        label_text = ",".join(f"{key}={value!s}" for key, value in labels)
+        result[f"{name}{{{label_text}}}" if label_text else name] = value
+    return dict(sorted(result.items()))
+
+
+def render() -> str:
+    """
+    Render all metrics as text, one ``name{labels} value`` per line.
+    """
+    return "\n".join(f"{name} {value}" for name, value in snapshot().items())
@@ -0,0 +1,92 @@
+import os
+import socket
+import threading
+import time
+import zlib
+
+from data.config import WORKER_ID
+
+# 2024-01-01 00:00:00 UTC, in milliseconds
+EPOCH_MS = 1704067200000
+
+WORKER_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKER_ID = (1 << WORKER_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+# Crockford base32: no I, L, O or U, so ids survive being read aloud or retyped
+BASE32_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_BASE32_DECODE = {char: value for value, char in enumerate(BASE32_ALPHABET)}
+
+
+def default_worker_id() -> int:
+    """
+    Worker id derived from the host name and process id. Set WORKER_ID explicitly
+    when running several bot processes to rule out collisions.
+    """
+    return zlib.crc32(f"{socket.gethostname()}:{os.getpid()}".encode()) & MAX_WORKER_ID
+
+
+def to_base32(value: int) -> str:
+    if value == 0:
+        return BASE32_ALPHABET[0]
+    chars = []
+    while value:
+        value, remainder = divmod(value, 32)
+        chars.append(BASE32_ALPHABET[remainder])
+    return "".join(reversed(chars))
+
+
+def from_base32(text: str) -> int:
+    value = 0
+    for char in text.upper():
+        value = value * 32 + _BASE32_DECODE[char]
+    return value
+
+
+class SnowflakeGenerator:
+    """
+    64-bit, time ordered ids: 41 bits of milliseconds since EPOCH_MS, 10 bits of
+    worker id and a 12 bit per-millisecond sequence (4096 ids per ms per worker).
+    """
+
+    def __init__(self, worker_id: int):
+        if not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(f"Worker id must be between 0 and {MAX_WORKER_ID}, got {worker_id}")
+        self.worker_id = worker_id
+        self._last_ms = -1
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def next_id(self) -> int:
+        with self._lock:
+            now = int(time.time() * 1000) - EPOCH_MS
+            if now < self._last_ms:
+                # Clock went backwards: keep counting on the last millisecond
+                now = self._last_ms
+            if now == self._last_ms:
+                self._sequence = (self._sequence + 1) & MAX_SEQUENCE
+                if self._sequence == 0:
+                    # Sequence exhausted for this millisecond: wait for the next one
+                    while now <= self._last_ms:
+                        now = int(time.time() * 1000) - EPOCH_MS
+            else:
+                self._sequence = 0
+            self._last_ms = now
+            return (now << (WORKER_BITS + SEQUENCE_BITS)) | (self.worker_id << SEQUENCE_BITS) | self._sequence
+
+    def next_base32(self) -> str:
+        """
+        Next id in its compact form, e.g. for a #hashtag.
+        """
+        return to_base32(self.next_id())
+
+
+def timestamp_of(snowflake: int) -> float:
+    """
+    Unix time (seconds) at which the id was generated.
+    """
+    return ((snowflake >> (WORKER_BITS + SEQUENCE_BITS)) + EPOCH_MS) / 1000
+
+
+submission_ids = SnowflakeGenerator(WORKER_ID if WORKER_ID is not None else default_worker_id())
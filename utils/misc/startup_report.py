@@ -0,0 +1,36 @@
+import logging
+import sys
+import time
+from contextlib import contextmanager
+
+# Heavy third-party modules worth knowing about when they are loaded during startup
+HEAVY_MODULES = ("gspread", "oauth2client", "requests", "rsa", "pyasn1", "googleapiclient")
+
+
+class StartupReport:
+    """
+    Measure how long each top-level import of app.py takes and how many
+    modules it pulls in.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.entries = []
+
+    @contextmanager
+    def measure(self, name: str):
+        modules_before = len(sys.modules)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.entries.append((name, time.perf_counter() - started, len(sys.modules) - modules_before))
+
+    def log(self, stage: str = "ready"):
+        imports_total = sum(elapsed for _, elapsed, _ in self.entries)
+        for name, elapsed, modules in sorted(self.entries, key=lambda entry: -entry[1]):
+            logging.info("Startup import %-24s %8.1f ms  %4d modules", name, elapsed * 1000, modules)
+        heavy = [name for name in HEAVY_MODULES if name in sys.modules]
+        logging.info("Startup imports took %.1f ms; heavy modules loaded: %s",
+                     imports_total * 1000, ", ".join(heavy) or "none")
+        logging.info("Bot %s %.1f ms after process start", stage, (time.perf_counter() - self.started) * 1000)
@@ -0,0 +1,93 @@
+import hashlib
+import hmac
+import json
+import struct
+import time
+import zlib
+
+# Every record is: 4-byte big-endian length + zlib-compressed JSON {"t": unix time, "update": {...}}
+HEADER = struct.Struct(">I")
+
+# Personal fields dropped from anonymized users and private chats
+PERSONAL_FIELDS = ("last_name", "username", "phone_number", "bio")
+
+
+def _pseudonym(value: int, salt: bytes) -> int:
+    digest = hmac.new(salt, str(value).encode(), hashlib.sha256).digest()
+    # 40 bits fit the Telegram id range and stay stable for the same salt
+    return int.from_bytes(digest[:5], "big") + 1
+
+
+def anonymize(obj, salt: bytes):
+    """
+    Replace user ids and names in a raw update with stable pseudonyms.
+    Group chats are left alone, private chats are treated like users.
+    :param obj: Raw update (as returned by ``Update.to_python()``).
+    :param salt: Secret used to derive the pseudonyms.
+    :return: Anonymized copy.
+    """
+    if isinstance(obj, list):
+        return [anonymize(item, salt) for item in obj]
+    if not isinstance(obj, dict):
+        return obj
+
+    result = {key: anonymize(value, salt) for key, value in obj.items()}
+    is_user = "is_bot" in obj and not obj.get("is_bot")
+    is_private_chat = obj.get("type") == "private"
+    if (is_user or is_private_chat) and isinstance(obj.get("id"), int):
+        result["id"] = _pseudonym(obj["id"], salt)
+        if "first_name" in result:
+            result["first_name"] = f"User{result['id'] % 100000}"
+        for field in PERSONAL_FIELDS:
+            result.pop(field, None)
+    if "user_id" in result and isinstance(result["user_id"], int):
+        result["user_id"] = _pseudonym(result["user_id"], salt)
+    return result
+
+
+class TrafficLogWriter:
+    """
+    Append-only writer of the length-prefixed, compressed update log.
+    """
+
+    def __init__(self, path: str, salt: str, flush_interval: float = 1.0):
+        self.path = path
+        self.salt = salt.encode()
+        self.flush_interval = flush_interval
+        self.file = open(path, "ab")
+        self._last_flush = time.monotonic()
+
+    def write(self, update: dict, timestamp: float = None):
+        record = {"t": timestamp if timestamp is not None else time.time(), "update": anonymize(update, self.salt)}
+        payload = zlib.compress(json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode())
+        self.file.write(HEADER.pack(len(payload)) + payload)
+
+        # Buffered writes; flush at most once per interval to keep the handler path cheap
+        now = time.monotonic()
+        if now - self._last_flush >= self.flush_interval:
+            self.file.flush()
+            self._last_flush = now
+
+    def close(self):
+        if not self.file.closed:
+            self.file.flush()
+            self.file.close()
+
+
+def read_traffic_log(path: str):
+    """
+    Iterate over the records of a traffic log.
+    A truncated last record (e.g. after a crash) is ignored.
+    :return: Generator of ``(timestamp, raw_update)`` tuples.
+    """
+    with open(path, "rb") as file:
+        while True:
+            header = file.read(HEADER.size)
+            if len(header) < HEADER.size:
+                return
+            (length,) = HEADER.unpack(header)
+            payload = file.read(length)
+            if len(payload) < length:
+                return
+            record = json.loads(zlib.decompress(payload))
+            yield record["t"], record["update"]
@@ -1,14 +1,21 @@
 import logging
 
-from aiogram import Dispatcher
+from aiogram import Bot, Dispatcher
 
 from data.config import ADMINS
+from utils.broadcast import broadcaster
 
 
 async def on_startup_notify(dp: Dispatcher):
-    for admin in ADMINS:
-        try:
-            await dp.bot.send_message(admin, "Bot has started")
+    # Sent concurrently; a slow or blocked admin must not hold up the boot
+    summary = await broadcaster.broadcast(dp.bot, ADMINS, "Bot has started", timeout=10)
+    logging.info(f"Startup notification: {summary}")
 
-        except Exception as err:
-            logging.exception(err)
+
+async def alert_admins(bot: Bot, text: str):
+    """
+    Send an operational alert (e.g. "Sheets unavailable") to all admins.
+    """
+    summary = await broadcaster.broadcast(bot, ADMINS, text, timeout=30)
+    logging.info(f"Admin alert: {summary}")
+    return summary
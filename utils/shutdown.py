@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import signal
+
+from aiogram import Dispatcher
+
+from data.config import SHUTDOWN_TIMEOUT
+from middlewares.traffic_capture import TrafficCaptureMiddleware
+from utils.db_api.outbox import outbox
+from utils.edits import edits
+from utils.stats import save as save_stats
+from utils.submit import flush_outbox, submit_guard
+
+
+class ShutdownCoordinator:
+    """
+    Stop in order: no new updates or submits, wait (up to ``timeout`` seconds in
+    total) for running submits and buffered edits, finish what is left in the
+    outbox, save the statistics snapshot and the captured traffic, then close the
+    FSM storage and the bot session. Submissions still unfinished at the deadline stay in the outbox and
+    are finished on the next start.
+    """
+
+    def __init__(self, timeout: float = 25.0):
+        self.timeout = timeout
+        self.stopping = False
+
+    def install(self, dispatcher: Dispatcher):
+        """
+        Turn SIGTERM and SIGINT into a graceful stop: polling stops and the
+        executor runs the on_shutdown callbacks.
+        """
+        loop = asyncio.get_event_loop()
+        for signal_number in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(signal_number, self.request_stop, dispatcher)
+            except (NotImplementedError, RuntimeError):  # Windows, or not the main thread
+                pass
+
+    def request_stop(self, dispatcher: Dispatcher):
+        if self.stopping:
+            return
+        logging.info("Shutdown requested, no longer accepting updates")
+        self.stopping = True
+        submit_guard.closed = True
+        dispatcher.stop_polling()
+        asyncio.get_event_loop().stop()
+
+    async def shutdown(self, dispatcher: Dispatcher):
+        self.stopping = True
+        submit_guard.closed = True
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+
+        while submit_guard.in_flight and loop.time() < deadline:
+            await asyncio.sleep(0.05)
+        if submit_guard.in_flight:
+            logging.warning(f"Shutdown deadline reached with {len(submit_guard.in_flight)} submits still running")
+
+        steps = (
+            ("buffered edits", edits.drain()),
+            ("outbox", flush_outbox(dispatcher.bot, skip_users=submit_guard.in_flight)),
+        )
+        for name, step in steps:
+            try:
+                await asyncio.wait_for(step, max(deadline - loop.time(), 0.1))
+            except asyncio.TimeoutError:
+                logging.warning(f"Shutdown deadline reached while flushing the {name}")
+            except Exception as err:
+                logging.warning(f"Flushing the {name} failed: {err}")
+
+        left = len(outbox)
+        if left:
+            logging.warning(f"{left} submissions kept in the outbox for the next start")
+        await save_stats()
+
+        # The capture file is flushed at most once a second while running
+        for middleware in dispatcher.middleware.applications:
+            if isinstance(middleware, TrafficCaptureMiddleware):
+                middleware.close()
+
+        await dispatcher.storage.close()
+        await dispatcher.storage.wait_closed()
+        session = await dispatcher.bot.get_session()
+        await session.close()
+        logging.info("Shutdown complete")
+
+
+shutdown = ShutdownCoordinator(timeout=SHUTDOWN_TIMEOUT)
@@ -0,0 +1,243 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+from collections import Counter
+
+from data.config import STATS_RECONCILE_INTERVAL, STATS_SNAPSHOT_FILE, STATS_SNAPSHOT_INTERVAL
+from utils.db_api.google_sheets import WORKSHEET_HEADERS, WORKSHEETS, get_sheets_client
+
+# Columns counted value by value, per worksheet
+CATEGORICAL_FIELDS = {
+    "Humans": ("Gender", "Nationality", "Education", "Eye Color", "Hair Color"),
+    "Animals": ("Species", "Mammal", "Predator", "Color"),
+    "Aliens": ("Humanoid", "Race", "Skin Color", "Dangerous", "Has Reason"),
+}
+
+# Numeric columns and their histogram bucket width
+NUMERIC_FIELDS = {
+    "Humans": {"Age": 10, "Height": 10},
+    "Animals": {"Weight": 10, "Age": 12},
+    "Aliens": {"Weight": 10},
+}
+
+TOP_K = 5
+# Histogram lines per column in /stats; neighbouring buckets are merged to fit
+MAX_HISTOGRAM_BINS = 8
+
+
+def merge_buckets(counter: Counter, width: int, limit: int = MAX_HISTOGRAM_BINS) -> list:
+    """
+    Merge neighbouring histogram buckets into at most ``limit`` bins of equal
+    width (a multiple of ``width``), so a wide range (animal weights up to
+    10000 kg) takes a few lines instead of hundreds. Empty bins are left out.
+    :return: [(first value, last value, count)]
+    """
+    low, high = min(counter), max(counter)
+    bin_width = width * max(1, -(-((high - low) // width + 1) // limit))  # Ceiling division
+    while high // bin_width - low // bin_width >= limit:  # Bins start at multiples of their width
+        bin_width += width
+    bins = Counter()
+    for bucket, count in counter.items():
+        bins[bucket // bin_width * bin_width] += count
+    return [(start, start + bin_width - 1, bins[start]) for start in sorted(bins)]
+
+
+class RunningStats:
+    """
+    Aggregates over all submissions, updated in O(1) per submit: totals per
+    worksheet, value counts of categorical columns and bucketed histograms of
+    numeric columns. Keys are "Worksheet/Column".
+    """
+
+    def __init__(self):
+        self.totals = Counter()
+        self.values = {}
+        self.histograms = {}
+        self.dirty = False
+        # Bulk imports update the aggregates from a worker thread
+        self._lock = threading.Lock()
+
+    def add(self, worksheet_name: str, row: list):
+        """
+        Count one worksheet row ([No., ID, Initiator, ..., Date]).
+        """
+        header = WORKSHEET_HEADERS.get(worksheet_name)
+        if header is None:
+            return
+        fields = dict(zip(header, row))
+        with self._lock:
+            self._add(worksheet_name, fields)
+
+    def _add(self, worksheet_name: str, fields: dict):
+        self.totals[worksheet_name] += 1
+        for column in CATEGORICAL_FIELDS.get(worksheet_name, ()):
+            value = str(fields.get(column, "")).strip()
+            if value:
+                self.values.setdefault(f"{worksheet_name}/{column}", Counter())[value] += 1
+        for column, width in NUMERIC_FIELDS.get(worksheet_name, {}).items():
+            try:
+                # Units are part of some values, e.g. "70 kg"
+                value = float(str(fields.get(column, "")).split()[0])
+            except (ValueError, IndexError):
+                continue
+            bucket = int(value // width * width)
+            self.histograms.setdefault(f"{worksheet_name}/{column}", Counter())[bucket] += 1
+        self.dirty = True
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return self._to_dict()
+
+    def _to_dict(self) -> dict:
+        return {
+            "totals": dict(self.totals),
+            "values": {key: dict(counter) for key, counter in self.values.items()},
+            # JSON object keys are strings; buckets are converted back in from_dict
+            "histograms": {key: dict(counter) for key, counter in self.histograms.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RunningStats":
+        stats = cls()
+        stats.totals = Counter(data.get("totals", {}))
+        stats.values = {key: Counter(counter) for key, counter in data.get("values", {}).items()}
+        stats.histograms = {key: Counter({int(bucket): count for bucket, count in counter.items()})
+                            for key, counter in data.get("histograms", {}).items()}
+        return stats
+
+    @classmethod
+    def from_rows(cls, rows_by_worksheet) -> "RunningStats":
+        """
+        Build the aggregates from scratch.
+        :param rows_by_worksheet: Iterable of (worksheet name, row iterable without the header).
+        """
+        stats = cls()
+        for worksheet_name, rows in rows_by_worksheet:
+            for row in rows:
+                if len(row) > 2 and row[1]:
+                    stats.add(worksheet_name, row)
+        return stats
+
+    def replace(self, other: "RunningStats"):
+        """
+        Take over the aggregates of another instance, keeping this object (it is imported elsewhere).
+        """
+        with self._lock:
+            self.totals, self.values, self.histograms = other.totals, other.values, other.histograms
+            self.dirty = True
+
+    def render(self) -> str:
+        with self._lock:
+            return self._render()
+
+    def _render(self) -> str:
+        lines = []
+        for worksheet_name in WORKSHEETS:
+            total = self.totals.get(worksheet_name, 0)
+            lines.append(f"{worksheet_name}: {total}")
+            if not total:
+                continue
+            for column in CATEGORICAL_FIELDS[worksheet_name]:
+                counter = self.values.get(f"{worksheet_name}/{column}")
+                if counter:
+                    top = ", ".join(f"{value} {count * 100 / total:.0f}%" for value, count in counter.most_common(TOP_K))
+                    lines.append(f"  {column}: {top}")
+            for column, width in NUMERIC_FIELDS[worksheet_name].items():
+                counter = self.histograms.get(f"{worksheet_name}/{column}")
+                if counter:
+                    lines.append(f"  {column}:")
+                    bins = merge_buckets(counter, width)
+                    peak = max(count for _, _, count in bins)
+                    for first, last, count in bins:
+                        bar = "█" * max(1, round(count * 20 / peak))
+                        lines.append(f"    {first:>4}-{last:<4} {bar} {count}")
+            lines.append("")
+        return "\n".join(lines).strip()
+
+
+def load_snapshot(path: str = STATS_SNAPSHOT_FILE) -> RunningStats:
+    try:
+        with open(path) as file:
+            return RunningStats.from_dict(json.load(file))
+    except FileNotFoundError:
+        return RunningStats()
+    except (OSError, ValueError) as err:
+        logging.warning(f"Ignoring unreadable stats snapshot {path}: {err}")
+        return RunningStats()
+
+
+stats = load_snapshot()
+
+
+def save_snapshot(data: dict, path: str = STATS_SNAPSHOT_FILE):
+    """
+    Write aggregates (RunningStats.to_dict()) to disk atomically: temp file, then rename.
+    """
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as file:
+        json.dump(data, file, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+def record_submission(worksheet_name: str, row: list):
+    stats.add(worksheet_name, row)
+
+
+def rebuild_from_sheet() -> RunningStats:
+    """
+    Recount everything from the sheet, page by page. Blocking, run it in an executor.
+    """
+    client = get_sheets_client()
+
+    def rows(worksheet_name):
+        iterator = client.iter_rows(worksheet_name)
+        next(iterator, None)  # Header row
+        return iterator
+
+    return RunningStats.from_rows((worksheet_name, rows(worksheet_name)) for worksheet_name in WORKSHEETS)
+
+
+async def save():
+    """
+    Snapshot the aggregates on the loop and write them in a worker thread.
+    """
+    data = stats.to_dict()
+    stats.dirty = False
+    await asyncio.get_running_loop().run_in_executor(None, save_snapshot, data)
+
+
+async def reconcile():
+    """
+    Replace the running aggregates with a fresh count from the sheet and log any drift.
+    Submits landing while the sheet is read may be off by one until the next run.
+    """
+    fresh = await asyncio.get_running_loop().run_in_executor(None, rebuild_from_sheet)
+    drift = {name: fresh.totals.get(name, 0) - stats.totals.get(name, 0) for name in WORKSHEETS}
+    if any(drift.values()):
+        logging.warning(f"Stats drifted from the sheet, corrected by {drift}")
+    stats.replace(fresh)
+    await save()
+
+
+async def maintain_stats():
+    """
+    Background task: snapshot the aggregates to disk when they changed and
+    periodically reconcile them with the sheet (also right away if there is no snapshot).
+    """
+    since_reconcile = STATS_RECONCILE_INTERVAL if not os.path.exists(STATS_SNAPSHOT_FILE) else 0.0
+    while True:
+        if since_reconcile >= STATS_RECONCILE_INTERVAL:
+            since_reconcile = 0.0
+            try:
+                await reconcile()
+            except Exception as err:
+                logging.warning(f"Stats reconciliation failed: {err}")
+        if stats.dirty:
+            try:
+                await save()
+            except OSError as err:
+                logging.warning(f"Failed to save the stats snapshot: {err}")
+        await asyncio.sleep(STATS_SNAPSHOT_INTERVAL)
+        since_reconcile += STATS_SNAPSHOT_INTERVAL
@@ -0,0 +1,327 @@
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from aiogram import Bot
+from aiogram.dispatcher import FSMContext
+from aiogram.types import CallbackQuery
+
+from data.config import (SHEETS_SYNC_INTERVAL, SUBMIT_APPEND_BUDGET, SUBMIT_AUTH_BUDGET, SUBMIT_DEADLINE,
+                         SUBMIT_DEDUP_SIZE, SUBMIT_DEDUP_WINDOW, SUBMIT_POST_BUDGET, SUBMIT_ROW_COUNT_BUDGET)
+from utils.db_api.google_sheets import get_sheets_client, is_unavailable, sheets_breaker
+from utils.db_api.outbox import outbox
+from utils.db_api.submissions import submissions
+from utils.misc import metrics
+from utils.misc.deadline import Deadline, StageTimeout
+from utils.notify_admins import alert_admins
+from utils.stats import record_submission
+
+# Final message of a submit, depending on whether the row reached the sheet
+SAVED_TEXT = "✅ Your data has been successfully posted to the group and saved to Google Sheets. Thank you! 🎉"
+DEFERRED_TEXT = ("✅ Your data has been posted to the group. Google Sheets is unavailable right now, "
+                 "the row is saved and will be added to the sheet automatically. Thank you! 🎉")
+PENDING_TEXT = ("⏳ Submitting is taking longer than usual. Your data is saved and will be posted to the group "
+                "and added to Google Sheets automatically. Thank you! 🎉")
+
+# Error message prefix per stage of the submit pipeline
+STAGE_ERRORS = {
+    "auth": "Failed to connect to Google Sheets",
+    "row_count": "Failed to fetch row count",
+    "group_post": "Failed to post to the group",
+    "sheet_append": "Failed to save to Google Sheets",
+}
+
+# Rows being appended right now: a stage that timed out leaves its worker thread running
+_appending = set()
+_appending_lock = threading.Lock()
+
+
+class SubmitError(Exception):
+    def __init__(self, stage: str, error: Exception):
+        super().__init__(f"{STAGE_ERRORS[stage]}: {error}")
+        self.stage = stage
+        self.error = error
+
+
+def next_row_number(worksheet_name: str) -> int:
+    """
+    "No." of a new row: the row count of its worksheet. 0 while Google Sheets is
+    unavailable, the row is numbered when the outbox sync appends it.
+    """
+    try:
+        return get_sheets_client().reserve_row_numbers(worksheet_name)
+    except RuntimeError as err:
+        if not is_unavailable(err):
+            raise
+        return 0
+
+
+def save_submission(worksheet_name: str, row: list, user_id: int = None) -> bool:
+    """
+    Append a finished classification to its worksheet and mirror it locally.
+    :param worksheet_name: Humans, Animals or Aliens.
+    :param row: [No., ID, Initiator, ..., Date]
+    :param user_id: Telegram id of the initiator.
+    :return: True once the row is in the sheet. False if Google Sheets is unavailable
+        and the row has an outbox entry: it stays there for the outbox sync. Also
+        False while another thread is appending the same row.
+    """
+    with _appending_lock:
+        if row[1] in _appending:
+            return False
+        _appending.add(row[1])
+    try:
+        client = get_sheets_client()
+        if not row[0]:  # No row count while Sheets was unavailable
+            row[0] = client.reserve_row_numbers(worksheet_name)
+        client.append_data(worksheet_name, row)
+    except RuntimeError as err:
+        if not is_unavailable(err) or row[1] not in outbox:
+            raise
+        logging.warning(f"Google Sheets unavailable, #{row[1]} kept in the outbox: {err}")
+        metrics.inc("submissions_deferred_total", worksheet=worksheet_name)
+        return False
+    finally:
+        with _appending_lock:
+            _appending.discard(row[1])
+    submissions.add(worksheet_name, row, user_id=user_id)
+    record_submission(worksheet_name, row)
+    outbox.remove(row[1])
+    return True
+
+
+def save_submissions(worksheet_name: str, rows: list, user_id: int = None):
+    """
+    Batch version of save_submission: all rows are appended in one request.
+    """
+    get_sheets_client().append_rows(worksheet_name, rows)
+    for row in rows:
+        submissions.add(worksheet_name, row, user_id=user_id)
+        record_submission(worksheet_name, row)
+
+
+async def run_submission(bot: Bot, worksheet_name: str, row: list, user_id: int, chat_id, text: str,
+                         parse_mode: str = None) -> str:
+    """
+    The submit pipeline under one deadline of SUBMIT_DEADLINE seconds, split into
+    stage budgets: auth, row count, group post and sheet append. The deadline
+    reaches the Bot API request timeout and the Sheets HTTP timeouts. A stage that
+    runs out of time is cancelled and the submission is left in the outbox, where
+    the outbox sync retries the rest of it.
+    :param row: [No., ID, Initiator, ..., Date]; No. is filled in here.
+    :param chat_id: Group the report is posted to.
+    :param text: The group report.
+    :return: The message for the user: SAVED_TEXT, DEFERRED_TEXT or PENDING_TEXT.
+    :raises SubmitError: When a stage failed for another reason than Sheets being unavailable or slow.
+    """
+    deadline = Deadline(SUBMIT_DEADLINE)
+    unique_id = row[1]
+    try:
+        await deadline.run_sync("auth", SUBMIT_AUTH_BUDGET, get_sheets_client)
+        row[0] = await deadline.run_sync("row_count", SUBMIT_ROW_COUNT_BUDGET, next_row_number, worksheet_name)
+    except StageTimeout as err:
+        logging.warning(f"Submit #{unique_id}: {err}, the row is numbered by the outbox sync")
+        row[0] = 0
+    except Exception as err:
+        if not is_unavailable(err):
+            raise SubmitError(deadline.stage, err)
+        row[0] = 0
+
+    # Kept locally until the row is in the sheet, so a restart or a timeout in between can't lose it
+    outbox.put(worksheet_name, row, user_id, chat_id, text, parse_mode)
+    try:
+        with bot.request_timeout(max(deadline.budget(SUBMIT_POST_BUDGET), 1.0)):
+            await deadline.run("group_post", SUBMIT_POST_BUDGET,
+                               bot.send_message(chat_id=chat_id, text=text, parse_mode=parse_mode))
+    except StageTimeout as err:
+        # The post may have gone out anyway; the outbox sync posts it (again) if not marked
+        logging.warning(f"Submit #{unique_id}: {err}, left to the outbox sync")
+        return PENDING_TEXT
+    except Exception as err:
+        outbox.remove(unique_id)
+        raise SubmitError("group_post", err)
+    outbox.mark_posted(unique_id)
+
+    try:
+        saved = await deadline.run_sync("sheet_append", SUBMIT_APPEND_BUDGET,
+                                        save_submission, worksheet_name, row, user_id)
+    except StageTimeout as err:
+        # The worker thread may still finish the append; the sync skips the row until it did
+        logging.warning(f"Submit #{unique_id}: {err}, left to the outbox sync")
+        metrics.inc("submissions_deferred_total", worksheet=worksheet_name)
+        return DEFERRED_TEXT
+    except Exception as err:
+        outbox.remove(unique_id)
+        raise SubmitError("sheet_append", err)
+    return SAVED_TEXT if saved else DEFERRED_TEXT
+
+
+def _sync_entry(entry: dict) -> bool:
+    row = entry["row"]
+    row[0] = get_sheets_client().reserve_row_numbers(entry["being"])  # Numbered when it reaches the sheet
+    return save_submission(entry["being"], row, entry["user_id"])
+
+
+async def flush_outbox(bot: Bot, skip_users=()) -> int:
+    """
+    Finish the submissions left in the outbox by an interrupted pipeline or kept
+    there while Google Sheets was unavailable: post the group report if it did
+    not go out yet, then append the row unless the local mirror already has it.
+    Stops at the first row Sheets can't take.
+    :param skip_users: Users whose submit is still running (checked per entry, pass the live set).
+    :return: The number of entries finished.
+    """
+    loop = asyncio.get_running_loop()
+    finished = 0
+    for entry in outbox.pending():
+        unique_id = entry["unique_id"]
+        # Finished or still handled by its own pipeline since the listing
+        if entry["user_id"] in skip_users or unique_id not in outbox:
+            continue
+        try:
+            if not entry["posted"]:
+                with bot.request_timeout(SUBMIT_POST_BUDGET):
+                    await bot.send_message(entry["chat_id"], entry["text"], parse_mode=entry["parse_mode"])
+                outbox.mark_posted(unique_id)
+            if submissions.find(unique_id) is None:
+                if not await loop.run_in_executor(None, _sync_entry, entry):
+                    break
+            else:
+                outbox.remove(unique_id)
+        except Exception as err:
+            logging.warning(f"Outbox entry #{unique_id} not finished: {err}")
+            if is_unavailable(err):
+                break
+            continue
+        finished += 1
+    metrics.gauge("outbox_pending", len(outbox))
+    return finished
+
+
+def probe_sheets():
+    get_sheets_client().ping()
+
+
+async def maintain_outbox(bot: Bot, interval: float = SHEETS_SYNC_INTERVAL):
+    """
+    Background task: every ``interval`` seconds sync the rows waiting in the
+    outbox, or probe Google Sheets while its circuit is open, and tell the admins
+    when Sheets goes down and comes back.
+    """
+    loop = asyncio.get_running_loop()
+    was_open = False
+    while True:
+        try:
+            if len(outbox):
+                synced = await flush_outbox(bot, skip_users=submit_guard.in_flight)
+                if synced:
+                    logging.info(f"Synced {synced} submissions from the outbox")
+            elif sheets_breaker.state != "closed":
+                await loop.run_in_executor(None, probe_sheets)
+        except Exception as err:
+            logging.info(f"Google Sheets probe failed: {err}")
+
+        is_open = sheets_breaker.state != "closed"
+        if is_open != was_open:
+            was_open = is_open
+            if is_open:
+                text = "⚠️ Google Sheets is unavailable. New submissions are kept locally until it is back."
+            else:
+                text = f"✅ Google Sheets is available again. Submissions waiting to sync: {len(outbox)}."
+            asyncio.create_task(alert_admins(bot, text))
+        await asyncio.sleep(interval)
+
+
+def submission_fingerprint(user_id: int, action: str, data: dict) -> str:
+    """
+    Content hash of a submit: same user, same button, same wizard answers.
+    """
+    payload = json.dumps([user_id, action, data], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class SubmitGuard:
+    """
+    Users with a submit in progress, and a bounded LRU of recent submissions
+    (fingerprint -> submission id) that expire after ``window`` seconds.
+    """
+
+    def __init__(self, window: float = 600.0, size: int = 4096):
+        self.window = window
+        self.size = size
+        self.in_flight = set()
+        self.closed = False  # Set on shutdown: no new submits start
+        self._recent = OrderedDict()
+
+    def recent(self, key):
+        """
+        :param key: A fingerprint, or ("user", user_id) for the user's latest submission.
+        :return: The submission id, or None if unknown or expired.
+        """
+        entry = self._recent.get(key)
+        if entry is None:
+            return None
+        stored_at, unique_id = entry
+        if time.monotonic() - stored_at > self.window:
+            del self._recent[key]
+            return None
+        self._recent.move_to_end(key)
+        return unique_id
+
+    def remember(self, fingerprint: str, user_id: int, unique_id: str):
+        entry = (time.monotonic(), unique_id)
+        for key in (fingerprint, ("user", user_id)):
+            self._recent[key] = entry
+            self._recent.move_to_end(key)
+        while len(self._recent) > self.size:
+            self._recent.popitem(last=False)
+
+
+submit_guard = SubmitGuard(window=SUBMIT_DEDUP_WINDOW, size=SUBMIT_DEDUP_SIZE)
+
+
+def single_flight_submit(handler):
+    """
+    Decorator for the "Submit" callback handlers. One submit per user at a time;
+    a repeated tap on the same data (or on an already submitted summary) is
+    answered with the first submission's id instead of running the pipeline
+    again. The handler returns the submission id on success.
+    """
+
+    @functools.wraps(handler)
+    async def wrapper(call: CallbackQuery, state: FSMContext):
+        user_id = call.from_user.id
+        if submit_guard.closed:
+            await call.answer("🔄 The bot is restarting, please tap Submit again in a minute.", show_alert=True)
+            return
+        if user_id in submit_guard.in_flight:
+            metrics.inc("submit_duplicates_total", reason="in_flight")
+            await call.answer("⏳ Your data is already being submitted.")
+            return
+
+        submit_guard.in_flight.add(user_id)
+        try:
+            data = await state.get_data()
+            # A finished wizard has no data left: that is a tap on an old summary message
+            fingerprint = submission_fingerprint(user_id, call.data, data) if data else ("user", user_id)
+            unique_id = submit_guard.recent(fingerprint)
+            if unique_id is not None:
+                metrics.inc("submit_duplicates_total", reason="repeat")
+                await call.answer(f"✅ Already submitted as #{unique_id}.", show_alert=True)
+                return
+            if not data:
+                await call.answer("⚠️ Nothing to submit. Use /classify to start again.", show_alert=True)
+                return
+
+            unique_id = await handler(call, state)
+            if unique_id is not None:
+                submit_guard.remember(fingerprint, user_id, unique_id)
+        finally:
+            submit_guard.in_flight.discard(user_id)
+
+    return wrapper
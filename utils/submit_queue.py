@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+from aiogram import Bot, types
+
+from data.config import SUBMIT_QUEUE_REFRESH, SUBMIT_QUEUE_SIZE, SUBMIT_RATE, SUBMIT_WORKERS
+from utils.db_api.outbox import outbox
+from utils.edits import edits
+from utils.misc import metrics
+from utils.submit import run_submission
+
+QUEUE_FULL_TEXT = "🚦 Too many submissions right now. Your answers are kept, please tap Submit again in a minute."
+
+
+class SubmitJob:
+    def __init__(self, message: types.Message, args: tuple, kwargs: dict):
+        self.message = message
+        self.args = args
+        self.kwargs = kwargs
+        self.future = asyncio.get_event_loop().create_future()
+        self.queued_at = time.monotonic()
+        self.shown = None  # Queue position shown on the message
+
+
+class SubmitQueue:
+    """
+    Admission control for the submit pipeline. Submits wait in a bounded queue
+    and ``workers`` tasks run them, starting at most ``rate`` per minute so the
+    Sheets write quota is not exceeded. While waiting, the submit message shows
+    the queue position, updated at most every ``refresh`` seconds; a full queue
+    turns new submits away at once.
+    """
+
+    def __init__(self, workers: int = 2, size: int = 50, rate: float = 50.0, refresh: float = 5.0):
+        self.workers = workers
+        self.size = size
+        self.interval = 60.0 / rate if rate > 0 else 0.0
+        self.refresh = refresh
+        self._refresh_handle = None
+        self._last_refresh = float("-inf")
+        self._queue = None
+        self._waiting = deque()
+        self._next_start = 0.0
+        self._tasks = []
+
+    def start(self, bot: Bot):
+        """
+        Start the workers, e.g. from on_startup. Otherwise the first put starts them.
+        """
+        if self._queue is not None:
+            return
+        # Created here rather than in __init__: the queue must belong to the running loop
+        self._queue = asyncio.Queue(maxsize=self.size)
+        self._tasks = [asyncio.create_task(self._work(bot)) for _ in range(self.workers)]
+
+    async def join(self):
+        """
+        Wait until every queued submit has been run.
+        """
+        if self._queue is not None:
+            await self._queue.join()
+
+    def put(self, message: types.Message, worksheet_name: str, row: list, user_id: int, chat_id, text: str,
+            parse_mode: str = None) -> asyncio.Future:
+        """
+        Queue a submission. Arguments after ``message`` are those of run_submission.
+        :param message: The submit message, edited to show the queue position.
+        :return: A future resolving to run_submission's result.
+        :raises asyncio.QueueFull: When the queue is full; nothing was queued.
+        """
+        self.start(message.bot)
+        job = SubmitJob(message, (worksheet_name, row, user_id, chat_id, text), {"parse_mode": parse_mode})
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            metrics.inc("submit_queue_rejected_total")
+            raise
+        # Kept locally while waiting too, so a restart can't lose queued submits
+        outbox.put(worksheet_name, row, user_id, chat_id, text, parse_mode)
+        self._waiting.append(job)
+        metrics.gauge("submit_queue_depth", len(self._waiting))
+        # Jobs ahead keep their positions, only the new one is shown
+        self._show_position(job, len(self._waiting) - 1)
+        return job.future
+
+    def __len__(self):
+        return len(self._waiting)
+
+    @staticmethod
+    def _show_position(job: SubmitJob, ahead: int):
+        if job.shown != ahead:
+            job.shown = ahead
+            edits.edit(job.message, f"⏳ Queued: {ahead} ahead")  # Coalesced, not awaited
+
+    def _schedule_refresh(self):
+        """
+        Refresh the waiting positions after a dequeue, at most once per ``refresh``
+        seconds: a busy queue would otherwise edit every waiting message per start.
+        """
+        if self._refresh_handle is not None:
+            return
+        delay = max(self._last_refresh + self.refresh - time.monotonic(), 0.0)
+        self._refresh_handle = asyncio.get_running_loop().call_later(delay, self._refresh_positions)
+
+    def _refresh_positions(self):
+        self._refresh_handle = None
+        self._last_refresh = time.monotonic()
+        for ahead, job in enumerate(self._waiting):
+            self._show_position(job, ahead)
+
+    async def _pace(self):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        start = max(now, self._next_start)
+        self._next_start = start + self.interval
+        await asyncio.sleep(start - now)
+
+    async def _work(self, bot: Bot):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._pace()
+                self._waiting.remove(job)
+                metrics.gauge("submit_queue_depth", len(self._waiting))
+                self._schedule_refresh()
+                metrics.inc("submit_queue_wait_seconds_total", time.monotonic() - job.queued_at)
+                if job.future.cancelled():  # The handler is gone, the outbox sync finishes the entry
+                    continue
+                edits.edit(job.message, "⏳ Submitting your data...")
+                result = await run_submission(bot, *job.args, **job.kwargs)
+                if not job.future.done():
+                    job.future.set_result(result)
+            except Exception as err:
+                if not job.future.done():
+                    job.future.set_exception(err)
+                else:
+                    logging.warning(f"Queued submit failed: {err}")
+            finally:
+                self._queue.task_done()
+
+
+submit_queue = SubmitQueue(workers=SUBMIT_WORKERS, size=SUBMIT_QUEUE_SIZE, rate=SUBMIT_RATE,
+                           refresh=SUBMIT_QUEUE_REFRESH)
@@ -0,0 +1,167 @@
+from utils.misc.fuzzy import VocabularyIndex, animal_index, color_index, nationality_index
+
+# Ranges enforced by the wizards and the bulk import (inclusive)
+HUMAN_AGE_RANGE = (9, 100)
+HUMAN_HEIGHT_RANGE = (50, 250)
+ANIMAL_WEIGHT_RANGE = (1, 10000)  # kg
+ANIMAL_AGE_RANGE = (0, 3600)  # months
+ALIEN_WEIGHT_RANGE = (1, 10 ** 6)  # kg
+ALIEN_RACES = ("X", "Y", "Z")
+
+GENDERS = ("Male", "Female")
+EDUCATION_LEVELS = ("Higher", "School")
+YES_NO = ("Yes", "No")
+
+# Fuzzy matches below this similarity are rejected rather than guessed
+FUZZY_CUTOFF = 0.75
+
+
+class ValidationError(ValueError):
+    pass
+
+
+class Field:
+    """
+    One imported column and its rule.
+    :param column: Column name in the uploaded file (lower case).
+    :param label: Name used in error messages.
+    :param kind: "int" (rule is an inclusive range), "choice" (rule is a tuple of
+        values) or "vocabulary" (rule is a VocabularyIndex).
+    :param suffix: Appended to the normalized value, e.g. " kg".
+    """
+
+    def __init__(self, column: str, label: str, kind: str, rule, suffix: str = ""):
+        self.column = column
+        self.label = label
+        self.kind = kind
+        self.rule = rule
+        self.suffix = suffix
+        if kind == "choice":
+            self.by_lower = {choice.lower(): choice for choice in rule}
+
+
+# Imported columns per worksheet, in sheet order (between Initiator and Date)
+FIELDS = {
+    "Humans": (
+        Field("gender", "Gender", "choice", GENDERS),
+        Field("age", "Age", "int", HUMAN_AGE_RANGE),
+        Field("nationality", "Nationality", "vocabulary", nationality_index),
+        Field("education", "Education", "choice", EDUCATION_LEVELS),
+        Field("eye color", "Eye color", "vocabulary", color_index),
+        Field("hair color", "Hair color", "vocabulary", color_index),
+        Field("height", "Height", "int", HUMAN_HEIGHT_RANGE),
+    ),
+    "Animals": (
+        Field("species", "Species", "vocabulary", animal_index),
+        Field("mammal", "Mammal", "choice", YES_NO),
+        Field("predator", "Predator", "choice", YES_NO),
+        Field("color", "Color", "vocabulary", color_index),
+        Field("weight", "Weight", "int", ANIMAL_WEIGHT_RANGE),
+        Field("age", "Age", "int", ANIMAL_AGE_RANGE),
+    ),
+    "Aliens": (
+        Field("humanoid", "Humanoid", "choice", YES_NO),
+        Field("race", "Race", "choice", ALIEN_RACES),
+        Field("skin color", "Skin color", "vocabulary", color_index),
+        Field("dangerous", "Dangerous", "choice", YES_NO),
+        Field("has reason", "Has reason", "choice", YES_NO),
+        Field("weight", "Weight", "int", ALIEN_WEIGHT_RANGE, suffix=" kg"),
+    ),
+}
+
+# The wizard stops asking after "not humanoid" and stores these values
+NOT_HUMANOID = ["No", "None", "None", "None", "None", "None"]
+
+# Being type (as written in the "type" column, singular or plural) -> worksheet
+BEING_TYPES = {"human": "Humans", "animal": "Animals", "alien": "Aliens"}
+
+
+def to_int(value: str) -> int:
+    """
+    Parse a whole number. Spreadsheet numbers may come as "27.0".
+    :raises ValueError: If the value is not a whole number.
+    """
+    value = value.strip()
+    try:
+        return int(value)
+    except ValueError:
+        number = float(value)
+        if not number.is_integer():
+            raise
+        return int(number)
+
+
+def int_error(field: Field, value) -> str:
+    return f"{field.label} must be a whole number, got {value!r}"
+
+
+def range_error(field: Field, number: int) -> str:
+    low, high = field.rule
+    return f"{field.label} must be between {low} and {high}, got {number}"
+
+
+def choice_error(field: Field, value) -> str:
+    if field.kind == "vocabulary":
+        return f"Unknown {field.label.lower()} {value!r}"
+    return f"{field.label} must be one of {', '.join(field.rule)}, got {value!r}"
+
+
+def fuzzy_word(index: VocabularyIndex, value: str):
+    """
+    The single closest vocabulary word for a typo (e.g. "Uzbekk" -> "Uzbek"), or None.
+    """
+    matches = index.close_matches(value.strip().capitalize(), n=1, cutoff=FUZZY_CUTOFF)
+    return matches[0] if matches else None
+
+
+def parse_field(field: Field, value) -> str:
+    """
+    Validate and normalize one value.
+    :raises ValidationError: With a message meant for the uploader.
+    """
+    value = "" if value is None else str(value)
+    if field.kind == "int":
+        try:
+            number = to_int(value)
+        except (ValueError, OverflowError):
+            raise ValidationError(int_error(field, value))
+        low, high = field.rule
+        if not low <= number <= high:
+            raise ValidationError(range_error(field, number))
+        return f"{number}{field.suffix}" if field.suffix else number
+    if field.kind == "choice":
+        normalized = field.by_lower.get(value.strip().lower())
+    else:
+        normalized = field.rule.lookup(value) or fuzzy_word(field.rule, value)
+    if normalized is None:
+        raise ValidationError(choice_error(field, value))
+    return normalized
+
+
+def worksheet_of(record: dict) -> str:
+    being = str(record.get("type", "")).strip().lower().rstrip("s")
+    if being not in BEING_TYPES:
+        raise ValidationError(f"Type must be one of {', '.join(BEING_TYPES)}, got {record.get('type', '')!r}")
+    return BEING_TYPES[being]
+
+
+def validate_fields(worksheet_name: str, record: dict) -> list:
+    """
+    :param record: Column name (lower case) -> raw value.
+    :return: Field values in sheet order.
+    """
+    fields = FIELDS[worksheet_name]
+    if worksheet_name == "Aliens" and parse_field(fields[0], record.get("humanoid")) == "No":
+        return list(NOT_HUMANOID)
+    return [parse_field(field, record.get(field.column)) for field in fields]
+
+
+def validate_record(record: dict) -> tuple:
+    """
+    Validate and normalize one imported record.
+    :param record: Column name (lower case) -> raw value, including "type".
+    :return: (worksheet name, field values in sheet order)
+    :raises ValidationError: With a message meant for the uploader.
+    """
+    worksheet_name = worksheet_of(record)
+    return worksheet_name, validate_fields(worksheet_name, record)
@@ -0,0 +1,69 @@
+import asyncio
+import logging
+import time
+
+from keyboards.inline.candidates import candidates_keyboard
+from utils.db_api.google_sheets import get_sheets_client, preload
+from utils.db_api.submissions import submissions
+from utils.misc.fuzzy import animal_index, color_index, nationality_index
+
+# (callback prefix, Reenter callback data) of every candidate keyboard the wizards send
+CANDIDATE_KEYBOARDS = (
+    ("nationality", "reenter"),
+    ("nationality", "reenter_nationality"),
+    ("color", "reenter_color"),
+    ("animal", "reenter_species"),
+)
+
+
+def build_caches():
+    """
+    Build the candidate keyboards and prime the fuzzy-match indexes with every
+    vocabulary word, so exact answers never hit difflib. CPU-bound: run it in a
+    worker thread.
+    """
+    for prefix, reenter_data in CANDIDATE_KEYBOARDS:
+        for count in range(1, 11):
+            candidates_keyboard(prefix, count, reenter_data)
+    for index in (nationality_index, color_index, animal_index):
+        index.prime()
+
+
+def warm_up_sheets():
+    """
+    Authenticate, open the spreadsheet and prefetch worksheet handles and row counts.
+    """
+    get_sheets_client().warm_up()
+
+
+async def backfill_mirror():
+    """
+    Fill the local submissions mirror from the sheet the first time the bot runs.
+    Reads every worksheet, so it runs as a background task after startup and
+    polling does not wait for it; until it is done, lookups only see new rows.
+    """
+    if submissions.is_backfilled():
+        return
+    loop = asyncio.get_running_loop()
+    try:
+        count = await loop.run_in_executor(None, lambda: submissions.backfill(get_sheets_client()))
+    except Exception as err:
+        logging.warning(f"Backfill of the submissions mirror failed, retried at the next start: {err}")
+        return
+    logging.info(f"Backfilled {count} submissions into the local mirror")
+
+
+async def warm_up(sheets: bool = True):
+    """
+    Startup warm-up: caches and Google Sheets work in worker threads, so the loop
+    keeps serving updates. Failures are logged only; the lazy path retries on the first submit.
+    """
+    started = time.perf_counter()
+    loop = asyncio.get_event_loop()
+    await loop.run_in_executor(None, build_caches)
+
+    try:
+        await loop.run_in_executor(None, warm_up_sheets if sheets else preload)
+    except Exception as err:
+        logging.warning(f"Google Sheets warm-up failed: {err}")
+    logging.info("Warm-up finished in %.1f ms", (time.perf_counter() - started) * 1000)
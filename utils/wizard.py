@@ -0,0 +1,128 @@
+import logging
+
+from aiogram import types
+from aiogram.dispatcher import FSMContext
+from aiogram.utils.exceptions import (MessageCantBeDeleted, MessageCantBeEdited, MessageNotModified,
+                                      MessageToDeleteNotFound, MessageToEditNotFound)
+
+from data.config import WIZARD_SINGLE_MESSAGE
+from utils.edits import edits
+from utils.misc import metrics
+
+# FSM data key of the wizard message: {"message_id", "text", "reply_markup", "kwargs"}
+WIZARD_KEY = "wizard"
+
+# Prompts and answers of the classification wizards go through ask/edit/hint. By default every step is a new
+# message; with WIZARD_SINGLE_MESSAGE the wizard owns one message per chat, edits it at every step and deletes
+# what the user typed.
+
+
+def from_bot(message: types.Message) -> bool:
+    """
+    True for a message sent by this bot (call.message), False for the user's own input.
+    """
+    return message.from_user is not None and message.from_user.id == message.bot.id
+
+
+async def ask(message: types.Message, state: FSMContext, text: str, reply_markup=None, done=None, new: bool = False,
+              **kwargs):
+    """
+    Show the next step of a wizard.
+    :param message: The user's answer, or the bot message whose button was pressed.
+    :param state: The user's FSMContext.
+    :param text: The question.
+    :param reply_markup: Keyboard of the question.
+    :param done: Confirmation of the previous answer, e.g. "⚖️ Weight: 12 kg recorded.", or a tuple of lines.
+        Without single-message mode it replaces the pressed message, or is sent before the question.
+    :param new: Start a new wizard message instead of editing the current one.
+    :param kwargs: Extra sendMessage/editMessageText arguments (parse_mode, ...).
+    """
+    lines = (done,) if isinstance(done, str) else tuple(done or ())
+    if not WIZARD_SINGLE_MESSAGE:
+        for position, line in enumerate(lines):
+            if position == 0 and from_bot(message):
+                await message.edit_text(line)
+            else:
+                await message.answer(line)
+        await message.answer(text, reply_markup=reply_markup, **kwargs)
+        return
+
+    if lines:
+        text = "\n".join(lines) + f"\n\n{text}"
+    await show(message, state, text, reply_markup, new=new, **kwargs)
+
+
+async def edit(message: types.Message, state: FSMContext, text: str, reply_markup=None, **kwargs):
+    """
+    Replace the pressed message (edit menus, Reenter buttons).
+    """
+    if not WIZARD_SINGLE_MESSAGE:
+        await message.edit_text(text, reply_markup=reply_markup, **kwargs)
+        return
+    await show(message, state, text, reply_markup, **kwargs)
+
+
+async def hint(message: types.Message, state: FSMContext, text: str, delete: bool = False):
+    """
+    Tell the user what is wrong with their input and stay on the current step.
+    In single-message mode the hint is shown above the current question, keeping its keyboard.
+    :param delete: Delete the user's input in both modes.
+    """
+    wizard = (await state.get_data()).get(WIZARD_KEY) if WIZARD_SINGLE_MESSAGE else None
+    if wizard is None:
+        if delete:
+            await delete_input(message)
+        await message.answer(text)
+        return
+
+    markup = wizard["reply_markup"]
+    await show(message, state, f"{text}\n\n{wizard['text']}",
+               types.InlineKeyboardMarkup.to_object(markup) if markup else None, remember=False, **wizard["kwargs"])
+
+
+async def show(message: types.Message, state: FSMContext, text: str, reply_markup=None, new: bool = False,
+               remember: bool = True, **kwargs):
+    """
+    Edit the wizard message in place, or send it when there is none yet (or it can no longer be edited).
+    """
+    wizard = (await state.get_data()).get(WIZARD_KEY) or {}
+    if from_bot(message):
+        message_id = message.message_id
+    else:
+        message_id = wizard.get("message_id")
+        await delete_input(message)
+    if new:
+        message_id = None
+
+    chat_id = message.chat.id
+    if message_id is not None:
+        try:
+            await message.bot.edit_message_text(text, chat_id, message_id, reply_markup=reply_markup, **kwargs)
+            metrics.inc("wizard_requests_total", method="editMessageText")
+        except MessageNotModified:
+            pass
+        except (MessageToEditNotFound, MessageCantBeEdited) as err:
+            logging.info(f"Wizard message {message_id} can't be edited, sending a new one: {err}")
+            message_id = None
+        else:
+            edits.forget(chat_id, message_id)
+
+    if message_id is None:
+        sent = await message.bot.send_message(chat_id, text, reply_markup=reply_markup, **kwargs)
+        metrics.inc("wizard_requests_total", method="sendMessage")
+        message_id = sent.message_id
+
+    if remember:
+        wizard = {"message_id": message_id, "text": text,
+                  "reply_markup": reply_markup.to_python() if reply_markup else None, "kwargs": kwargs}
+    else:
+        wizard = dict(wizard, message_id=message_id)
+    await state.update_data({WIZARD_KEY: wizard})
+
+
+async def delete_input(message: types.Message):
+    try:
+        await message.delete()
+        metrics.inc("wizard_requests_total", method="deleteMessage")
+    except (MessageToDeleteNotFound, MessageCantBeDeleted):
+        pass